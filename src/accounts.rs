@@ -1,14 +1,17 @@
 //! Account configuration — parse accounts.toml with provider presets.
 
 use anyhow::{bail, Result};
+use once_cell::sync::Lazy;
 use serde::{Deserialize, Serialize};
 use std::collections::HashMap;
 use std::path::{Path, PathBuf};
+use std::sync::Arc;
 
 use crate::resolve;
+use crate::util::FileCache;
 
 /// Provider presets for common IMAP/SMTP configurations.
-pub fn provider_presets() -> HashMap<&'static str, AccountDefaults> {
+static PROVIDER_PRESETS: Lazy<HashMap<&'static str, AccountDefaults>> = Lazy::new(|| {
     let mut m = HashMap::new();
     m.insert(
         "gmail",
@@ -33,6 +36,11 @@ pub fn provider_presets() -> HashMap<&'static str, AccountDefaults> {
         },
     );
     m
+});
+
+/// Provider presets, built on first use and shared thereafter.
+pub fn provider_presets() -> &'static HashMap<&'static str, AccountDefaults> {
+    &PROVIDER_PRESETS
 }
 
 pub struct AccountDefaults {
@@ -114,8 +122,10 @@ fn default_imap_port() -> u16 {
 fn default_smtp_port() -> u16 {
     465
 }
+const DEFAULT_DRAFTS_FOLDER: &str = "Drafts";
+
 fn default_drafts_folder() -> String {
-    "Drafts".to_string()
+    DEFAULT_DRAFTS_FOLDER.to_string()
 }
 fn default_sync_days() -> u32 {
     3650
@@ -134,7 +144,7 @@ impl Default for Account {
             imap_starttls: false,
             smtp_host: String::new(),
             smtp_port: 465,
-            drafts_folder: "Drafts".to_string(),
+            drafts_folder: DEFAULT_DRAFTS_FOLDER.to_string(),
             sync_days: 3650,
             default: false,
         }
@@ -142,28 +152,30 @@ impl Default for Account {
 }
 
 /// Apply provider preset defaults. Account values win over preset.
+///
+/// A field counts as unset while it still holds its `Account::default()`
+/// value; those defaults are compared as constants rather than by building
+/// a default `Account` per call.
 fn apply_preset(account: &mut Account) {
-    let presets = provider_presets();
-    let Some(preset) = presets.get(account.provider.as_str()) else {
+    let Some(preset) = PROVIDER_PRESETS.get(account.provider.as_str()) else {
         return;
     };
-    let defaults = Account::default();
-    if account.imap_host == defaults.imap_host {
+    if account.imap_host.is_empty() {
         account.imap_host = preset.imap_host.to_string();
     }
-    if account.imap_port == defaults.imap_port {
+    if account.imap_port == default_imap_port() {
         account.imap_port = preset.imap_port;
     }
-    if account.imap_starttls == defaults.imap_starttls && preset.imap_starttls {
-        account.imap_starttls = preset.imap_starttls;
+    if !account.imap_starttls && preset.imap_starttls {
+        account.imap_starttls = true;
     }
-    if account.smtp_host == defaults.smtp_host {
+    if account.smtp_host.is_empty() {
         account.smtp_host = preset.smtp_host.to_string();
     }
-    if account.smtp_port == defaults.smtp_port {
+    if account.smtp_port == default_smtp_port() {
         account.smtp_port = preset.smtp_port;
     }
-    if account.drafts_folder == defaults.drafts_folder {
+    if account.drafts_folder == DEFAULT_DRAFTS_FOLDER {
         account.drafts_folder = preset.drafts_folder.to_string();
     }
 }
@@ -177,6 +189,86 @@ pub fn resolve_password(account: &Account) -> Result<String> {
     )
 }
 
+/// The sections of .corky.toml read by this module, decoded in one pass.
+///
+/// Other sections (contacts, routing, mailboxes) are skipped by the decoder
+/// without being materialised. `[owner]` and `[watch]` are kept as raw
+/// values and converted by their own loaders, so a section that is
+/// incomplete or invalid only fails the loader that needs it.
+#[derive(Debug, Deserialize)]
+struct AccountsFile {
+    #[serde(default)]
+    accounts: HashMap<String, AccountEntry>,
+    #[serde(default)]
+    owner: Option<toml::Value>,
+    #[serde(default)]
+    watch: Option<toml::Value>,
+}
+
+/// An `[accounts]` entry; non-table values decode to `None` and are ignored.
+#[derive(Debug)]
+struct AccountEntry(Option<Account>);
+
+impl<'de> Deserialize<'de> for AccountEntry {
+    fn deserialize<D: serde::Deserializer<'de>>(
+        deserializer: D,
+    ) -> std::result::Result<Self, D::Error> {
+        use serde::de::{self, IgnoredAny, MapAccess, SeqAccess, Visitor};
+
+        struct EntryVisitor;
+
+        impl<'de> Visitor<'de> for EntryVisitor {
+            type Value = AccountEntry;
+
+            fn expecting(&self, f: &mut std::fmt::Formatter) -> std::fmt::Result {
+                f.write_str("an account table")
+            }
+            fn visit_map<A: MapAccess<'de>>(
+                self,
+                map: A,
+            ) -> std::result::Result<AccountEntry, A::Error> {
+                Account::deserialize(de::value::MapAccessDeserializer::new(map))
+                    .map(|a| AccountEntry(Some(a)))
+            }
+            fn visit_seq<A: SeqAccess<'de>>(
+                self,
+                mut seq: A,
+            ) -> std::result::Result<AccountEntry, A::Error> {
+                while seq.next_element::<IgnoredAny>()?.is_some() {}
+                Ok(AccountEntry(None))
+            }
+            fn visit_bool<E: de::Error>(self, _: bool) -> std::result::Result<AccountEntry, E> {
+                Ok(AccountEntry(None))
+            }
+            fn visit_i64<E: de::Error>(self, _: i64) -> std::result::Result<AccountEntry, E> {
+                Ok(AccountEntry(None))
+            }
+            fn visit_u64<E: de::Error>(self, _: u64) -> std::result::Result<AccountEntry, E> {
+                Ok(AccountEntry(None))
+            }
+            fn visit_f64<E: de::Error>(self, _: f64) -> std::result::Result<AccountEntry, E> {
+                Ok(AccountEntry(None))
+            }
+            fn visit_str<E: de::Error>(self, _: &str) -> std::result::Result<AccountEntry, E> {
+                Ok(AccountEntry(None))
+            }
+        }
+
+        deserializer.deserialize_any(EntryVisitor)
+    }
+}
+
+static ACCOUNTS_FILES: Lazy<FileCache<AccountsFile>> = Lazy::new(|| FileCache::new(8));
+
+/// Decode .corky.toml straight into typed sections, reusing the previous
+/// decode while the file's mtime and size are unchanged.
+///
+/// `load_accounts`, `load_owner` and `load_watch_config` all read the same
+/// file; this lets one decode serve every loader in a process.
+fn load_accounts_file(path: &Path) -> Result<Arc<AccountsFile>> {
+    ACCOUNTS_FILES.get_or_parse(path, |content| Ok(toml::from_str(content)?))
+}
+
 /// Parse accounts from .corky.toml → {name: Account} mapping.
 pub fn load_accounts(path: Option<&Path>) -> Result<HashMap<String, Account>> {
     let path = match path {
@@ -186,20 +278,14 @@ pub fn load_accounts(path: Option<&Path>) -> Result<HashMap<String, Account>> {
     if !path.exists() {
         return Ok(HashMap::new());
     }
-    let content = std::fs::read_to_string(&path)?;
-    let raw: toml::Value = toml::from_str(&content)?;
-    let table = raw.as_table().unwrap();
-
-    let Some(toml::Value::Table(accounts_section)) = table.get("accounts") else {
-        return Ok(HashMap::new());
-    };
+    let file = load_accounts_file(&path)?;
 
     let mut result = HashMap::new();
-    for (name, data) in accounts_section {
-        if !data.is_table() {
+    for (name, entry) in &file.accounts {
+        let Some(account) = &entry.0 else {
             continue;
-        }
-        let mut account: Account = data.clone().try_into()?;
+        };
+        let mut account = account.clone();
         apply_preset(&mut account);
         result.insert(name.clone(), account);
     }
@@ -218,16 +304,13 @@ pub fn load_owner(path: Option<&Path>) -> Result<OwnerConfig> {
             path.display()
         );
     }
-    let content = std::fs::read_to_string(&path)?;
-    let raw: toml::Value = toml::from_str(&content)?;
-    let owner_data = raw
-        .get("owner")
-        .ok_or_else(|| {
-            anyhow::anyhow!(
-                "Missing [owner] section in config.\nAdd: [owner]\ngithub_user = \"your-github-username\""
-            )
-        })?;
-    let owner: OwnerConfig = owner_data.clone().try_into()?;
+    let file = load_accounts_file(&path)?;
+    let owner_data = file.owner.clone().ok_or_else(|| {
+        anyhow::anyhow!(
+            "Missing [owner] section in config.\nAdd: [owner]\ngithub_user = \"your-github-username\""
+        )
+    })?;
+    let owner: OwnerConfig = owner_data.try_into()?;
     Ok(owner)
 }
 
@@ -270,31 +353,37 @@ pub fn add_label_to_account(account_name: &str, label: &str, path: Option<&Path>
         bail!("Config not found at {}", path.display());
     }
 
-    // Verify account exists and label isn't already there
-    let accounts = load_accounts(Some(&path))?;
-    let Some(acct) = accounts.get(account_name) else {
+    // Parse once with toml_edit: the same document answers the existence
+    // checks and receives the format-preserving edit.
+    let content = std::fs::read_to_string(&path)?;
+    let mut doc = content.parse::<toml_edit::DocumentMut>()?;
+
+    let mut accounts_table = doc.get_mut("accounts").and_then(|t| t.as_table_like_mut());
+    let Some(acct) = accounts_table
+        .as_deref_mut()
+        .and_then(|t| t.get_mut(account_name))
+        .and_then(|a| a.as_table_like_mut())
+    else {
+        let available: Vec<String> = accounts_table
+            .map(|t| {
+                t.iter()
+                    .filter(|(_, v)| v.is_table_like())
+                    .map(|(k, _)| k.to_string())
+                    .collect()
+            })
+            .unwrap_or_default();
         bail!(
             "Unknown account: {}\nAvailable: {}",
             account_name,
-            accounts.keys().cloned().collect::<Vec<_>>().join(", ")
+            available.join(", ")
         );
     };
-    if acct.labels.contains(&label.to_string()) {
-        return Ok(false);
-    }
 
-    // Format-preserving edit with toml_edit
-    let content = std::fs::read_to_string(&path)?;
-    let mut doc = content.parse::<toml_edit::DocumentMut>()?;
-
-    let labels_array = doc.get_mut("accounts")
-        .and_then(|t| t.get_mut(account_name))
-        .and_then(|t| t.get_mut("labels"));
-
-    if let Some(labels) = labels_array {
-        if let Some(arr) = labels.as_array_mut() {
-            arr.push(label);
+    if let Some(arr) = acct.get_mut("labels").and_then(|l| l.as_array_mut()) {
+        if arr.iter().any(|v| v.as_str() == Some(label)) {
+            return Ok(false);
         }
+        arr.push(label);
     }
 
     std::fs::write(&path, doc.to_string())?;
@@ -321,11 +410,10 @@ pub fn load_watch_config(path: Option<&Path>) -> Result<WatchConfig> {
     if !path.exists() {
         return Ok(WatchConfig::default());
     }
-    let content = std::fs::read_to_string(&path)?;
-    let raw: toml::Value = toml::from_str(&content)?;
-    match raw.get("watch") {
+    let file = load_accounts_file(&path)?;
+    match file.watch.clone() {
         Some(watch_data) => {
-            let config: WatchConfig = watch_data.clone().try_into()?;
+            let config: WatchConfig = watch_data.try_into()?;
             Ok(config)
         }
         None => Ok(WatchConfig::default()),
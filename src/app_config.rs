@@ -44,18 +44,13 @@ pub fn save(config: &toml::Value) -> Result<()> {
     Ok(())
 }
 
-fn read_mailboxes(table: &toml::map::Map<String, toml::Value>) -> toml::map::Map<String, toml::Value> {
-    if let Some(toml::Value::Table(m)) = table.get("mailboxes") {
-        return m.clone();
-    }
-    toml::map::Map::new()
+/// The `[mailboxes]` table, borrowed from the loaded config.
+fn read_mailboxes(config: &toml::Value) -> Option<&toml::map::Map<String, toml::Value>> {
+    config.get("mailboxes")?.as_table()
 }
 
-fn read_default(table: &toml::map::Map<String, toml::Value>) -> Option<String> {
-    if let Some(toml::Value::String(d)) = table.get("default_mailbox") {
-        return Some(d.clone());
-    }
-    None
+fn read_default(config: &toml::Value) -> Option<&str> {
+    config.get("default_mailbox")?.as_str()
 }
 
 /// Resolve a mailbox name to a data directory path.
@@ -67,12 +62,9 @@ fn read_default(table: &toml::map::Map<String, toml::Value>) -> Option<String> {
 /// - No mailboxes configured: return None.
 pub fn resolve_mailbox(name: Option<&str>) -> Result<Option<PathBuf>> {
     let config = load()?;
-    let table = config.as_table().cloned().unwrap_or_default();
-    let mailboxes = read_mailboxes(&table);
-
-    if mailboxes.is_empty() {
+    let Some(mailboxes) = read_mailboxes(&config).filter(|m| !m.is_empty()) else {
         return Ok(None);
-    }
+    };
 
     if let Some(name) = name {
         match mailboxes.get(name) {
@@ -92,8 +84,8 @@ pub fn resolve_mailbox(name: Option<&str>) -> Result<Option<PathBuf>> {
     }
 
     // No name given — try defaults
-    if let Some(default) = read_default(&table) {
-        if let Some(mailbox_val) = mailboxes.get(default.as_str()) {
+    if let Some(default) = read_default(&config) {
+        if let Some(mailbox_val) = mailboxes.get(default) {
             let path = mailbox_path(mailbox_val)?;
             return Ok(Some(path));
         }
@@ -108,7 +100,7 @@ pub fn resolve_mailbox(name: Option<&str>) -> Result<Option<PathBuf>> {
     // Multiple mailboxes, no default
     eprintln!("Multiple mailboxes configured. Use --mailbox NAME or set default_mailbox.");
     eprintln!();
-    for (mname, mconf) in &mailboxes {
+    for (mname, mconf) in mailboxes {
         if let Some(p) = mconf.get("path").and_then(|v| v.as_str()) {
             eprintln!("  {}  {}", mname, p);
         }
@@ -144,14 +136,15 @@ pub fn add_mailbox(name: &str, path: &str) -> Result<()> {
 /// List all configured mailboxes as (name, path, is_default).
 pub fn list_mailboxes() -> Result<Vec<(String, String, bool)>> {
     let config = load()?;
-    let table = config.as_table().cloned().unwrap_or_default();
-    let default = read_default(&table).unwrap_or_default();
+    let default = read_default(&config).unwrap_or_default();
 
-    let mailboxes = read_mailboxes(&table);
+    let Some(mailboxes) = read_mailboxes(&config) else {
+        return Ok(Vec::new());
+    };
 
     let mut result = vec![];
     // Use BTreeMap for sorted output
-    let sorted: BTreeMap<_, _> = mailboxes.into_iter().collect();
+    let sorted: BTreeMap<_, _> = mailboxes.iter().collect();
     for (name, val) in sorted {
         let path = val
             .get("path")
@@ -159,7 +152,7 @@ pub fn list_mailboxes() -> Result<Vec<(String, String, bool)>> {
             .unwrap_or("")
             .to_string();
         let is_default = name == default;
-        result.push((name, path, is_default));
+        result.push((name.clone(), path, is_default));
     }
     Ok(result)
 }
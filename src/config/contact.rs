@@ -7,16 +7,20 @@ use std::path::{Path, PathBuf};
 
 use crate::resolve;
 
+/// A `[contacts.{name}]` entry.
+///
+/// Contacts are read-only once loaded, so the lists are boxed slices: no
+/// spare capacity and one word less per list than a `Vec`.
 #[derive(Debug, Clone, Serialize, Deserialize, Default)]
 pub struct Contact {
     #[serde(default)]
-    pub emails: Vec<String>,
+    pub emails: Box<[String]>,
     /// Explicitly share this contact with these mailboxes (even without conversation match).
     #[serde(default)]
-    pub shared_with: Vec<String>,
+    pub shared_with: Box<[String]>,
     /// Aliases for matching sender names that don't slugify to the directory name.
     #[serde(default)]
-    pub aliases: Vec<String>,
+    pub aliases: Box<[String]>,
 }
 
 /// Load contacts from [contacts.*] in .corky.toml and return {name: Contact} mapping.
@@ -31,22 +35,17 @@ pub fn load_contacts(path: Option<&Path>) -> Result<BTreeMap<String, Contact>> {
     if content.trim().is_empty() {
         return Ok(BTreeMap::new());
     }
-    let raw: toml::Value = toml::from_str(&content)?;
-    let contacts_table = raw
-        .as_table()
-        .and_then(|t| t.get("contacts"))
-        .and_then(|v| v.as_table());
-    match contacts_table {
-        Some(table) => {
-            let mut result = BTreeMap::new();
-            for (name, data) in table {
-                let contact: Contact = data.clone().try_into()?;
-                result.insert(name.clone(), contact);
-            }
-            Ok(result)
-        }
-        None => Ok(BTreeMap::new()),
-    }
+    let file: ContactsFile = toml::from_str(&content)?;
+    Ok(file.contacts)
+}
+
+/// The `[contacts]` section of .corky.toml, decoded straight into `Contact`s.
+///
+/// Other sections are skipped by the decoder without being materialised.
+#[derive(Deserialize)]
+struct ContactsFile {
+    #[serde(default)]
+    contacts: BTreeMap<String, Contact>,
 }
 
 /// Write a single contact to [contacts.{name}] in .corky.toml (format-preserving).
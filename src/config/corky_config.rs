@@ -1,15 +1,18 @@
 //! Unified config type — parse .corky.toml (accounts + routing + mailboxes).
 
 use anyhow::{bail, Result};
+use once_cell::sync::Lazy;
 use serde::{Deserialize, Serialize};
 use std::collections::HashMap;
 use std::path::{Path, PathBuf};
+use std::sync::Arc;
 
 use crate::accounts::{Account, OwnerConfig, WatchConfig};
 use crate::config::contact::Contact;
 use crate::config::topic::TopicConfig;
 use crate::resolve;
 use crate::social::profiles::Profile;
+use crate::util::FileCache;
 
 #[derive(Debug, Clone, Serialize, Deserialize, Default)]
 pub struct CorkyConfig {
@@ -124,6 +127,10 @@ fn default_model() -> String {
     "large-v3-turbo".to_string()
 }
 
+/// Parsed configs, shared by `load_config` and `try_load_config` so commands
+/// that consult the config several times parse it once.
+static CONFIG_FILES: Lazy<FileCache<CorkyConfig>> = Lazy::new(|| FileCache::new(8));
+
 /// Load .corky.toml (or corky.toml) from a given path or resolved location.
 pub fn load_config(path: Option<&Path>) -> Result<CorkyConfig> {
     let path = path
@@ -135,19 +142,25 @@ pub fn load_config(path: Option<&Path>) -> Result<CorkyConfig> {
             path.display()
         );
     }
-    let content = std::fs::read_to_string(&path)?;
-    let config: CorkyConfig = toml::from_str(&content)?;
-    Ok(config)
+    let config = CONFIG_FILES.get_or_parse(&path, |content| Ok(toml::from_str(content)?))?;
+    Ok(CorkyConfig::clone(&config))
 }
 
 /// Try loading config, returning None if the file doesn't exist.
 pub fn try_load_config(path: Option<&Path>) -> Option<CorkyConfig> {
+    try_load_config_shared(path).map(|config| CorkyConfig::clone(&config))
+}
+
+/// [`try_load_config`] without the copy: the cached parse itself, for
+/// callers that only read a section or two.
+pub fn try_load_config_shared(path: Option<&Path>) -> Option<Arc<CorkyConfig>> {
     let path = path
         .map(PathBuf::from)
         .unwrap_or_else(resolve::corky_toml);
     if !path.exists() {
         return None;
     }
-    let content = std::fs::read_to_string(&path).ok()?;
-    toml::from_str(&content).ok()
+    CONFIG_FILES
+        .get_or_parse(&path, |content| Ok(toml::from_str(content)?))
+        .ok()
 }
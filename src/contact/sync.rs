@@ -688,7 +688,7 @@ mod tests {
         config.insert(
             "cl".to_string(),
             Contact {
-                aliases: vec!["Connie Lai".to_string()],
+                aliases: vec!["Connie Lai".to_string()].into(),
                 ..Default::default()
             },
         );
@@ -1,13 +1,10 @@
 //! Migrate legacy `**Key**: value` email drafts to YAML frontmatter format.
 
 use anyhow::Result;
-use once_cell::sync::Lazy;
-use regex::Regex;
 
 use super::EmailDraftMeta;
 use crate::resolve;
-
-static META_RE: Lazy<Regex> = Lazy::new(|| Regex::new(r"(?m)^\*\*(.+?)\*\*:\s*(.+)$").unwrap());
+use crate::util;
 
 /// Migrate all legacy email drafts to YAML frontmatter format.
 pub fn run(dry_run: bool) -> Result<()> {
@@ -125,10 +122,9 @@ fn convert_legacy_to_yaml(content: &str) -> Result<String> {
     let mut in_reply_to: Option<String> = None;
     let mut scheduled_at: Option<chrono::DateTime<chrono::Utc>> = None;
 
-    for cap in META_RE.captures_iter(content) {
-        let key = cap[1].to_string();
-        let val = cap[2].trim().to_string();
-        match key.as_str() {
+    for (key, val) in util::meta_fields(content) {
+        let val = val.trim().to_string();
+        match key {
             "To" => to = val,
             "CC" => cc = Some(val),
             "Status" => status = val.to_lowercase(),
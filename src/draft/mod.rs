@@ -10,16 +10,23 @@ use lettre::message::{Attachment, Mailbox, MultiPart, SinglePart};
 use lettre::transport::smtp::authentication::Credentials;
 use lettre::{Message, SmtpTransport, Transport};
 use once_cell::sync::Lazy;
-use regex::Regex;
+use regex::{Captures, Regex};
 use serde::{Deserialize, Serialize};
 use std::collections::HashMap;
 use std::path::Path;
+use std::sync::Mutex;
 
 use crate::accounts::{
     get_account_for_email, get_default_account, load_accounts, resolve_password,
 };
+use crate::util;
 
-static META_RE: Lazy<Regex> = Lazy::new(|| Regex::new(r"(?m)^\*\*(.+?)\*\*:\s*(.+)$").unwrap());
+static STATUS_RE: Lazy<Regex> = Lazy::new(|| Regex::new(r"(?m)^(\*\*Status\*\*:\s*).+$").unwrap());
+
+/// Passwords from `password_cmd`, keyed by `(user, password_cmd)`, so a batch
+/// of pushes (e.g. `corky schedule run`) runs each command once per process.
+static PASSWORDS: Lazy<Mutex<HashMap<(String, String), String>>> =
+    Lazy::new(|| Mutex::new(HashMap::new()));
 
 const VALID_SEND_STATUSES: &[&str] = &["review", "approved", "scheduled"];
 
@@ -133,40 +140,80 @@ fn parse_yaml_draft(text: &str) -> Result<(EmailDraftMeta, HashMap<String, Strin
 /// - Legacy `**Key**: value` regex format
 pub fn parse_draft(path: &Path) -> Result<(HashMap<String, String>, String, String)> {
     let text = std::fs::read_to_string(path)?;
+    let (meta, subject, body, _attachments) = parse_draft_text(text, path)?;
+    Ok((meta, subject, body))
+}
 
-    if is_yaml_format(&text) {
-        let (_meta_struct, map, subject, body) = parse_yaml_draft(&text)?;
-        return Ok((map, subject, body));
-    }
-
-    // Legacy format
-    let lines: Vec<&str> = text.split('\n').collect();
-
-    let subject = lines
-        .iter()
-        .find_map(|line| {
-            line.strip_prefix("# ")
-                .map(|s| s.trim().to_string())
-        })
-        .unwrap_or_default();
+/// Metadata, subject, body and attachment paths of a draft.
+type DraftParts = (HashMap<String, String>, String, String, Vec<String>);
 
-    let mut meta = HashMap::new();
-    for cap in META_RE.captures_iter(&text) {
-        meta.insert(cap[1].to_string(), cap[2].trim().to_string());
+/// `parse_draft` on already-read text, also returning the attachment paths
+/// (YAML drafts only). `path` is only used in error messages.
+///
+/// A legacy draft's body is cut out of `text`'s own buffer rather than
+/// copied, so a long quoted thread is held in memory once.
+fn parse_draft_text(mut text: String, path: &Path) -> Result<DraftParts> {
+    if is_yaml_format(&text) {
+        let (meta_struct, map, subject, body) = parse_yaml_draft(&text)?;
+        return Ok((map, subject, body, meta_struct.attachments));
     }
 
-    if !meta.contains_key("To") {
+    let draft = parse_legacy(&text);
+    if !draft.meta.contains_key("To") {
         bail!("Draft is missing **To**: field: {}", path.display());
     }
-
-    // Body is everything after the first ---
-    let body_start = lines.iter().position(|line| line.trim() == "---");
-    let Some(body_start) = body_start else {
+    let Some(body) = draft.body else {
         bail!("Draft is missing --- separator: {}", path.display());
     };
+    // The body is a suffix of `text`: locate its trimmed span by length.
+    let start = text.len() - body.trim_start().len();
+    let end = text.len() - (body.len() - body.trim_end().len());
+    let (meta, subject) = (draft.meta, draft.subject);
+    if start >= end {
+        return Ok((meta, subject, String::new(), Vec::new()));
+    }
+    text.truncate(end);
+    text.drain(..start);
+    Ok((meta, subject, text, Vec::new()))
+}
 
-    let body = lines[body_start + 1..].join("\n").trim().to_string();
-    Ok((meta, subject, body))
+/// A legacy `**Key**: value` draft split into its parts.
+pub(crate) struct LegacyDraft<'a> {
+    /// First `# ` heading in the header, or empty.
+    pub subject: String,
+    /// Metadata fields of the header, values trimmed.
+    pub meta: HashMap<String, String>,
+    /// Everything after the first `---` line; `None` without one.
+    pub body: Option<&'a str>,
+}
+
+/// Split a legacy draft. One pass up to the first `---` line finds the
+/// subject and where the header ends; metadata is only read from the header.
+pub(crate) fn parse_legacy(text: &str) -> LegacyDraft<'_> {
+    let mut subject = None;
+    let mut separator = None;
+    let mut pos = 0;
+    for line in text.split('\n') {
+        let next = pos + line.len() + 1;
+        if line.trim() == "---" {
+            separator = Some((pos, next.min(text.len())));
+            break;
+        }
+        if subject.is_none() {
+            subject = line.strip_prefix("# ").map(|s| s.trim().to_string());
+        }
+        pos = next;
+    }
+
+    let header = &text[..separator.map_or(text.len(), |(start, _)| start)];
+    let meta = util::meta_fields(header)
+        .map(|(key, value)| (key.to_string(), value.trim().to_string()))
+        .collect();
+    LegacyDraft {
+        subject: subject.unwrap_or_default(),
+        meta,
+        body: separator.map(|(_, body_start)| &text[body_start..]),
+    }
 }
 
 /// Parse a draft markdown file content as YAML, returning the typed struct.
@@ -257,17 +304,12 @@ fn push_to_drafts(
     password: &str,
     drafts_folder: &str,
 ) -> Result<()> {
-    let mut tls_builder = native_tls::TlsConnector::builder();
-    if starttls || imap_host == "127.0.0.1" || imap_host == "localhost" {
-        tls_builder.danger_accept_invalid_certs(true);
-        tls_builder.danger_accept_invalid_hostnames(true);
-    }
-    let tls = tls_builder.build()?;
+    let tls = util::imap_tls_connector(imap_host, starttls)?;
 
     let client = if starttls {
-        imap::connect_starttls((imap_host, imap_port), imap_host, &tls)?
+        imap::connect_starttls((imap_host, imap_port), imap_host, tls)?
     } else {
-        imap::connect((imap_host, imap_port), imap_host, &tls)?
+        imap::connect((imap_host, imap_port), imap_host, tls)?
     };
 
     let mut session = client.login(user, password).map_err(|e| e.0)?;
@@ -313,9 +355,8 @@ fn update_draft_status(path: &Path, new_status: &str) -> Result<()> {
         let updated = format!("---\n{}{}", new_yaml, rest);
         std::fs::write(path, updated)?;
     } else {
-        let re = Regex::new(r"(?m)^(\*\*Status\*\*:\s*).+$")?;
-        let updated = re
-            .replace(&text, format!("${{1}}{}", new_status))
+        let updated = STATUS_RE
+            .replace(&text, |cap: &Captures| format!("{}{}", &cap[1], new_status))
             .to_string();
         std::fs::write(path, updated)?;
     }
@@ -323,6 +364,20 @@ fn update_draft_status(path: &Path, new_status: &str) -> Result<()> {
     Ok(())
 }
 
+/// `resolve_password`, memoized for accounts that use `password_cmd`.
+fn cached_password(acct: &crate::accounts::Account) -> Result<String> {
+    if !acct.password.is_empty() || acct.password_cmd.is_empty() {
+        return resolve_password(acct);
+    }
+    let key = (acct.user.clone(), acct.password_cmd.clone());
+    if let Some(pwd) = PASSWORDS.lock().unwrap().get(&key) {
+        return Ok(pwd.clone());
+    }
+    let pwd = resolve_password(acct)?;
+    PASSWORDS.lock().unwrap().insert(key, pwd.clone());
+    Ok(pwd)
+}
+
 /// Resolve sending account from draft metadata.
 ///
 /// Supports credential bubbling: if the draft lives inside a `mailboxes/` subtree,
@@ -339,7 +394,7 @@ fn resolve_account(
     if let Some(acct_name) = meta.get("Account") {
         if !acct_name.is_empty() {
             if let Some(acct) = accounts.get(acct_name) {
-                let pwd = resolve_password(acct)?;
+                let pwd = cached_password(acct)?;
                 return Ok((acct_name.clone(), acct.clone(), pwd));
             }
         }
@@ -349,7 +404,7 @@ fn resolve_account(
     if let Some(from_addr) = meta.get("From") {
         if !from_addr.is_empty() {
             if let Some((name, acct)) = get_account_for_email(&accounts, from_addr) {
-                let pwd = resolve_password(&acct)?;
+                let pwd = cached_password(&acct)?;
                 return Ok((name, acct, pwd));
             }
         }
@@ -357,7 +412,7 @@ fn resolve_account(
 
     // Fall back to default from local config
     if let Ok((name, acct)) = get_default_account(&accounts) {
-        let pwd = resolve_password(&acct)?;
+        let pwd = cached_password(&acct)?;
         return Ok((name, acct, pwd));
     }
 
@@ -385,7 +440,7 @@ fn bubble_credentials(
         if config_path.exists() {
             if let Ok(parent_accounts) = load_accounts(Some(&config_path)) {
                 if let Some((name, acct)) = get_account_for_email(&parent_accounts, from_addr) {
-                    if let Ok(pwd) = resolve_password(&acct) {
+                    if let Ok(pwd) = cached_password(&acct) {
                         return Some((name, acct, pwd));
                     }
                 }
@@ -405,16 +460,9 @@ pub fn run(file: &Path, send: bool) -> Result<()> {
         bail!("File not found: {}", file.display());
     }
 
+    // Read and parse once: the YAML frontmatter carries the attachments too
     let text = std::fs::read_to_string(file)?;
-    let attachments = if is_yaml_format(&text) {
-        parse_draft_yaml(&text)
-            .map(|m| m.attachments)
-            .unwrap_or_default()
-    } else {
-        Vec::new()
-    };
-
-    let (meta, subject, body) = parse_draft(file)?;
+    let (meta, subject, body, attachments) = parse_draft_text(text, file)?;
 
     // Validate Status for --send
     let status = meta
@@ -591,4 +639,18 @@ mod tests {
         assert_eq!(subject, "Hello");
         assert!(body.contains("Body here"));
     }
+
+    #[test]
+    fn test_cached_password_runs_command_once() {
+        let dir = tempfile::tempdir().unwrap();
+        let log = dir.path().join("calls");
+        let acct = crate::accounts::Account {
+            user: "cache@example.com".to_string(),
+            password_cmd: format!("echo x >> '{}'; echo secret", log.display()),
+            ..Default::default()
+        };
+        assert_eq!(cached_password(&acct).unwrap(), "secret");
+        assert_eq!(cached_password(&acct).unwrap(), "secret");
+        assert_eq!(std::fs::read_to_string(&log).unwrap().lines().count(), 1);
+    }
 }
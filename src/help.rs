@@ -1,6 +1,7 @@
 //! Command reference for corky.
 
 use anyhow::Result;
+use std::fmt::Write;
 
 const COMMANDS: &[(&str, &str)] = &[
     ("init --user EMAIL [PATH]", "Initialize a new project directory"),
@@ -45,45 +46,67 @@ const DEV_COMMANDS: &[(&str, &str)] = &[
     ("cargo fmt", "Format"),
 ];
 
+/// Every table, in display order, for filtered lookups.
+const ALL_COMMANDS: &[&[(&str, &str)]] = &[COMMANDS, MAILBOX_COMMANDS, DEV_COMMANDS];
+
+const COMMANDS_W: usize = name_width(COMMANDS);
+const MAILBOX_COMMANDS_W: usize = name_width(MAILBOX_COMMANDS);
+const DEV_COMMANDS_W: usize = name_width(DEV_COMMANDS);
+
 pub fn run(filter: Option<&str>) -> Result<()> {
     if let Some(filter) = filter {
         if filter != "--dev" {
-            let all_cmds: Vec<(&str, &str)> = COMMANDS
-                .iter()
-                .chain(MAILBOX_COMMANDS.iter())
-                .chain(DEV_COMMANDS.iter())
-                .copied()
-                .collect();
-            let matches: Vec<_> = all_cmds
+            // Walk the static tables in place; only the matches are collected.
+            let matches: Vec<(&str, &str)> = ALL_COMMANDS
                 .iter()
+                .flat_map(|table| table.iter())
                 .filter(|(name, _)| name.contains(filter))
+                .copied()
                 .collect();
             if matches.is_empty() {
                 println!("No command matching '{}'", filter);
                 std::process::exit(1);
             }
-            print_table(&matches.iter().map(|&&(a, b)| (a, b)).collect::<Vec<_>>());
+            let mut out = String::new();
+            write_table(&mut out, &matches, name_width(&matches))?;
+            print!("{}", out);
             return Ok(());
         }
     }
 
-    println!("corky commands\n");
-    print_table(COMMANDS);
+    // Render the whole reference first and print it in one write.
+    let mut out = String::new();
+    writeln!(out, "corky commands\n")?;
+    write_table(&mut out, COMMANDS, COMMANDS_W)?;
 
-    println!("\nmailbox commands (alias: mb)\n");
-    print_table(MAILBOX_COMMANDS);
+    writeln!(out, "\nmailbox commands (alias: mb)\n")?;
+    write_table(&mut out, MAILBOX_COMMANDS, MAILBOX_COMMANDS_W)?;
 
     if filter == Some("--dev") || filter.is_none() {
-        println!("\ndev commands\n");
-        print_table(DEV_COMMANDS);
+        writeln!(out, "\ndev commands\n")?;
+        write_table(&mut out, DEV_COMMANDS, DEV_COMMANDS_W)?;
     }
+    print!("{}", out);
 
     Ok(())
 }
 
-fn print_table(rows: &[(&str, &str)]) {
-    let name_w = rows.iter().map(|(n, _)| n.len()).max().unwrap_or(0);
+/// Widest command name in `rows`; evaluated at compile time for the tables.
+const fn name_width(rows: &[(&str, &str)]) -> usize {
+    let mut width = 0;
+    let mut i = 0;
+    while i < rows.len() {
+        if rows[i].0.len() > width {
+            width = rows[i].0.len();
+        }
+        i += 1;
+    }
+    width
+}
+
+fn write_table(out: &mut String, rows: &[(&str, &str)], name_w: usize) -> std::fmt::Result {
     for (name, desc) in rows {
-        println!("  {:<width$}  {}", name, desc, width = name_w);
+        writeln!(out, "  {:<width$}  {}", name, desc, width = name_w)?;
     }
+    Ok(())
 }
@@ -182,7 +182,6 @@ pub fn run(
     );
 
     // 8. Provider-specific guidance
-    let presets = provider_presets();
     if provider == "gmail" && password_cmd.is_empty() {
         println!();
         println!("Gmail setup:");
@@ -206,7 +205,8 @@ pub fn run(
         if provider == "gmail" && password_cmd.is_empty() {
             println!("  - Set up app password or OAuth (see above)");
         }
-        if !presets.contains_key(provider) && provider == "imap" {
+        // Presets are only consulted (and built) for a plain IMAP account
+        if provider == "imap" && !provider_presets().contains_key(provider) {
             println!("  - Add imap_host, smtp_host to mail/.corky.toml");
         }
         println!("  - Run: corky sync");
@@ -1,11 +1,14 @@
 //! Add a new mailbox: plain directory or shared GitHub repo (submodule).
 
 use anyhow::Result;
+use std::collections::HashSet;
+use std::path::Path;
 
 use crate::accounts::load_owner;
 use crate::resolve;
 use crate::util::run_cmd_checked;
 
+use super::github::GitHub;
 use super::templates::{generate_agents_md, generate_readme_md};
 
 #[allow(clippy::too_many_arguments)]
@@ -54,127 +57,74 @@ pub fn run(
         let repo_name = format!("to-{}", gh_user.to_lowercase());
         let repo_full = format!("{}/{}", org, repo_name);
 
-        // 1. Create GitHub repo
-        let visibility = if public { "--public" } else { "--private" };
-        println!(
-            "Creating GitHub repo: {} ({})",
-            repo_full,
-            visibility.trim_start_matches("--")
-        );
-        run_cmd_checked(&["gh", "repo", "create", &repo_full, visibility, "--confirm"])?;
-
-        // 2. Add collaborator if not --pat
-        if !pat {
-            println!("Adding {} as collaborator on {}", gh_user, repo_full);
-            run_cmd_checked(&[
-                "gh",
-                "api",
-                &format!("repos/{}/collaborators/{}", repo_full, gh_user),
-                "-X",
-                "PUT",
-                "--silent",
-            ])?;
-        } else {
-            println!();
-            println!("PAT access mode selected. The collaborator should:");
-            println!("  1. Go to https://github.com/settings/personal-access-tokens/new");
-            println!("  2. Create a fine-grained PAT scoped to: {}", repo_full);
-            println!("  3. Grant 'Contents' read/write permission");
-            println!(
-                "  4. Use the PAT to clone: https://github.com/{}.git",
-                repo_full
-            );
-            println!();
-        }
-
-        // 3. Initialize the shared repo
-        println!("Initializing shared repo contents...");
-
-        let tmpdir = tempfile::tempdir()?;
-        let tmp = tmpdir.path();
-
-        run_cmd_checked(&["gh", "repo", "clone", &repo_full, &tmp.to_string_lossy()])?;
-
-        // AGENTS.md + CLAUDE.md symlink + README.md
-        std::fs::write(
-            tmp.join("AGENTS.md"),
-            generate_agents_md(mb_display, owner_name),
-        )?;
-        #[cfg(unix)]
-        std::os::unix::fs::symlink("AGENTS.md", tmp.join("CLAUDE.md"))?;
-        std::fs::write(
-            tmp.join("README.md"),
-            generate_readme_md(mb_display, owner_name),
-        )?;
+        // 1. Create GitHub repo (one API client for this and step 2)
+        let gh = GitHub::from_gh()?;
+        let visibility = if public { "public" } else { "private" };
+        println!("Creating GitHub repo: {} ({})", repo_full, visibility);
+        gh.create_repo(org, &owner.github_user, &repo_name, !public)?;
 
-        // .gitignore
-        std::fs::write(
-            tmp.join(".gitignore"),
-            "AGENTS.local.md\nCLAUDE.local.md\n__pycache__/\n",
-        )?;
+        // 2. Add collaborator if not --pat. The invite does not depend on the
+        // repo contents, so it runs while step 3 sets them up and pushes.
+        let repo_str = mb_dir.to_string_lossy().to_string();
+        let repo_url = format!("git@github.com:{}.git", repo_full);
+        std::thread::scope(|s| -> Result<()> {
+            let invite = if !pat {
+                println!("Adding {} as collaborator on {}", gh_user, repo_full);
+                Some(s.spawn(|| gh.add_collaborator(&repo_full, gh_user)))
+            } else {
+                println!();
+                println!("PAT access mode selected. The collaborator should:");
+                println!("  1. Go to https://github.com/settings/personal-access-tokens/new");
+                println!("  2. Create a fine-grained PAT scoped to: {}", repo_full);
+                println!("  3. Grant 'Contents' read/write permission");
+                println!(
+                    "  4. Use the PAT to clone: https://github.com/{}.git",
+                    repo_full
+                );
+                println!();
+                None
+            };
 
-        // voice.md
-        let voice_file = resolve::voice_md();
-        if voice_file.exists() {
-            std::fs::copy(&voice_file, tmp.join("voice.md"))?;
-        }
+            // 3. Initialize the shared repo
+            println!("Initializing shared repo contents...");
+            let init = init_shared_repo(&mb_dir, &repo_url, mb_display, owner_name);
 
-        // .claude/skills/corky/
-        crate::skill::install_at(Some(tmp))?;
-
-        // directories
-        std::fs::create_dir_all(tmp.join("conversations"))?;
-        std::fs::write(tmp.join("conversations/.gitkeep"), "")?;
-        std::fs::create_dir_all(tmp.join("drafts"))?;
-        std::fs::write(tmp.join("drafts/.gitkeep"), "")?;
-
-        // commit and push
-        let tmp_str = tmp.to_string_lossy().to_string();
-        run_cmd_checked(&["git", "-C", &tmp_str, "add", "-A"])?;
-        run_cmd_checked(&[
-            "git",
-            "-C",
-            &tmp_str,
-            "commit",
-            "-m",
-            &format!("Initialize shared mailbox for {}", mb_display),
-        ])?;
-        run_cmd_checked(&["git", "-C", &tmp_str, "push"])?;
-
-        // 4. Add as git submodule
-        let repo_url = format!("git@github.com:{}.git", repo_full);
-        let sub_path = mb_dir.to_string_lossy().to_string();
-        println!("Adding submodule: {} -> {}", sub_path, repo_url);
-        run_cmd_checked(&["git", "submodule", "add", &repo_url, &sub_path])?;
+            let invited = match invite {
+                Some(invite) => invite.join().expect("collaborator invite panicked"),
+                None => Ok(()),
+            };
+            if let Err(e) = init {
+                // A partial checkout would stop a rerun at the "already
+                // exists" check above.
+                let _ = std::fs::remove_dir_all(&mb_dir);
+                if let Err(invite_err) = invited {
+                    eprintln!("Adding collaborator {} also failed: {}", gh_user, invite_err);
+                }
+                return Err(e);
+            }
+            invited
+        })?;
+
+        // 4. Add as git submodule. The path already holds a checkout, so
+        // git stages it instead of cloning; absorbgitdirs then moves its
+        // .git into .git/modules like a regular submodule clone.
+        println!("Adding submodule: {} -> {}", repo_str, repo_url);
+        run_cmd_checked(&["git", "submodule", "add", &repo_url, &repo_str])?;
+        run_cmd_checked(&["git", "submodule", "absorbgitdirs", &repo_str])?;
     } else {
         // Plain directory mailbox
         println!("Creating mailbox: {}", mb_dir.display());
-        for sub in &["conversations", "drafts", "contacts"] {
-            let d = mb_dir.join(sub);
-            std::fs::create_dir_all(&d)?;
-            std::fs::write(d.join(".gitkeep"), "")?;
-        }
-
-        // AGENTS.md + CLAUDE.md symlink + README.md
-        std::fs::write(
-            mb_dir.join("AGENTS.md"),
-            generate_agents_md(mb_display, owner_name),
-        )?;
-        #[cfg(unix)]
-        std::os::unix::fs::symlink("AGENTS.md", mb_dir.join("CLAUDE.md"))?;
-        std::fs::write(
-            mb_dir.join("README.md"),
-            generate_readme_md(mb_display, owner_name),
+        std::fs::create_dir_all(&mb_dir)?;
+        write_skeleton(
+            &mb_dir,
+            &[
+                ("conversations/.gitkeep", ""),
+                ("drafts/.gitkeep", ""),
+                ("contacts/.gitkeep", ""),
+            ],
         )?;
 
-        // voice.md
-        let voice_file = resolve::voice_md();
-        if voice_file.exists() {
-            std::fs::copy(&voice_file, mb_dir.join("voice.md"))?;
-        }
-
-        // .claude/skills/corky/
-        crate::skill::install_at(Some(&mb_dir))?;
+        write_mailbox_files(&mb_dir, mb_display, owner_name)?;
     }
 
     // 5. Update .corky.toml with routing and mailbox config
@@ -197,6 +147,95 @@ pub fn run(
     Ok(())
 }
 
+/// Build the first commit of a freshly created (empty) shared repo at `repo`
+/// and push it to `repo_url`.
+///
+/// There is nothing to clone yet, so the repo is initialized in place at the
+/// mailbox path; `run` then registers that checkout as the submodule, or
+/// removes it if this fails.
+fn init_shared_repo(
+    repo: &Path,
+    repo_url: &str,
+    display_name: &str,
+    owner_name: &str,
+) -> Result<()> {
+    let repo_str = repo.to_string_lossy().to_string();
+    std::fs::create_dir_all(repo)?;
+
+    run_cmd_checked(&["git", "init", "-q", "-b", "main", &repo_str])?;
+    run_cmd_checked(&["git", "-C", &repo_str, "remote", "add", "origin", repo_url])?;
+
+    write_mailbox_files(repo, display_name, owner_name)?;
+
+    write_skeleton(
+        repo,
+        &[
+            (
+                ".gitignore",
+                "AGENTS.local.md\nCLAUDE.local.md\n__pycache__/\n",
+            ),
+            ("conversations/.gitkeep", ""),
+            ("drafts/.gitkeep", ""),
+        ],
+    )?;
+
+    // commit and push
+    run_cmd_checked(&["git", "-C", &repo_str, "add", "-A"])?;
+    run_cmd_checked(&[
+        "git",
+        "-C",
+        &repo_str,
+        "commit",
+        "-m",
+        &format!("Initialize shared mailbox for {}", display_name),
+    ])?;
+    run_cmd_checked(&["git", "-C", &repo_str, "push", "-u", "origin", "main"])?;
+    Ok(())
+}
+
+/// Write `files` (paths relative to the existing directory `root`).
+///
+/// The layout is known up front, so each subdirectory is made with one
+/// `mkdir` the first time it is needed instead of a `create_dir_all`
+/// (stat + mkdir) per file.
+fn write_skeleton(root: &Path, files: &[(&str, &str)]) -> Result<()> {
+    let mut made: HashSet<&Path> = HashSet::new();
+    for (rel, content) in files {
+        let rel = Path::new(rel);
+        if let Some(parent) = rel.parent().filter(|p| !p.as_os_str().is_empty()) {
+            if made.insert(parent) {
+                std::fs::create_dir(root.join(parent))?;
+            }
+        }
+        std::fs::write(root.join(rel), content)?;
+    }
+    Ok(())
+}
+
+/// Write the files every new mailbox starts with: AGENTS.md, the CLAUDE.md
+/// symlink, README.md, a copy of voice.md and the corky skill.
+fn write_mailbox_files(dir: &Path, display_name: &str, owner_name: &str) -> Result<()> {
+    std::fs::write(
+        dir.join("AGENTS.md"),
+        generate_agents_md(display_name, owner_name),
+    )?;
+    #[cfg(unix)]
+    std::os::unix::fs::symlink("AGENTS.md", dir.join("CLAUDE.md"))?;
+    std::fs::write(
+        dir.join("README.md"),
+        generate_readme_md(display_name, owner_name),
+    )?;
+
+    let voice_file = resolve::voice_md();
+    if voice_file.exists() {
+        std::fs::copy(&voice_file, dir.join("voice.md"))?;
+    }
+
+    // .claude/skills/corky/
+    crate::skill::install_at(Some(dir))?;
+    Ok(())
+}
+
 /// Add routing and mailbox entries to .corky.toml.
 fn update_config(name: &str, labels: &[String], account: &str) -> Result<()> {
     let config_path = resolve::corky_toml();
@@ -2,17 +2,68 @@
 
 use anyhow::{bail, Result};
 use once_cell::sync::Lazy;
-use regex::Regex;
-use std::path::PathBuf;
+use regex::bytes::Regex;
+use serde::{Deserialize, Serialize};
+use std::collections::HashMap;
+use std::fs::File;
+use std::io::{Read, Seek, SeekFrom};
+use std::path::{Path, PathBuf};
+use std::time::UNIX_EPOCH;
 
 use crate::resolve;
 
-static SENDER_RE: Lazy<Regex> =
-    Lazy::new(|| Regex::new(r"(?m)^## (.+?) \u{2014}").unwrap());
-static DATE_RE: Lazy<Regex> =
-    Lazy::new(|| Regex::new(r"\*\*Last updated\*\*:\s*(\S+)").unwrap());
-static LABELS_RE: Lazy<Regex> =
-    Lazy::new(|| Regex::new(r"\*\*Labels?\*\*:\s*(.+)").unwrap());
+static META_RE: Lazy<Regex> = Lazy::new(|| {
+    Regex::new(r"\*\*Last updated\*\*:\s*(?P<date>\S+)|\*\*Labels?\*\*:\s*(?P<labels>.+)").unwrap()
+});
+
+/// Block size for reading thread files backwards.
+const TAIL_CHUNK: u64 = 8 * 1024;
+
+/// Upper bound on threads used to scan thread files.
+const MAX_SCAN_WORKERS: usize = 32;
+
+/// Scan result for one thread file, reusable while its mtime and size match.
+#[derive(Debug, Clone, Serialize, Deserialize)]
+struct ThreadScan {
+    mtime_ns: u64,
+    size: u64,
+    sender: String,
+    date: String,
+    labels: String,
+}
+
+/// Persisted `ThreadScan`s keyed by thread file path.
+#[derive(Default)]
+struct ScanCache {
+    entries: HashMap<PathBuf, ThreadScan>,
+    dirty: bool,
+}
+
+impl ScanCache {
+    /// Load the cache; a missing or unreadable file yields an empty cache.
+    fn load(path: &Path) -> Self {
+        let entries = std::fs::read(path)
+            .ok()
+            .and_then(|data| serde_json::from_slice(&data).ok())
+            .unwrap_or_default();
+        Self {
+            entries,
+            dirty: false,
+        }
+    }
+
+    /// Write the cache if it changed, via a temp file and rename so a
+    /// concurrent run never reads a partial file.
+    fn save(&self, path: &Path) -> Result<()> {
+        if !self.dirty {
+            return Ok(());
+        }
+        let tmp = path.with_extension("json.tmp");
+        std::fs::write(&tmp, serde_json::to_vec(&self.entries)?)?;
+        std::fs::rename(&tmp, path)?;
+        Ok(())
+    }
+}
 
 /// Scope for unanswered thread search.
 pub enum Scope {
@@ -34,73 +85,199 @@ impl Scope {
     }
 }
 
-fn last_sender(text: &str) -> String {
-    SENDER_RE
-        .captures_iter(text)
-        .last()
-        .map(|cap| cap[1].trim().to_string())
+/// Em dash separating sender and date in a `## Sender — Date` heading.
+const HEADING_SEP: &[u8] = " \u{2014}".as_bytes();
+
+/// Sender of the last `## Sender — Date` heading, scanning lines from the end.
+///
+/// Works on raw bytes so only the sender slice is ever UTF-8 decoded.
+fn last_sender(text: &[u8]) -> String {
+    text.split(|&b| b == b'\n')
+        .rev()
+        .find_map(|line| {
+            let rest = line.strip_prefix(b"## ")?;
+            // The sender is at least one character long. The separator
+            // starts with a space, which never occurs inside a multi-byte
+            // character, so skipping one byte is enough.
+            let end = 1 + rest
+                .get(1..)?
+                .windows(HEADING_SEP.len())
+                .position(|w| w == HEADING_SEP)?;
+            Some(String::from_utf8_lossy(&rest[..end]).trim().to_string())
+        })
         .unwrap_or_default()
 }
 
-fn thread_date(text: &str) -> String {
-    DATE_RE
-        .captures(text)
-        .map(|cap| cap[1].to_string())
-        .unwrap_or_default()
+/// First `**Last updated**` date and `**Labels**` value, found in one pass.
+fn thread_meta(text: &[u8]) -> (String, String) {
+    let mut date = None;
+    let mut labels = None;
+    for cap in META_RE.captures_iter(text) {
+        if let Some(m) = cap.name("date") {
+            date.get_or_insert_with(|| String::from_utf8_lossy(m.as_bytes()).to_string());
+        } else if let Some(m) = cap.name("labels") {
+            labels.get_or_insert_with(|| String::from_utf8_lossy(m.as_bytes()).trim().to_string());
+        }
+        if date.is_some() && labels.is_some() {
+            break;
+        }
+    }
+    (date.unwrap_or_default(), labels.unwrap_or_default())
 }
 
-fn thread_labels(text: &str) -> String {
-    LABELS_RE
-        .captures(text)
-        .map(|cap| cap[1].trim().to_string())
-        .unwrap_or_default()
+/// Read the fields `scan_dir` needs from a thread file: (sender, date, labels).
+///
+/// The sender is the last `## Sender —` heading, so large files are read
+/// backwards in `TAIL_CHUNK` blocks until one turns up instead of being
+/// loaded whole. Date and labels come from the metadata block at the top.
+/// Files no larger than two blocks are read in one go. Everything is matched
+/// as bytes, so the file is never UTF-8 validated as a whole.
+fn scan_thread(path: &Path) -> Result<(String, String, String)> {
+    let mut file = File::open(path)?;
+    let len = file.metadata()?.len();
+    if len <= 2 * TAIL_CHUNK {
+        let mut text = Vec::with_capacity(len as usize);
+        file.read_to_end(&mut text)?;
+        let (date, labels) = thread_meta(&text);
+        return Ok((last_sender(&text), date, labels));
+    }
+
+    let mut head = vec![0u8; TAIL_CHUNK as usize];
+    file.read_exact(&mut head)?;
+    let (date, labels) = thread_meta(&head);
+
+    let mut sender = String::new();
+    let mut carry: Vec<u8> = Vec::new();
+    let mut pos = len;
+    while pos > 0 && sender.is_empty() {
+        let start = pos.saturating_sub(TAIL_CHUNK);
+        let mut window = vec![0u8; (pos - start) as usize];
+        file.seek(SeekFrom::Start(start))?;
+        file.read_exact(&mut window)?;
+        window.extend_from_slice(&carry);
+        pos = start;
+        // The first line may be cut off mid-way; hold it back so the next
+        // block completes it.
+        let split = if pos == 0 {
+            0
+        } else {
+            window
+                .iter()
+                .position(|&b| b == b'\n')
+                .map_or(window.len(), |i| i + 1)
+        };
+        sender = last_sender(&window[split..]);
+        window.truncate(split);
+        carry = window;
+    }
+
+    Ok((sender, date, labels))
+}
+
+/// Scan `path`, or reuse its cached result if mtime and size are unchanged.
+/// The flag is true when the file had to be rescanned.
+fn scan_cached(path: &Path, cache: &ScanCache) -> Result<(ThreadScan, bool)> {
+    let meta = std::fs::metadata(path)?;
+    let mtime_ns = meta
+        .modified()?
+        .duration_since(UNIX_EPOCH)
+        .map_or(0, |d| d.as_nanos() as u64);
+    let size = meta.len();
+    if let Some(hit) = cache.entries.get(path) {
+        if hit.mtime_ns == mtime_ns && hit.size == size {
+            return Ok((hit.clone(), false));
+        }
+    }
+    let (sender, date, labels) = scan_thread(path)?;
+    let scan = ThreadScan {
+        mtime_ns,
+        size,
+        sender,
+        date,
+        labels,
+    };
+    Ok((scan, true))
+}
+
+/// Run `scan_cached` over `files` on a pool of scoped threads.
+///
+/// The scan is I/O-bound with no cross-file state, so each worker takes a
+/// contiguous slice; joining in spawn order keeps results aligned with `files`.
+fn scan_files(files: &[PathBuf], cache: &ScanCache) -> Result<Vec<(ThreadScan, bool)>> {
+    let workers = std::thread::available_parallelism()
+        .map_or(1, |n| n.get() * 4)
+        .clamp(1, MAX_SCAN_WORKERS);
+    let per_worker = files.len().div_ceil(workers).max(1);
+    std::thread::scope(|s| {
+        let handles: Vec<_> = files
+            .chunks(per_worker)
+            .map(|chunk| {
+                s.spawn(move || {
+                    chunk
+                        .iter()
+                        .map(|p| scan_cached(p, cache))
+                        .collect::<Result<Vec<_>>>()
+                })
+            })
+            .collect();
+        let mut results = Vec::with_capacity(files.len());
+        for handle in handles {
+            results.extend(handle.join().expect("scan worker panicked")?);
+        }
+        Ok(results)
+    })
 }
 
 /// Scan a conversations directory and return unanswered threads.
 /// Each entry: (date, labels, filename, sender).
+///
+/// Unchanged files are served from `cache`; entries for files under `dir`
+/// are replaced with this scan's results, dropping deleted threads.
 fn scan_dir(
-    dir: &std::path::Path,
+    dir: &Path,
     from_lower: &str,
+    cache: &mut ScanCache,
 ) -> Result<Vec<(String, String, String, String)>> {
     let mut results = Vec::new();
     if !dir.is_dir() {
         return Ok(results);
     }
 
+    // Directory order is fine here: `run` sorts the (much smaller) result.
     let mut md_files = Vec::new();
     collect_md_files(dir, &mut md_files)?;
-    md_files.sort();
 
-    for thread_file in &md_files {
-        let text = std::fs::read_to_string(thread_file)?;
-        let sender = last_sender(&text);
+    let scanned = scan_files(&md_files, cache)?;
+    let before = cache.entries.len();
+    cache.entries.retain(|path, _| !path.starts_with(dir));
+    let removed = before - cache.entries.len();
+    if removed != md_files.len() || scanned.iter().any(|(_, fresh)| *fresh) {
+        cache.dirty = true;
+    }
+    for (thread_file, (scan, _)) in md_files.iter().zip(scanned) {
+        let sender = &scan.sender;
         if !sender.is_empty() && !sender.to_lowercase().contains(from_lower) {
-            let labels = {
-                let l = thread_labels(&text);
-                if l.is_empty() {
-                    thread_file
-                        .parent()
-                        .and_then(|p| p.file_name())
-                        .map(|n| n.to_string_lossy().to_string())
-                        .unwrap_or_default()
-                } else {
-                    l
-                }
+            let labels = if scan.labels.is_empty() {
+                thread_file
+                    .parent()
+                    .and_then(|p| p.file_name())
+                    .map(|n| n.to_string_lossy().to_string())
+                    .unwrap_or_default()
+            } else {
+                scan.labels.clone()
             };
-            let date = {
-                let d = thread_date(&text);
-                if d.is_empty() {
-                    "unknown".to_string()
-                } else {
-                    d
-                }
+            let date = if scan.date.is_empty() {
+                "unknown".to_string()
+            } else {
+                scan.date.clone()
             };
             let filename = thread_file
                 .file_name()
                 .map(|n| n.to_string_lossy().to_string())
                 .unwrap_or_default();
-            results.push((date, labels, filename, sender));
+            results.push((date, labels, filename, sender.clone()));
         }
+        cache.entries.insert(thread_file.clone(), scan);
     }
 
     Ok(results)
@@ -162,14 +339,16 @@ pub fn run(scope: Scope, from_name: &str) -> Result<()> {
     let multi = dirs.len() > 1;
 
     let mut total = 0usize;
+    let cache_file = resolve::unanswered_cache_file();
+    let mut cache = ScanCache::load(&cache_file);
 
     for (label, dir) in &dirs {
-        let mut unanswered = scan_dir(dir, &from_lower)?;
+        let mut unanswered = scan_dir(dir, &from_lower, &mut cache)?;
         if unanswered.is_empty() {
             continue;
         }
-        // Sort by date descending (newest first)
-        unanswered.sort_by(|a, b| b.0.cmp(&a.0));
+        // Sort by date descending (newest first), then filename
+        unanswered.sort_by(|a, b| b.0.cmp(&a.0).then_with(|| a.2.cmp(&b.2)));
         total += unanswered.len();
 
         if multi {
@@ -189,21 +368,125 @@ pub fn run(scope: Scope, from_name: &str) -> Result<()> {
         println!("No unanswered threads found.");
     }
 
+    // The cache only saves work on the next run; failing to write it is not
+    // worth failing the command over.
+    let _ = cache.save(&cache_file);
+
     Ok(())
 }
 
-fn collect_md_files(dir: &std::path::Path, out: &mut Vec<PathBuf>) -> Result<()> {
-    if !dir.is_dir() {
-        return Ok(());
-    }
+/// Recursively collect `.md` files under `dir`.
+///
+/// Uses `DirEntry::file_type()`, which is answered from the directory listing
+/// on most platforms, instead of `Path::is_dir()` (one extra `stat` per entry).
+/// Symlinks are skipped rather than followed.
+fn collect_md_files(dir: &Path, out: &mut Vec<PathBuf>) -> Result<()> {
     for entry in std::fs::read_dir(dir)? {
         let entry = entry?;
+        let file_type = entry.file_type()?;
         let path = entry.path();
-        if path.is_dir() {
+        if file_type.is_dir() {
             collect_md_files(&path, out)?;
-        } else if path.extension().and_then(|e| e.to_str()) == Some("md") {
+        } else if file_type.is_file() && path.extension().and_then(|e| e.to_str()) == Some("md") {
             out.push(path);
         }
     }
     Ok(())
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    const HEADER: &str =
+        "# Subject\n\n**Labels**: inbox\n**Last updated**: 2025-02-10\n\n";
+
+    #[test]
+    fn last_sender_takes_final_heading() {
+        let text = "## Alice \u{2014} Mon\n\nhi\n## Bob <b@x.com> \u{2014} Tue\n\n## no dash\n";
+        assert_eq!(last_sender(text.as_bytes()), "Bob <b@x.com>");
+        assert_eq!(last_sender(b"no headings here"), "");
+        let multibyte = "## \u{00e9} \u{2014} x\n## \u{2014}\n";
+        assert_eq!(last_sender(multibyte.as_bytes()), "\u{00e9}");
+    }
+
+    #[test]
+    fn thread_meta_takes_first_of_each() {
+        let text = b"**Last updated**: 2025-01-01\n**Label**: a, b \n**Labels**: c\n";
+        assert_eq!(thread_meta(text), ("2025-01-01".into(), "a, b".into()));
+        assert_eq!(thread_meta(b"nothing"), (String::new(), String::new()));
+    }
+
+    #[test]
+    fn scan_thread_small_file() {
+        let dir = tempfile::tempdir().unwrap();
+        let path = dir.path().join("t.md");
+        let text = format!(
+            "{}---\n\n## Alice \u{2014} Mon\n\nHi\n\n---\n\n## Bob \u{2014} Tue\n\nHey\n",
+            HEADER
+        );
+        std::fs::write(&path, text).unwrap();
+        let (sender, date, labels) = scan_thread(&path).unwrap();
+        assert_eq!(sender, "Bob");
+        assert_eq!(date, "2025-02-10");
+        assert_eq!(labels, "inbox");
+    }
+
+    #[test]
+    fn scan_thread_sender_before_last_block() {
+        let dir = tempfile::tempdir().unwrap();
+        let path = dir.path().join("t.md");
+        // Last heading sits several blocks before EOF.
+        let body = "quoted ## not a heading \u{2014} x\n".repeat(2000);
+        let text = format!(
+            "{}---\n\n## Alice \u{2014} Mon\n\nHi\n\n---\n\n## Bob \u{2014} Tue\n\n{}",
+            HEADER, body
+        );
+        assert!(text.len() as u64 > 4 * TAIL_CHUNK);
+        std::fs::write(&path, text).unwrap();
+        let (sender, date, labels) = scan_thread(&path).unwrap();
+        assert_eq!(sender, "Bob");
+        assert_eq!(date, "2025-02-10");
+        assert_eq!(labels, "inbox");
+    }
+
+    #[test]
+    fn scan_dir_reuses_cache_until_file_changes() {
+        let dir = tempfile::tempdir().unwrap();
+        let path = dir.path().join("t.md");
+        std::fs::write(&path, format!("{}## Alice \u{2014} Mon\n\nHi\n", HEADER)).unwrap();
+
+        let mut cache = ScanCache::default();
+        let found = scan_dir(dir.path(), "bob", &mut cache).unwrap();
+        assert_eq!(found[0].3, "Alice");
+        assert!(cache.dirty);
+
+        // A stale cached sender is served while mtime and size still match.
+        cache.entries.get_mut(&path).unwrap().sender = "Carol".into();
+        cache.dirty = false;
+        let found = scan_dir(dir.path(), "bob", &mut cache).unwrap();
+        assert_eq!(found[0].3, "Carol");
+        assert!(!cache.dirty);
+
+        let text = format!("{}## Dave \u{2014} Tue\n\nHey there\n", HEADER);
+        std::fs::write(&path, text).unwrap();
+        let found = scan_dir(dir.path(), "bob", &mut cache).unwrap();
+        assert_eq!(found[0].3, "Dave");
+        assert!(cache.dirty);
+
+        std::fs::remove_file(&path).unwrap();
+        cache.dirty = false;
+        assert!(scan_dir(dir.path(), "bob", &mut cache).unwrap().is_empty());
+        assert!(cache.entries.is_empty());
+        assert!(cache.dirty);
+    }
+
+    #[test]
+    fn scan_thread_no_messages() {
+        let dir = tempfile::tempdir().unwrap();
+        let path = dir.path().join("t.md");
+        std::fs::write(&path, format!("{}{}", HEADER, "x\n".repeat(20_000))).unwrap();
+        let (sender, _, _) = scan_thread(&path).unwrap();
+        assert!(sender.is_empty());
+    }
+}
@@ -0,0 +1,125 @@
+//! GitHub REST client for shared mailbox repos.
+//!
+//! Reuses the token `gh` is already logged in with (read once per process),
+//! so repo and collaborator calls share one pooled HTTPS connection instead
+//! of paying a `gh` process spawn, config read and TLS handshake each.
+
+use anyhow::{bail, Result};
+use once_cell::sync::OnceCell;
+use serde_json::json;
+
+use crate::util::run_cmd;
+
+/// Default GitHub API base URL.
+const API_BASE: &str = "https://api.github.com";
+
+static TOKEN: OnceCell<String> = OnceCell::new();
+
+/// GitHub token, resolved once per process: `GH_TOKEN`, then
+/// `GITHUB_TOKEN` (the variables `gh` itself honours), then `gh auth token`.
+fn token() -> Result<&'static str> {
+    TOKEN
+        .get_or_try_init(|| {
+            for var in ["GH_TOKEN", "GITHUB_TOKEN"] {
+                if let Ok(token) = std::env::var(var) {
+                    if !token.trim().is_empty() {
+                        return Ok(token.trim().to_string());
+                    }
+                }
+            }
+            let (stdout, stderr, code) = run_cmd(&["gh", "auth", "token"])?;
+            let token = stdout.trim();
+            if code != 0 || token.is_empty() {
+                bail!(
+                    "Could not read GitHub token from 'gh auth token': {}\nRun 'gh auth login' first.",
+                    stderr.trim()
+                );
+            }
+            Ok(token.to_string())
+        })
+        .map(String::as_str)
+}
+
+pub struct GitHub {
+    agent: ureq::Agent,
+    api_base: String,
+    auth: String,
+}
+
+impl GitHub {
+    /// Client authenticated with `gh`'s token (see `token`).
+    pub fn from_gh() -> Result<Self> {
+        Ok(Self::new_at(API_BASE, token()?))
+    }
+
+    /// Client with configurable API base URL (for testing).
+    pub fn new_at(api_base: &str, token: &str) -> Self {
+        Self {
+            agent: ureq::agent(),
+            api_base: api_base.trim_end_matches('/').to_string(),
+            auth: format!("Bearer {}", token),
+        }
+    }
+
+    fn request(&self, method: &str, path: &str) -> ureq::Request {
+        self.agent
+            .request(method, &format!("{}{}", self.api_base, path))
+            .set("Authorization", &self.auth)
+            .set("Accept", "application/vnd.github+json")
+            .set("X-GitHub-Api-Version", "2022-11-28")
+    }
+
+    /// Create `owner/name`. `owner` is a user login when it matches
+    /// `user_login`, otherwise an organization.
+    pub fn create_repo(
+        &self,
+        owner: &str,
+        user_login: &str,
+        name: &str,
+        private: bool,
+    ) -> Result<()> {
+        let path = if owner.eq_ignore_ascii_case(user_login) {
+            "/user/repos".to_string()
+        } else {
+            format!("/orgs/{}/repos", owner)
+        };
+        let resp = self
+            .request("POST", &path)
+            .send_json(json!({ "name": name, "private": private }));
+        check(resp, &format!("create repo {}/{}", owner, name))
+    }
+
+    /// Invite `user` as a collaborator on `repo_full` (`owner/name`).
+    pub fn add_collaborator(&self, repo_full: &str, user: &str) -> Result<()> {
+        let path = format!("/repos/{}/collaborators/{}", repo_full, user);
+        let resp = self.request("PUT", &path).send_json(json!({}));
+        check(resp, &format!("add collaborator {} on {}", user, repo_full))
+    }
+
+    /// Rename `repo_full` (`owner/name`) to `new_name` within the same owner.
+    pub fn rename_repo(&self, repo_full: &str, new_name: &str) -> Result<()> {
+        let path = format!("/repos/{}", repo_full);
+        let resp = self
+            .request("PATCH", &path)
+            .send_json(json!({ "name": new_name }));
+        check(resp, &format!("rename repo {} to {}", repo_full, new_name))
+    }
+
+    /// Delete `repo_full` (`owner/name`). Needs the `delete_repo` scope.
+    pub fn delete_repo(&self, repo_full: &str) -> Result<()> {
+        let path = format!("/repos/{}", repo_full);
+        let resp = self.request("DELETE", &path).call();
+        check(resp, &format!("delete repo {}", repo_full))
+    }
+}
+
+fn check(resp: std::result::Result<ureq::Response, ureq::Error>, what: &str) -> Result<()> {
+    match resp {
+        Ok(_) => Ok(()),
+        Err(ureq::Error::Status(status, resp)) => {
+            let body = resp.into_string().unwrap_or_default();
+            bail!("GitHub API: {} failed (HTTP {}): {}", what, status, body);
+        }
+        Err(e) => bail!("GitHub API: {} request failed: {}", what, e),
+    }
+}
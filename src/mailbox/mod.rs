@@ -1,5 +1,6 @@
 pub mod add;
 pub mod find_unanswered;
+pub mod github;
 pub mod list;
 pub mod remove;
 pub mod rename;
@@ -7,3 +8,160 @@ pub mod reset;
 pub mod sync;
 pub mod templates;
 pub mod validate_draft;
+
+use anyhow::Result;
+use std::process::{Command, Stdio};
+
+/// Most mailboxes `run_each` works on at once.
+const MAX_JOBS: usize = 8;
+
+/// Run `job` for every mailbox in `names`, at most `MAX_JOBS` at a time.
+///
+/// Each mailbox's work is dominated by its own git network round-trips, so
+/// they overlap well. Every job writes its report into a private buffer that
+/// is printed whole once its batch finishes, keeping output grouped per
+/// mailbox and in `names` order. Results come back in the same order.
+pub(crate) fn run_each<T, F>(names: &[String], job: F) -> Vec<Result<T>>
+where
+    T: Send,
+    F: Fn(&str, &mut String) -> Result<T> + Sync,
+{
+    let job = &job;
+    let mut results = Vec::with_capacity(names.len());
+    for batch in names.chunks(MAX_JOBS) {
+        std::thread::scope(|s| {
+            let handles: Vec<_> = batch
+                .iter()
+                .map(|name| {
+                    s.spawn(move || {
+                        let mut out = String::new();
+                        let result = job(name, &mut out);
+                        (out, result)
+                    })
+                })
+                .collect();
+            for handle in handles {
+                let (out, result) = handle.join().expect("mailbox worker panicked");
+                print!("{}", out);
+                results.push(result);
+            }
+        });
+    }
+    results
+}
+
+/// Run a git command for its stdout. Returns (stdout, exit code).
+pub(crate) fn git_output(args: &[&str]) -> (String, i32) {
+    let output = Command::new(args[0])
+        .args(&args[1..])
+        .stderr(Stdio::null())
+        .output()
+        .unwrap_or_else(|_| panic!("Failed to run: {}", args.join(" ")));
+    let stdout = String::from_utf8_lossy(&output.stdout).into_owned();
+    (stdout, output.status.code().unwrap_or(-1))
+}
+
+/// Run a git command for its effect. stdout is discarded unread; stderr is
+/// decoded only when the command fails, and returned as the error.
+pub(crate) fn git_run(args: &[&str]) -> std::result::Result<(), String> {
+    let output = Command::new(args[0])
+        .args(&args[1..])
+        .stdout(Stdio::null())
+        .output()
+        .unwrap_or_else(|_| panic!("Failed to run: {}", args.join(" ")));
+    if output.status.success() {
+        Ok(())
+    } else {
+        Err(String::from_utf8_lossy(&output.stderr).into_owned())
+    }
+}
+
+pub(crate) enum Publish {
+    Clean,
+    Pushed,
+    PushFailed(String),
+}
+
+/// Stage everything in the mailbox repo at `sp`, commit with `message` and
+/// push.
+///
+/// `status --porcelain` runs first and also lists untracked files (whatever
+/// `status.showUntrackedFiles` says), so it tells whether `add -A` would
+/// stage anything: a clean mailbox (the usual case on repeat syncs) costs
+/// one git spawn and skips `add` entirely.
+pub(crate) fn commit_and_push(sp: &str, message: &str) -> Publish {
+    let (status_out, _) = git_output(&[
+        "git",
+        "-C",
+        sp,
+        "status",
+        "--porcelain",
+        "--untracked-files=all",
+    ]);
+    if status_out.trim().is_empty() {
+        return Publish::Clean;
+    }
+    let _ = git_run(&["git", "-C", sp, "add", "-A"]);
+    let _ = git_run(&["git", "-C", sp, "commit", "-m", message]);
+    match git_run(&["git", "-C", sp, "push"]) {
+        Ok(()) => Publish::Pushed,
+        Err(stderr) => Publish::PushFailed(stderr),
+    }
+}
+
+/// Stage updated submodule refs in the parent repo with a single `git add`.
+///
+/// Done after `run_each` rather than per mailbox: concurrent `git add`s in
+/// the parent would fight over its index lock.
+pub(crate) fn stage_in_parent(paths: &[String]) {
+    if paths.is_empty() {
+        return;
+    }
+    let mut args = vec!["git", "add"];
+    args.extend(paths.iter().map(String::as_str));
+    let _ = git_run(&args);
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::fmt::Write;
+
+    #[test]
+    fn run_each_keeps_name_order_across_batches() {
+        let names: Vec<String> = (0..MAX_JOBS * 2 + 3).map(|i| format!("mb{}", i)).collect();
+        let results = run_each(&names, |name, out| {
+            writeln!(out, "  {}", name)?;
+            if name == "mb3" {
+                anyhow::bail!("boom");
+            }
+            Ok(name.to_string())
+        });
+        assert_eq!(results.len(), names.len());
+        for (name, result) in names.iter().zip(&results) {
+            match result {
+                Ok(got) => assert_eq!(got, name),
+                Err(e) => {
+                    assert_eq!(name, "mb3");
+                    assert_eq!(e.to_string(), "boom");
+                }
+            }
+        }
+    }
+
+    #[test]
+    fn commit_and_push_sees_untracked_files_when_status_hides_them() {
+        let dir = tempfile::tempdir().unwrap();
+        let sp = dir.path().to_string_lossy().to_string();
+        git_run(&["git", "init", "-q", &sp]).unwrap();
+        git_run(&["git", "-C", &sp, "config", "status.showUntrackedFiles", "no"]).unwrap();
+        assert!(matches!(commit_and_push(&sp, "sync"), Publish::Clean));
+
+        std::fs::write(dir.path().join("new.md"), "hello").unwrap();
+        // No remote, so the push fails, but the new file is not skipped.
+        assert!(matches!(
+            commit_and_push(&sp, "sync"),
+            Publish::PushFailed(_)
+        ));
+    }
+}
@@ -2,72 +2,98 @@
 
 use anyhow::Result;
 use std::io::Write;
-use std::path::PathBuf;
+use std::path::{Path, PathBuf};
 
+use crate::accounts::load_owner;
 use crate::resolve;
 use crate::util::run_cmd_checked;
 
+use super::github::GitHub;
+
 pub fn run(name: &str, delete_repo: bool) -> Result<()> {
     let mb_path = resolve::mailbox_dir(name);
 
-    if mb_path.exists() {
-        let is_submodule = mb_path.join(".git").is_file();
-
-        if is_submodule {
-            // Submodule removal
-            println!("Removing submodule: {}", mb_path.display());
-            let sp = mb_path.to_string_lossy().to_string();
-            run_cmd_checked(&["git", "submodule", "deinit", "-f", &sp])?;
-            run_cmd_checked(&["git", "rm", "-f", &sp])?;
-
-            // Clean up .git/modules entry
-            let modules_path =
-                PathBuf::from(".git/modules").join(mb_path.to_string_lossy().as_ref());
-            if modules_path.exists() {
-                std::fs::remove_dir_all(&modules_path)?;
-                println!("  Cleaned up {}", modules_path.display());
-            }
-        } else {
-            // Plain directory removal
-            println!("Removing directory: {}", mb_path.display());
-            std::fs::remove_dir_all(&mb_path)?;
-        }
+    // Confirm the GitHub repo deletion (and check the gh login) before
+    // touching anything local.
+    let repo_to_delete = if delete_repo {
+        confirm_repo_delete(name)?
+    } else {
+        None
+    };
+    let gh = match repo_to_delete {
+        Some(_) => Some(GitHub::from_gh()?),
+        None => None,
+    };
+
+    remove_local(&mb_path)?;
+
+    // Remove from .corky.toml
+    remove_from_config(name)?;
+
+    // The irreversible step goes last, once local cleanup has succeeded.
+    if let (Some(repo_full), Some(gh)) = (&repo_to_delete, &gh) {
+        println!("Deleting GitHub repo: {}", repo_full);
+        gh.delete_repo(repo_full)?;
+        println!("Deleted GitHub repo: {}", repo_full);
+    }
+
+    println!("Done. Mailbox '{}' removed.", name);
+    Ok(())
+}
+
+/// Ask whether to delete the mailbox's GitHub repo. Returns the repo
+/// (`owner/to-{name}`) if confirmed.
+fn confirm_repo_delete(name: &str) -> Result<Option<String>> {
+    // Try to find repo name from config or convention
+    let Ok(owner) = load_owner(None) else {
+        return Ok(None);
+    };
+    let repo_full = format!("{}/to-{}", owner.github_user, name.to_lowercase());
+
+    print!(
+        "Delete GitHub repo {}? This cannot be undone. [y/N] ",
+        repo_full
+    );
+    std::io::stdout().flush()?;
+    let mut input = String::new();
+    std::io::stdin().read_line(&mut input)?;
+    if input.trim().to_lowercase() == "y" {
+        Ok(Some(repo_full))
     } else {
+        println!("Skipped repo deletion");
+        Ok(None)
+    }
+}
+
+/// Remove the mailbox from disk: deinit a submodule or delete a directory.
+fn remove_local(mb_path: &Path) -> Result<()> {
+    if !mb_path.exists() {
         println!(
             "Mailbox {} not found on disk -- skipping cleanup",
             mb_path.display()
         );
+        return Ok(());
     }
 
-    // Remove from .corky.toml
-    remove_from_config(name)?;
-
-    // Optionally delete GitHub repo
-    if delete_repo {
-        // Try to find repo name from config or convention
-        let owner = crate::accounts::load_owner(None).ok();
-        let repo_full = owner
-            .map(|o| format!("{}/to-{}", o.github_user, name.to_lowercase()))
-            .unwrap_or_default();
-
-        if !repo_full.is_empty() {
-            print!(
-                "Delete GitHub repo {}? This cannot be undone. [y/N] ",
-                repo_full
-            );
-            std::io::stdout().flush()?;
-            let mut input = String::new();
-            std::io::stdin().read_line(&mut input)?;
-            if input.trim().to_lowercase() == "y" {
-                run_cmd_checked(&["gh", "repo", "delete", &repo_full, "--yes"])?;
-                println!("Deleted GitHub repo: {}", repo_full);
-            } else {
-                println!("Skipped repo deletion");
-            }
+    let is_submodule = mb_path.join(".git").is_file();
+    if is_submodule {
+        // Submodule removal
+        println!("Removing submodule: {}", mb_path.display());
+        let sp = mb_path.to_string_lossy().to_string();
+        run_cmd_checked(&["git", "submodule", "deinit", "-f", &sp])?;
+        run_cmd_checked(&["git", "rm", "-f", &sp])?;
+
+        // Clean up .git/modules entry
+        let modules_path = PathBuf::from(".git/modules").join(mb_path.to_string_lossy().as_ref());
+        if modules_path.exists() {
+            std::fs::remove_dir_all(&modules_path)?;
+            println!("  Cleaned up {}", modules_path.display());
         }
+    } else {
+        // Plain directory removal
+        println!("Removing directory: {}", mb_path.display());
+        std::fs::remove_dir_all(mb_path)?;
     }
-
-    println!("Done. Mailbox '{}' removed.", name);
     Ok(())
 }
 
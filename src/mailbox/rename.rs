@@ -2,12 +2,18 @@
 
 use anyhow::Result;
 
+use crate::accounts::load_owner;
 use crate::resolve;
 use crate::util::run_cmd_checked;
 
+use super::github::GitHub;
+
 pub fn run(old_name: &str, new_name: &str, rename_repo: bool) -> Result<()> {
-    let old_dir = resolve::mailbox_dir(old_name);
-    let new_dir = resolve::mailbox_dir(new_name);
+    // Resolve the data dir once (it probes several locations) and derive
+    // both mailbox paths from it.
+    let base = resolve::mailboxes_base_dir();
+    let old_dir = base.join(old_name.to_lowercase());
+    let new_dir = base.join(new_name.to_lowercase());
 
     if new_dir.exists() {
         anyhow::bail!("Mailbox '{}' already exists at {}", new_name, new_dir.display());
@@ -41,7 +47,7 @@ pub fn run(old_name: &str, new_name: &str, rename_repo: bool) -> Result<()> {
 
     // 2. Optionally rename the GitHub repo
     if rename_repo {
-        let owner_gh = crate::accounts::load_owner(None)
+        let owner_gh = load_owner(None)
             .map(|o| o.github_user)
             .unwrap_or_default();
         if !owner_gh.is_empty() {
@@ -51,15 +57,7 @@ pub fn run(old_name: &str, new_name: &str, rename_repo: bool) -> Result<()> {
                 "Renaming GitHub repo {} \u{2192} {}",
                 old_repo, new_repo_name
             );
-            run_cmd_checked(&[
-                "gh",
-                "repo",
-                "rename",
-                &new_repo_name,
-                "-R",
-                &old_repo,
-                "--yes",
-            ])?;
+            GitHub::from_gh()?.rename_repo(&old_repo, &new_repo_name)?;
         }
     }
 
@@ -1,135 +1,126 @@
 //! Regenerate template files in shared mailbox repos.
 
 use anyhow::Result;
+use std::fmt::Write;
 use std::path::Path;
-use std::process::Command;
 
 use crate::accounts::load_owner;
 use crate::config::corky_config;
 use crate::resolve;
+use crate::util::write_if_changed;
 
+use super::sync::{Pull, SharedFile, pull_rebase};
 use super::templates::{generate_agents_md, generate_readme_md};
-
-fn run_git(args: &[&str]) -> (String, String, i32) {
-    let output = Command::new(args[0])
-        .args(&args[1..])
-        .output()
-        .unwrap_or_else(|_| panic!("Failed to run: {}", args.join(" ")));
-    let stdout = String::from_utf8_lossy(&output.stdout).to_string();
-    let stderr = String::from_utf8_lossy(&output.stderr).to_string();
-    let code = output.status.code().unwrap_or(-1);
-    (stdout, stderr, code)
-}
+use super::{Publish, commit_and_push};
 
 /// Regenerate template files for one mailbox.
-fn regenerate(display_name: &str, owner_name: &str, mb_path: &Path) -> Result<()> {
+fn regenerate(
+    display_name: &str,
+    owner_name: &str,
+    mb_path: &Path,
+    voice: Option<&SharedFile>,
+    out: &mut String,
+) -> Result<()> {
+    // Files already holding the regenerated content are left untouched, so
+    // a repeat reset does no writes and leaves git nothing to re-hash.
+
     // AGENTS.md
-    std::fs::write(
-        mb_path.join("AGENTS.md"),
+    write_if_changed(
+        &mb_path.join("AGENTS.md"),
         generate_agents_md(display_name, owner_name),
     )?;
-    println!("  Updated AGENTS.md");
+    writeln!(out, "  Updated AGENTS.md")?;
 
     // CLAUDE.md symlink
     let claude_md = mb_path.join("CLAUDE.md");
-    if claude_md.exists() || claude_md.is_symlink() {
-        std::fs::remove_file(&claude_md)?;
+    let linked =
+        std::fs::read_link(&claude_md).is_ok_and(|target| target == Path::new("AGENTS.md"));
+    if !linked {
+        if claude_md.exists() || claude_md.is_symlink() {
+            std::fs::remove_file(&claude_md)?;
+        }
+        #[cfg(unix)]
+        std::os::unix::fs::symlink("AGENTS.md", &claude_md)?;
     }
-    #[cfg(unix)]
-    std::os::unix::fs::symlink("AGENTS.md", &claude_md)?;
-    println!("  Updated CLAUDE.md -> AGENTS.md");
+    writeln!(out, "  Updated CLAUDE.md -> AGENTS.md")?;
 
     // README.md
-    std::fs::write(
-        mb_path.join("README.md"),
+    write_if_changed(
+        &mb_path.join("README.md"),
         generate_readme_md(display_name, owner_name),
     )?;
-    println!("  Updated README.md");
+    writeln!(out, "  Updated README.md")?;
 
     // .gitignore
-    std::fs::write(
-        mb_path.join(".gitignore"),
+    write_if_changed(
+        &mb_path.join(".gitignore"),
         "AGENTS.local.md\nCLAUDE.local.md\n__pycache__/\n",
     )?;
-    println!("  Updated .gitignore");
+    writeln!(out, "  Updated .gitignore")?;
 
     // voice.md
-    let voice_file = resolve::voice_md();
-    if voice_file.exists() {
-        std::fs::copy(&voice_file, mb_path.join("voice.md"))?;
-        println!("  Updated voice.md");
+    if let Some(voice) = voice {
+        voice.write_to(&mb_path.join("voice.md"))?;
+        writeln!(out, "  Updated voice.md")?;
     }
 
     // .claude/skills/corky/
     crate::skill::install_at(Some(mb_path))?;
-    println!("  Updated .claude/skills/corky/SKILL.md");
+    writeln!(out, "  Updated .claude/skills/corky/SKILL.md")?;
 
     Ok(())
 }
 
-/// Pull, regenerate templates, commit, and push for one mailbox.
-fn reset_one(name: &str, owner_name: &str, do_sync: bool) -> Result<()> {
+/// Pull, regenerate templates, commit, and push for one mailbox, reporting
+/// into `out`. Returns the mailbox path when its ref in the parent needs
+/// staging.
+fn reset_one(
+    name: &str,
+    owner_name: &str,
+    do_sync: bool,
+    voice: Option<&SharedFile>,
+    out: &mut String,
+) -> Result<Option<String>> {
     let mb_path = resolve::mailbox_dir(name);
     if !mb_path.exists() {
-        println!(
+        writeln!(
+            out,
             "  {}: not found at {} -- skipping",
             name,
             mb_path.display()
-        );
-        return Ok(());
+        )?;
+        return Ok(None);
     }
 
     let is_git = mb_path.join(".git").exists();
 
-    println!("Resetting {}...", name);
+    writeln!(out, "Resetting {}...", name)?;
     let sp = mb_path.to_string_lossy().to_string();
 
     // 1. Pull latest (only for git repos)
     if do_sync && is_git {
-        let (stdout, _, code) = run_git(&["git", "-C", &sp, "pull", "--rebase"]);
-        if code == 0 {
-            if !stdout.contains("Already up to date") {
-                println!("  Pulled changes");
-            }
-        } else {
-            println!("  Pull failed -- continuing with reset");
+        match pull_rebase(&sp) {
+            Pull::UpToDate => {}
+            Pull::Pulled => writeln!(out, "  Pulled changes")?,
+            Pull::Failed => writeln!(out, "  Pull failed -- continuing with reset")?,
         }
     }
 
     // 2. Regenerate template files
-    regenerate(name, owner_name, &mb_path)?;
+    regenerate(name, owner_name, &mb_path, voice, out)?;
 
     if !do_sync || !is_git {
-        return Ok(());
+        return Ok(None);
     }
 
     // 3. Stage, commit, push
-    run_git(&["git", "-C", &sp, "add", "-A"]);
-
-    let (status_out, _, _) = run_git(&["git", "-C", &sp, "status", "--porcelain"]);
-    if !status_out.trim().is_empty() {
-        run_git(&[
-            "git",
-            "-C",
-            &sp,
-            "commit",
-            "-m",
-            "Reset template files to current version",
-        ]);
-        let (_, stderr, code) = run_git(&["git", "-C", &sp, "push"]);
-        if code == 0 {
-            println!("  Pushed changes");
-        } else {
-            println!("  Push failed: {}", stderr.trim());
-        }
-    } else {
-        println!("  Templates already up to date");
+    match commit_and_push(&sp, "Reset template files to current version") {
+        Publish::Clean => writeln!(out, "  Templates already up to date")?,
+        Publish::Pushed => writeln!(out, "  Pushed changes")?,
+        Publish::PushFailed(stderr) => writeln!(out, "  Push failed: {}", stderr.trim())?,
     }
 
-    // 4. Update submodule ref in parent
-    run_git(&["git", "add", &sp]);
-
-    Ok(())
+    Ok(Some(sp))
 }
 
 /// corky mailbox reset [NAME] [--no-sync]
@@ -161,9 +152,23 @@ pub fn run(name: Option<&str>, no_sync: bool) -> Result<()> {
         &owner.name
     };
 
-    for n in &names {
-        reset_one(n, owner_name, !no_sync)?;
+    let mut staged = Vec::new();
+    let mut first_err = None;
+    let voice = SharedFile::load(&resolve::voice_md())?;
+    let results = super::run_each(&names, |n, out| {
+        reset_one(n, owner_name, !no_sync, voice.as_ref(), out)
+    });
+    for result in results {
+        match result {
+            Ok(Some(sp)) => staged.push(sp),
+            Ok(None) => {}
+            Err(e) => {
+                first_err.get_or_insert(e);
+            }
+        }
     }
+    // Update submodule refs in parent
+    super::stage_in_parent(&staged);
 
-    Ok(())
+    first_err.map_or(Ok(()), Err)
 }
@@ -1,57 +1,93 @@
 //! Sync shared mailboxes: pull changes, push updates.
 
 use anyhow::Result;
+use std::collections::HashMap;
+use std::fmt::Write;
+use std::fs::{File, Permissions};
+use std::io::Read;
 use std::path::{Path, PathBuf};
-use std::process::Command;
+use std::time::SystemTime;
 
-use crate::config::{corky_config, topic};
+use crate::config::corky_config;
+use crate::config::topic::TopicConfig;
 use crate::resolve;
+use crate::util::write_if_changed;
 
-fn run_git(args: &[&str]) -> (String, String, i32) {
-    let output = Command::new(args[0])
-        .args(&args[1..])
-        .output()
-        .unwrap_or_else(|_| {
-            panic!("Failed to run: {}", args.join(" "));
-        });
-    let stdout = String::from_utf8_lossy(&output.stdout).to_string();
-    let stderr = String::from_utf8_lossy(&output.stderr).to_string();
-    let code = output.status.code().unwrap_or(-1);
-    (stdout, stderr, code)
-}
-
-fn mailbox_status(name: &str, mb_path: &Path) {
-    let sp = mb_path.to_string_lossy().to_string();
-    run_git(&["git", "-C", &sp, "fetch"]);
-
-    let (incoming, _, inc_code) =
-        run_git(&["git", "-C", &sp, "rev-list", "--count", "HEAD..@{u}"]);
-    let (outgoing, _, out_code) =
-        run_git(&["git", "-C", &sp, "rev-list", "--count", "@{u}..HEAD"]);
+use super::{Publish, commit_and_push, git_output, git_run};
 
-    let inc = if inc_code == 0 {
-        incoming.trim().to_string()
-    } else {
-        "?".to_string()
-    };
-    let out = if out_code == 0 {
-        outgoing.trim().to_string()
-    } else {
-        "?".to_string()
-    };
+/// Fetch one mailbox and report how far it is ahead of / behind upstream.
+fn mailbox_status(name: &str, out: &mut String) -> Result<()> {
+    let mb_path = resolve::mailbox_dir(name);
+    if !mb_path.exists() {
+        writeln!(out, "  {}: not found", name)?;
+        return Ok(());
+    }
+    if !is_git_repo(&mb_path) {
+        writeln!(out, "  {}: plain directory", name)?;
+        return Ok(());
+    }
 
-    if inc == "0" && out == "0" {
-        println!("  {}: up to date", name);
+    let sp = mb_path.to_string_lossy().to_string();
+    let _ = git_run(&["git", "-C", &sp, "fetch"]);
+
+    // One walk counts both sides: left is HEAD-only (outgoing), right is
+    // upstream-only (incoming).
+    let (counts, code) = git_output(&[
+        "git",
+        "-C",
+        &sp,
+        "rev-list",
+        "--left-right",
+        "--count",
+        "HEAD...@{u}",
+    ]);
+    let (outgoing, inc) = parse_left_right(&counts)
+        .filter(|_| code == 0)
+        .unwrap_or_else(|| ("?".to_string(), "?".to_string()));
+
+    if inc == "0" && outgoing == "0" {
+        writeln!(out, "  {}: up to date", name)?;
     } else {
         let mut parts = Vec::new();
         if inc != "0" {
             parts.push(format!("{} incoming", inc));
         }
-        if out != "0" {
-            parts.push(format!("{} outgoing", out));
+        if outgoing != "0" {
+            parts.push(format!("{} outgoing", outgoing));
         }
-        println!("  {}: {}", name, parts.join(", "));
+        writeln!(out, "  {}: {}", name, parts.join(", "))?;
     }
+    Ok(())
+}
+
+pub(crate) enum Pull {
+    UpToDate,
+    Pulled,
+    Failed,
+}
+
+/// `git pull --rebase`, split so the rebase only runs when upstream has
+/// commits we lack. The steady state of a repeat sync is "nothing new",
+/// which then costs a fetch and a rev-list instead of the pull machinery.
+pub(crate) fn pull_rebase(sp: &str) -> Pull {
+    if git_run(&["git", "-C", sp, "fetch", "--quiet"]).is_err() {
+        return Pull::Failed;
+    }
+    let (behind, code) = git_output(&["git", "-C", sp, "rev-list", "--count", "HEAD..@{u}"]);
+    match behind.trim() {
+        _ if code != 0 => Pull::Failed,
+        "0" => Pull::UpToDate,
+        _ => match git_run(&["git", "-C", sp, "rebase", "--quiet", "@{u}"]) {
+            Ok(()) => Pull::Pulled,
+            Err(_) => Pull::Failed,
+        },
+    }
+}
+
+/// Split `rev-list --left-right --count` output ("<left>\t<right>").
+fn parse_left_right(output: &str) -> Option<(String, String)> {
+    let (left, right) = output.trim().split_once('\t')?;
+    Some((left.to_string(), right.to_string()))
 }
 
 /// Check if a directory is a git repo (submodule or standalone).
@@ -62,28 +98,97 @@ fn is_git_repo(path: &Path) -> bool {
 
 /// Copy a file if the source is newer than the destination (or dest missing).
 /// Returns true if copied.
+///
+/// The copy keeps the source's mode bits and mtime (like `cp -p`), so the
+/// reverse check that follows in a bidirectional sync sees equal times and
+/// does not copy the file straight back. `io::copy` between two files stays in the kernel
+/// (`copy_file_range`/`sendfile`) where the platform supports it.
 fn copy_if_newer(src: &Path, dst: &Path) -> std::io::Result<bool> {
-    if !src.exists() {
+    let Ok(src_meta) = src.metadata() else {
         return Ok(false);
-    }
-    let should_copy = if dst.exists() {
-        let src_mtime = src.metadata().ok().and_then(|m| m.modified().ok());
-        let dst_mtime = dst.metadata().ok().and_then(|m| m.modified().ok());
-        match (src_mtime, dst_mtime) {
+    };
+    let src_mtime = src_meta.modified().ok();
+    let should_copy = match dst.metadata() {
+        Ok(dst_meta) => match (src_mtime, dst_meta.modified().ok()) {
             (Some(s), Some(d)) => s > d,
             _ => true,
-        }
-    } else {
-        true
+        },
+        Err(_) => true,
     };
-    if should_copy {
-        if let Some(parent) = dst.parent() {
-            std::fs::create_dir_all(parent)?;
+    if !should_copy {
+        return Ok(false);
+    }
+    if let Some(parent) = dst.parent() {
+        std::fs::create_dir_all(parent)?;
+    }
+    let mut reader = File::open(src)?;
+    let mut writer = File::create(dst)?;
+    std::io::copy(&mut reader, &mut writer)?;
+    writer.set_permissions(src_meta.permissions())?;
+    if let Some(mtime) = src_mtime {
+        writer.set_modified(mtime)?;
+    }
+    Ok(true)
+}
+
+/// A root file copied into every mailbox, stat'ed and read once per run
+/// instead of once per mailbox.
+pub(crate) struct SharedFile {
+    modified: Option<SystemTime>,
+    permissions: Permissions,
+    bytes: Vec<u8>,
+}
+
+impl SharedFile {
+    /// Read `path`, or `None` if it does not exist.
+    pub(crate) fn load(path: &Path) -> std::io::Result<Option<Self>> {
+        let mut file = match File::open(path) {
+            Ok(f) => f,
+            Err(e) if e.kind() == std::io::ErrorKind::NotFound => return Ok(None),
+            Err(e) => return Err(e),
+        };
+        let meta = file.metadata()?;
+        let mut bytes = Vec::new();
+        file.read_to_end(&mut bytes)?;
+        Ok(Some(Self {
+            modified: meta.modified().ok(),
+            permissions: meta.permissions(),
+            bytes,
+        }))
+    }
+
+    /// Write to `dst` unless it already has the same contents.
+    pub(crate) fn write_to(&self, dst: &Path) -> std::io::Result<()> {
+        write_if_changed(dst, &self.bytes).map(|_| ())
+    }
+
+    /// `copy_if_newer` from the cached copy. Returns true if written.
+    fn write_if_newer(&self, dst: &Path) -> std::io::Result<bool> {
+        let dst_modified = dst.metadata().and_then(|m| m.modified()).ok();
+        let stale = match (self.modified, dst_modified) {
+            (Some(s), Some(d)) => s > d,
+            _ => true,
+        };
+        if stale {
+            std::fs::write(dst, &self.bytes)?;
+            std::fs::set_permissions(dst, self.permissions.clone())?;
         }
-        std::fs::copy(src, dst)?;
-        Ok(true)
-    } else {
-        Ok(false)
+        Ok(stale)
+    }
+}
+
+/// Config and root files shared by every mailbox in one sync run.
+struct SyncContext {
+    topics: HashMap<String, TopicConfig>,
+    voice: Option<SharedFile>,
+}
+
+impl SyncContext {
+    fn new(topics: HashMap<String, TopicConfig>) -> Result<Self> {
+        Ok(Self {
+            topics,
+            voice: SharedFile::load(&resolve::voice_md())?,
+        })
     }
 }
 
@@ -111,7 +216,8 @@ fn collect_files(dir: &Path) -> Vec<PathBuf> {
 
 /// Bidirectional sync of topic directories between root and mailbox.
 ///
-/// For each topic that lists `mailbox_name` in its `mailboxes` field:
+/// For each topic in `topics` (the configured `[topics.*]`) that lists
+/// `mailbox_name` in its `mailboxes` field:
 /// - Forward: root `topics/{name}/` → `mailboxes/{mailbox}/topics/{name}/`
 /// - Reverse: `mailboxes/{mailbox}/topics/{name}/` → root `topics/{name}/`
 ///
@@ -119,10 +225,16 @@ fn collect_files(dir: &Path) -> Vec<PathBuf> {
 fn sync_topics(
     mailbox_name: &str,
     mb_path: &Path,
-    config_path: Option<&Path>,
+    topics: &HashMap<String, TopicConfig>,
     data_dir: Option<&Path>,
+    out: &mut String,
 ) -> Result<()> {
-    let topics = topic::topics_for_mailbox(mailbox_name, config_path)?;
+    let mut topics: Vec<&str> = topics
+        .iter()
+        .filter(|(_, t)| t.mailboxes.iter().any(|m| m == mailbox_name))
+        .map(|(name, _)| name.as_str())
+        .collect();
+    topics.sort_unstable();
     if topics.is_empty() {
         return Ok(());
     }
@@ -133,7 +245,7 @@ fn sync_topics(
     let mb_topics_dir = mb_path.join("topics");
 
     let mut synced = 0u32;
-    for topic_name in topics.keys() {
+    for topic_name in &topics {
         let root_dir = root_topics_dir.join(topic_name);
         let mb_dir = mb_topics_dir.join(topic_name);
 
@@ -165,91 +277,69 @@ fn sync_topics(
     }
 
     if synced > 0 {
-        println!(
+        writeln!(
+            out,
             "  Synced {} topic file(s) ({})",
             synced,
-            topics.keys().cloned().collect::<Vec<_>>().join(", ")
-        );
+            topics.join(", ")
+        )?;
     }
     Ok(())
 }
 
-/// Full sync for one mailbox.
-pub fn sync_one(name: &str) -> Result<()> {
+/// Pull, refresh shared files, commit and push one mailbox, reporting into
+/// `out`. Returns the mailbox path when its ref in the parent needs staging.
+fn sync_mailbox(name: &str, ctx: &SyncContext, out: &mut String) -> Result<Option<String>> {
     let mb_path = resolve::mailbox_dir(name);
     if !mb_path.exists() {
-        println!(
+        writeln!(
+            out,
             "  {}: mailbox not found at {} -- skipping",
             name,
             mb_path.display()
-        );
-        return Ok(());
+        )?;
+        return Ok(None);
     }
 
     if !is_git_repo(&mb_path) {
-        println!("  {}: plain directory -- skipping git sync", name);
-        return Ok(());
+        writeln!(out, "  {}: plain directory -- skipping git sync", name)?;
+        return Ok(None);
     }
 
-    println!("Syncing {}...", name);
+    writeln!(out, "Syncing {}...", name)?;
     let sp = mb_path.to_string_lossy().to_string();
 
     // Pull changes
-    let (stdout, _stderr, code) = run_git(&["git", "-C", &sp, "pull", "--rebase"]);
-    if code == 0 {
-        if !stdout.contains("Already up to date") {
-            println!("  Pulled changes");
-        }
-    } else {
-        println!("  Pull failed -- continuing with push");
+    match pull_rebase(&sp) {
+        Pull::UpToDate => {}
+        Pull::Pulled => writeln!(out, "  Pulled changes")?,
+        Pull::Failed => writeln!(out, "  Pull failed -- continuing with push")?,
     }
 
     // Copy voice.md if root copy is newer
-    let voice_file = resolve::voice_md();
-    let mb_voice = mb_path.join("voice.md");
-    if voice_file.exists() && copy_if_newer(&voice_file, &mb_voice)? {
-        println!("  Updated voice.md");
+    if let Some(voice) = &ctx.voice {
+        if voice.write_if_newer(&mb_path.join("voice.md"))? {
+            writeln!(out, "  Updated voice.md")?;
+        }
     }
 
     // Bidirectional topic sync
-    sync_topics(name, &mb_path, None, None)?;
+    sync_topics(name, &mb_path, &ctx.topics, None, out)?;
 
     // Stage, commit, push any local changes
-    run_git(&["git", "-C", &sp, "add", "-A"]);
-
-    let (status_out, _, _) = run_git(&["git", "-C", &sp, "status", "--porcelain"]);
-    if !status_out.trim().is_empty() {
-        run_git(&[
-            "git",
-            "-C",
-            &sp,
-            "commit",
-            "-m",
-            "Sync shared conversations",
-        ]);
-        let (_, stderr, code) = run_git(&["git", "-C", &sp, "push"]);
-        if code == 0 {
-            println!("  Pushed changes");
-        } else {
-            println!("  Push failed: {}", stderr.trim());
-        }
-    } else {
-        println!("  No local changes to push");
+    match commit_and_push(&sp, "Sync shared conversations") {
+        Publish::Clean => writeln!(out, "  No local changes to push")?,
+        Publish::Pushed => writeln!(out, "  Pushed changes")?,
+        Publish::PushFailed(stderr) => writeln!(out, "  Push failed: {}", stderr.trim())?,
     }
 
-    // Update submodule ref in parent
-    run_git(&["git", "add", &sp]);
-
-    Ok(())
+    Ok(Some(sp))
 }
 
 /// corky mailbox sync [NAME]
 pub fn run(name: Option<&str>) -> Result<()> {
-    let config = corky_config::try_load_config(None);
-    let mailbox_names: Vec<String> = config
-        .as_ref()
-        .map(|c| c.mailboxes.keys().cloned().collect())
-        .unwrap_or_default();
+    let config = corky_config::try_load_config(None).unwrap_or_default();
+    let mailbox_names: Vec<String> = config.mailboxes.keys().cloned().collect();
 
     if mailbox_names.is_empty() {
         println!("No mailboxes configured in .corky.toml");
@@ -265,11 +355,29 @@ pub fn run(name: Option<&str>) -> Result<()> {
         mailbox_names
     };
 
-    for n in &names {
-        sync_one(n)?;
+    sync_names(&names, config.topics)
+}
+
+/// Sync `names` against one shared context (config, voice.md), then
+/// stage their refs in the parent repo. Returns the first mailbox error.
+pub fn sync_names(names: &[String], topics: HashMap<String, TopicConfig>) -> Result<()> {
+    let mut staged = Vec::new();
+    let mut first_err = None;
+    let ctx = SyncContext::new(topics)?;
+    let results = super::run_each(names, |n, out| sync_mailbox(n, &ctx, out));
+    for result in results {
+        match result {
+            Ok(Some(sp)) => staged.push(sp),
+            Ok(None) => {}
+            Err(e) => {
+                first_err.get_or_insert(e);
+            }
+        }
     }
+    // Update submodule refs in parent
+    super::stage_in_parent(&staged);
 
-    Ok(())
+    first_err.map_or(Ok(()), Err)
 }
 
 /// corky mailbox status
@@ -285,18 +393,11 @@ pub fn status() -> Result<()> {
         return Ok(());
     }
 
+    // Each status is a network fetch followed by a local rev-list; fetch
+    // the mailboxes side by side instead of one round-trip after another.
     println!("Mailbox status:");
-    for name in &mailbox_names {
-        let mb_path = resolve::mailbox_dir(name);
-        if mb_path.exists() {
-            if is_git_repo(&mb_path) {
-                mailbox_status(name, &mb_path);
-            } else {
-                println!("  {}: plain directory", name);
-            }
-        } else {
-            println!("  {}: not found", name);
-        }
+    for result in super::run_each(&mailbox_names, mailbox_status) {
+        result?;
     }
 
     Ok(())
@@ -309,6 +410,10 @@ mod tests {
     use std::thread;
     use std::time::Duration;
 
+    fn topics_in(config_path: &Path) -> HashMap<String, TopicConfig> {
+        corky_config::load_config(Some(config_path)).unwrap().topics
+    }
+
     #[test]
     fn copy_if_newer_creates_missing_dst() {
         let dir = tempfile::tempdir().unwrap();
@@ -343,6 +448,33 @@ mod tests {
         assert_eq!(fs::read_to_string(&dst).unwrap(), "updated");
     }
 
+    #[test]
+    fn copy_if_newer_keeps_mtime_so_copy_does_not_bounce_back() {
+        let dir = tempfile::tempdir().unwrap();
+        let src = dir.path().join("src.txt");
+        let dst = dir.path().join("dst.txt");
+        fs::write(&src, "hello").unwrap();
+        assert!(copy_if_newer(&src, &dst).unwrap());
+        assert_eq!(
+            fs::metadata(&dst).unwrap().modified().unwrap(),
+            fs::metadata(&src).unwrap().modified().unwrap()
+        );
+        assert!(!copy_if_newer(&dst, &src).unwrap());
+    }
+
+    #[cfg(unix)]
+    #[test]
+    fn copy_if_newer_keeps_mode_bits() {
+        use std::os::unix::fs::PermissionsExt;
+        let dir = tempfile::tempdir().unwrap();
+        let src = dir.path().join("hook.sh");
+        let dst = dir.path().join("dst.sh");
+        fs::write(&src, "#!/bin/sh\n").unwrap();
+        fs::set_permissions(&src, fs::Permissions::from_mode(0o755)).unwrap();
+        assert!(copy_if_newer(&src, &dst).unwrap());
+        assert_eq!(fs::metadata(&dst).unwrap().permissions().mode() & 0o777, 0o755);
+    }
+
     #[test]
     fn copy_if_newer_nonexistent_src() {
         let dir = tempfile::tempdir().unwrap();
@@ -351,6 +483,35 @@ mod tests {
         assert!(!copy_if_newer(&src, &dst).unwrap());
     }
 
+    #[test]
+    fn shared_file_writes_only_over_older_dst() {
+        let dir = tempfile::tempdir().unwrap();
+        let src = dir.path().join("voice.md");
+        let dst = dir.path().join("dst.md");
+        assert!(SharedFile::load(&src).unwrap().is_none());
+
+        fs::write(&dst, "old").unwrap();
+        thread::sleep(Duration::from_millis(50));
+        fs::write(&src, "voice").unwrap();
+        let voice = SharedFile::load(&src).unwrap().unwrap();
+        assert!(voice.write_if_newer(&dst).unwrap());
+        assert_eq!(fs::read_to_string(&dst).unwrap(), "voice");
+
+        thread::sleep(Duration::from_millis(50));
+        fs::write(&dst, "edited").unwrap();
+        assert!(!voice.write_if_newer(&dst).unwrap());
+        assert_eq!(fs::read_to_string(&dst).unwrap(), "edited");
+    }
+
+    #[test]
+    fn parse_left_right_splits_counts() {
+        assert_eq!(
+            parse_left_right("2\t5\n"),
+            Some(("2".to_string(), "5".to_string()))
+        );
+        assert_eq!(parse_left_right(""), None);
+    }
+
     #[test]
     fn collect_files_recursive() {
         let dir = tempfile::tempdir().unwrap();
@@ -405,7 +566,9 @@ mailboxes = ["lucas"]
         )
         .unwrap();
 
-        sync_topics("lucas", &mb_path, Some(&config_path), Some(data)).unwrap();
+        let topics = topics_in(&config_path);
+        let mut out = String::new();
+        sync_topics("lucas", &mb_path, &topics, Some(data), &mut out).unwrap();
 
         let mb_readme = mb_path.join("topics/brian-takita/README.md");
         assert!(mb_readme.exists());
@@ -438,7 +601,9 @@ mailboxes = ["lucas"]
         )
         .unwrap();
 
-        sync_topics("lucas", &mb_path, Some(&config_path), Some(data)).unwrap();
+        let topics = topics_in(&config_path);
+        let mut out = String::new();
+        sync_topics("lucas", &mb_path, &topics, Some(data), &mut out).unwrap();
 
         assert_eq!(
             fs::read_to_string(root_topic.join("README.md")).unwrap(),
@@ -464,7 +629,9 @@ mailboxes = ["alice"]
         )
         .unwrap();
 
-        sync_topics("lucas", &mb_path, Some(&config_path), Some(data)).unwrap();
+        let topics = topics_in(&config_path);
+        let mut out = String::new();
+        sync_topics("lucas", &mb_path, &topics, Some(data), &mut out).unwrap();
         assert!(!mb_path.join("topics").exists());
     }
 
@@ -492,7 +659,9 @@ mailboxes = ["lucas"]
         )
         .unwrap();
 
-        sync_topics("lucas", &mb_path, Some(&config_path), Some(data)).unwrap();
+        let topics = topics_in(&config_path);
+        let mut out = String::new();
+        sync_topics("lucas", &mb_path, &topics, Some(data), &mut out).unwrap();
 
         assert!(root_topic.join("from-lucas.md").exists());
         assert!(mb_topic.join("from-root.md").exists());
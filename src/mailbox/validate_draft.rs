@@ -1,15 +1,10 @@
 //! Validate draft markdown files.
 
 use anyhow::Result;
-use once_cell::sync::Lazy;
-use regex::Regex;
-use std::collections::HashMap;
 use std::path::{Path, PathBuf};
 
 use crate::draft;
 
-static META_RE: Lazy<Regex> = Lazy::new(|| Regex::new(r"(?m)^\*\*(.+?)\*\*:\s*(.+)$").unwrap());
-
 const REQUIRED_FIELDS: &[&str] = &["To"];
 const RECOMMENDED_FIELDS: &[&str] = &["Status", "Author"];
 const VALID_STATUSES: &[&str] = &["draft", "review", "approved", "sent", "scheduled"];
@@ -102,19 +97,19 @@ fn validate_yaml_draft(text: &str) -> Vec<String> {
 /// Validate a legacy `**Key**: value` format draft.
 fn validate_legacy_draft(text: &str) -> Vec<String> {
     let mut issues = Vec::new();
-    let lines: Vec<&str> = text.split('\n').collect();
+
+    // Same header/body split as the push path: metadata and subject come
+    // from the header only, so bold text in the body is never a field.
+    let parsed = draft::parse_legacy(text);
+    let has_separator = parsed.body.is_some();
+    let body_has_text = parsed.body.is_some_and(|body| !body.trim().is_empty());
 
     // Check for subject heading
-    let has_subject = lines.iter().any(|line| line.starts_with("# "));
-    if !has_subject {
+    if parsed.subject.is_empty() {
         issues.push("Missing subject: no '# Subject' heading found".to_string());
     }
 
-    // Parse metadata fields
-    let mut meta: HashMap<String, String> = HashMap::new();
-    for cap in META_RE.captures_iter(text) {
-        meta.insert(cap[1].to_string(), cap[2].trim().to_string());
-    }
+    let meta = parsed.meta;
 
     // Required fields
     for field in REQUIRED_FIELDS {
@@ -153,19 +148,13 @@ fn validate_legacy_draft(text: &str) -> Vec<String> {
     }
 
     // Check for --- separator
-    let has_separator = lines.iter().any(|line| line.trim() == "---");
     if !has_separator {
         issues.push("Missing '---' separator between metadata and body".to_string());
     }
 
     // Check body exists after separator
-    if has_separator {
-        if let Some(sep_idx) = lines.iter().position(|line| line.trim() == "---") {
-            let body: String = lines[sep_idx + 1..].join("\n");
-            if body.trim().is_empty() {
-                issues.push("Warning: empty body after --- separator".to_string());
-            }
-        }
+    if has_separator && !body_has_text {
+        issues.push("Warning: empty body after --- separator".to_string());
     }
 
     issues
@@ -4,8 +4,24 @@ use clap::Parser;
 use corky::cli::{CalCommands, Cli, Commands, ContactCommands, DocCommands, DraftCommands, FilterCommands, LabelCommands, LinkedinCommands, MailboxCommands, ScheduleCommands, SkillCommands, SlackCommands, SyncCommands, TopicCommands, YoutubeCommands};
 
 fn main() -> Result<()> {
+    // A bare `corky --version` / `-V` is answered before clap builds the
+    // whole command tree; the output matches clap's own.
+    let mut args = std::env::args_os().skip(1);
+    if let (Some(arg), None) = (args.next(), args.next()) {
+        if arg == "--version" || arg == "-V" {
+            println!("corky {}", env!("CARGO_PKG_VERSION"));
+            return Ok(());
+        }
+    }
+
     let cli = Cli::parse();
 
+    // `corky help` prints a static table: answer it before reading mailbox
+    // config or the upgrade cache (clap already handles --help/--version).
+    if let Commands::Help { filter } = &cli.command {
+        return corky::help::run(filter.as_deref());
+    }
+
     // Handle --mailbox: resolve named mailbox and set CORKY_DATA
     if let Some(ref mailbox_name) = cli.mailbox {
         let path = corky::app_config::resolve_mailbox(Some(mailbox_name))?;
@@ -20,11 +36,45 @@ fn main() -> Result<()> {
 
 
     // Warn about available upgrades (skip if running the upgrade command itself)
-    if !matches!(cli.command, Commands::Upgrade) {
-        corky::upgrade::warn_if_outdated();
+    let mut pending_upgrade_check = if matches!(cli.command, Commands::Upgrade) {
+        None
+    } else {
+        corky::upgrade::warn_if_outdated()
+    };
+
+    // Interactive and long-running commands wait for the check first, so its
+    // warning never lands mid-prompt or mid-watch, and no thread is running
+    // while `init` sets CORKY_DATA.
+    if waits_for_upgrade_check(&cli.command) {
+        if let Some(check) = pending_upgrade_check.take() {
+            let _ = check.join();
+        }
     }
 
-    match cli.command {
+    let result = run(cli.command);
+    if let Some(check) = pending_upgrade_check {
+        let _ = check.join();
+    }
+    result
+}
+
+/// Commands that prompt, wait on an OAuth callback, or run until stopped.
+fn waits_for_upgrade_check(command: &Commands) -> bool {
+    matches!(
+        command,
+        Commands::Init { .. }
+            | Commands::Watch { .. }
+            | Commands::Transcribe { .. }
+            | Commands::Mailbox(MailboxCommands::Remove { .. })
+            | Commands::Linkedin(LinkedinCommands::Auth { .. })
+            | Commands::Youtube(YoutubeCommands::Auth { .. })
+            | Commands::Cal(CalCommands::Auth { .. })
+            | Commands::Filter(FilterCommands::Auth { .. })
+    )
+}
+
+fn run(command: Commands) -> Result<()> {
+    match command {
         Commands::Init {
             path,
             user,
@@ -95,11 +145,7 @@ fn main() -> Result<()> {
         },
         Commands::AuditDocs => corky::audit_docs::run(),
         Commands::Help { filter } => corky::help::run(filter.as_deref()),
-        Commands::Unanswered { scope, from_name } => {
-            let from = resolve_from_name(from_name)?;
-            let scope = corky::mailbox::find_unanswered::Scope::from_arg(scope.as_deref());
-            corky::mailbox::find_unanswered::run(scope, &from)
-        }
+        Commands::Unanswered { scope, from_name } => run_unanswered(scope, from_name),
         Commands::ValidateDraft { files } => corky::mailbox::validate_draft::run(&files),
         Commands::Draft(cmd) => run_draft_command(cmd),
         Commands::Mailbox(cmd) => match cmd {
@@ -138,12 +184,7 @@ fn main() -> Result<()> {
             MailboxCommands::Reset { name, no_sync } => {
                 corky::mailbox::reset::run(name.as_deref(), no_sync)
             }
-            MailboxCommands::Unanswered { scope, from_name } => {
-                let from = resolve_from_name(from_name)?;
-                let scope =
-                    corky::mailbox::find_unanswered::Scope::from_arg(scope.as_deref());
-                corky::mailbox::find_unanswered::run(scope, &from)
-            }
+            MailboxCommands::Unanswered { scope, from_name } => run_unanswered(scope, from_name),
             MailboxCommands::Draft(cmd) => run_draft_command(cmd),
         },
         Commands::Linkedin(cmd) => match cmd {
@@ -298,6 +339,13 @@ fn run_draft_command(cmd: DraftCommands) -> anyhow::Result<()> {
     }
 }
 
+/// `unanswered` and its `mailbox unanswered` alias.
+fn run_unanswered(scope: Option<String>, from_name: Option<String>) -> Result<()> {
+    let from = resolve_from_name(from_name)?;
+    let scope = corky::mailbox::find_unanswered::Scope::from_arg(scope.as_deref());
+    corky::mailbox::find_unanswered::run(scope, &from)
+}
+
 /// Resolve the --from name: CLI flag > owner.name in .corky.toml > error.
 fn resolve_from_name(from_name: Option<String>) -> anyhow::Result<String> {
     if let Some(name) = from_name {
@@ -6,9 +6,21 @@
 //!   3. App config mailbox (via app_config::resolve_mailbox)
 //!   4. ~/Documents/mail (general user default)
 
+use std::ffi::{OsStr, OsString};
 use std::path::PathBuf;
+use std::sync::Mutex;
+
+/// Last CORKY_DATA / app config resolution, with the `CORKY_DATA` value it
+/// was resolved under.
+static DATA_DIR: Mutex<Option<(Option<OsString>, PathBuf)>> = Mutex::new(None);
 
 /// Return the data directory path.
+///
+/// Every derived helper below goes through here. The cwd checks are a few
+/// stats and run on every call, so a `mail/` or `.corky.toml` created, moved
+/// or removed while `watch` runs is seen at once. The fallback, which may
+/// parse the app config, is reused for as long as `CORKY_DATA` keeps the
+/// value it was resolved under (`--mailbox` and `init` set it at runtime).
 pub fn data_dir() -> PathBuf {
     // If CWD itself contains .corky.toml, treat CWD as the data dir
     // (handles running from inside the mail/ directory)
@@ -20,11 +32,22 @@ pub fn data_dir() -> PathBuf {
     if local.is_dir() {
         return local;
     }
-    if let Ok(env) = std::env::var("CORKY_DATA") {
-        if !env.is_empty() {
-            return PathBuf::from(env);
+    let env = std::env::var_os("CORKY_DATA");
+    let mut cached = DATA_DIR.lock().unwrap();
+    if let Some((key, dir)) = cached.as_ref() {
+        if *key == env {
+            return dir.clone();
         }
     }
+    let dir = resolve_fallback(env.as_deref());
+    *cached = Some((env, dir.clone()));
+    dir
+}
+
+fn resolve_fallback(env: Option<&OsStr>) -> PathBuf {
+    if let Some(env) = env.filter(|e| !e.is_empty()) {
+        return PathBuf::from(env);
+    }
     // Try app config mailbox
     if let Ok(Some(mailbox_path)) = crate::app_config::resolve_mailbox(None) {
         return mailbox_path;
@@ -69,6 +92,10 @@ pub fn sync_state_file() -> PathBuf {
     data_dir().join(".sync-state.json")
 }
 
+pub fn unanswered_cache_file() -> PathBuf {
+    data_dir().join(".unanswered-cache.json")
+}
+
 pub fn manifest_file() -> PathBuf {
     data_dir().join("manifest.toml")
 }
@@ -168,30 +168,13 @@ fn parse_email_scheduled(
         });
     }
 
-    // Fall back to legacy regex parsing
-    let mut status = None;
-    let mut scheduled_at_str = None;
-    let mut subject = String::new();
-
-    for line in content.lines() {
-        if let Some(rest) = line.strip_prefix("# ") {
-            subject = rest.trim().to_string();
-        }
-        if let Some(rest) = line.strip_prefix("**Status**: ") {
-            status = Some(rest.trim().to_string());
-        }
-        if let Some(rest) = line.strip_prefix("**Scheduled-At**: ") {
-            scheduled_at_str = Some(rest.trim().to_string());
-        }
-    }
-
-    let status = status?;
-    if status.to_lowercase() != "scheduled" {
+    // Fall back to the legacy `**Key**: value` format
+    let draft = crate::draft::parse_legacy(content);
+    if draft.meta.get("Status")?.to_lowercase() != "scheduled" {
         return None;
     }
 
-    let scheduled_at_str = scheduled_at_str?;
-    let scheduled_at: DateTime<Utc> = scheduled_at_str.parse().ok()?;
+    let scheduled_at: DateTime<Utc> = draft.meta.get("Scheduled-At")?.parse().ok()?;
 
     if scheduled_at > deadline {
         return None;
@@ -201,10 +184,10 @@ fn parse_email_scheduled(
         path: path.to_path_buf(),
         kind: ScheduledKind::Email,
         scheduled_at,
-        label: if subject.is_empty() {
+        label: if draft.subject.is_empty() {
             "email".to_string()
         } else {
-            subject
+            draft.subject
         },
     })
 }
@@ -24,12 +24,7 @@ pub fn run(account: Option<&str>) -> Result<()> {
     })?;
     let password = resolve_password(acct)?;
 
-    let mut tls_builder = native_tls::TlsConnector::builder();
-    if acct.imap_starttls || acct.imap_host == "127.0.0.1" || acct.imap_host == "localhost" {
-        tls_builder.danger_accept_invalid_certs(true);
-        tls_builder.danger_accept_invalid_hostnames(true);
-    }
-    let tls = tls_builder.build()?;
+    let tls = crate::util::imap_tls_connector(&acct.imap_host, acct.imap_starttls)?;
 
     println!(
         "Connecting to {}:{} as {}\n",
@@ -40,13 +35,13 @@ pub fn run(account: Option<&str>) -> Result<()> {
         imap::connect_starttls(
             (acct.imap_host.as_str(), acct.imap_port),
             &acct.imap_host,
-            &tls,
+            tls,
         )?
     } else {
         imap::connect(
             (acct.imap_host.as_str(), acct.imap_port),
             &acct.imap_host,
-            &tls,
+            tls,
         )?
     };
 
@@ -6,50 +6,88 @@ use imap::Session;
 use native_tls::TlsStream;
 use once_cell::sync::Lazy;
 use regex::Regex;
-use std::collections::HashSet;
+use std::collections::{BTreeMap, HashMap, HashSet};
+use std::fmt::Write;
 use std::net::TcpStream;
 use std::path::{Path, PathBuf};
+use std::sync::atomic::{AtomicUsize, Ordering};
+use std::sync::Mutex;
 
 use super::markdown::{parse_thread_markdown, thread_to_markdown};
-use super::types::{AccountSyncState, LabelState, Message, SyncState, Thread};
+use super::types::{LabelState, Message, SyncState, Thread};
 use crate::config::corky_config;
 use crate::resolve;
-use crate::util::{slugify, thread_key_from_subject};
+use crate::util::{slugify, thread_key_from_subject, write_if_changed};
 
 static THREAD_ID_RE: Lazy<Regex> =
     Lazy::new(|| Regex::new(r"(?m)^\*\*Thread ID\*\*:\s*(.+)$").unwrap());
 
 /// Extract text/plain body from a parsed email.
+///
+/// Prefers the first inline text/plain part anywhere in the MIME tree; if
+/// there is none, falls back to the first non-empty leaf (e.g. HTML-only
+/// mail).
 fn extract_body(parsed: &mailparse::ParsedMail) -> String {
     if parsed.subparts.is_empty() {
-        if let Ok(body) = parsed.get_body() {
-            return body;
-        }
-        return String::new();
+        return parsed.get_body().unwrap_or_default();
     }
-    for part in &parsed.subparts {
-        let ctype = part.ctype.mimetype.as_str();
-        if ctype == "text/plain" {
-            let has_disposition = part
+    find_plain_text(parsed)
+        .or_else(|| first_leaf_body(parsed))
+        .unwrap_or_default()
+}
+
+/// First text/plain leaf without a Content-Disposition, depth first.
+fn find_plain_text(part: &mailparse::ParsedMail) -> Option<String> {
+    for sub in &part.subparts {
+        if !sub.subparts.is_empty() {
+            if let Some(body) = find_plain_text(sub) {
+                return Some(body);
+            }
+        } else if sub.ctype.mimetype == "text/plain"
+            && !sub
                 .headers
                 .iter()
-                .any(|h| h.get_key_ref().eq_ignore_ascii_case("Content-Disposition"));
-            if !has_disposition {
-                if let Ok(body) = part.get_body() {
-                    return body;
-                }
+                .any(|h| h.get_key_ref().eq_ignore_ascii_case("Content-Disposition"))
+        {
+            if let Ok(body) = sub.get_body() {
+                return Some(body);
             }
         }
-        let nested = extract_body(part);
-        if !nested.is_empty() {
-            return nested;
-        }
     }
-    String::new()
+    None
+}
+
+/// First leaf with a non-empty decoded body, depth first.
+fn first_leaf_body(part: &mailparse::ParsedMail) -> Option<String> {
+    if part.subparts.is_empty() {
+        return part.get_body().ok().filter(|body| !body.is_empty());
+    }
+    part.subparts.iter().find_map(first_leaf_body)
 }
 
+/// Parsed dates, keyed by the raw header value. Threads are re-sorted on
+/// every flush (and every watch poll), so the same strings recur.
+static MSG_DATES: Lazy<Mutex<HashMap<String, DateTime<Utc>>>> =
+    Lazy::new(|| Mutex::new(HashMap::new()));
+
+/// Entries kept in [`MSG_DATES`] before it is cleared.
+const MSG_DATE_CACHE: usize = 4096;
+
 /// Parse an RFC 2822 date string, falling back to epoch on failure.
 pub fn parse_msg_date(date_str: &str) -> DateTime<Utc> {
+    if let Some(dt) = MSG_DATES.lock().unwrap().get(date_str) {
+        return *dt;
+    }
+    let dt = parse_date_uncached(date_str);
+    let mut dates = MSG_DATES.lock().unwrap();
+    if dates.len() >= MSG_DATE_CACHE {
+        dates.clear();
+    }
+    dates.insert(date_str.to_string(), dt);
+    dt
+}
+
+fn parse_date_uncached(date_str: &str) -> DateTime<Utc> {
     DateTime::parse_from_rfc2822(date_str)
         .map(|dt| dt.with_timezone(&Utc))
         .or_else(|_| {
@@ -87,37 +125,202 @@ fn set_mtime(path: &Path, date_str: &str) -> Result<()> {
     Ok(())
 }
 
-/// Find an existing thread file by its Thread ID metadata.
-fn find_thread_file(out_dir: &Path, thread_id: &str) -> Option<PathBuf> {
-    if !out_dir.exists() {
-        return None;
+/// Thread files touched during one sync or import run.
+///
+/// Maps Thread IDs to files (each output directory is scanned once), keeps
+/// every thread it reads parsed in memory, and holds merged threads back
+/// until [`ThreadIndex::flush`], so a thread gaining several messages is read
+/// and written once. The index is only valid while this process is the sole
+/// writer, so it lives for a single run.
+#[derive(Debug, Default)]
+pub struct ThreadIndex {
+    dirs: HashMap<PathBuf, HashMap<String, PathBuf>>,
+    threads: HashMap<PathBuf, Thread>,
+    /// Dedup keys of each cached thread's messages, kept alongside `threads`.
+    seen: HashMap<PathBuf, HashSet<(String, String)>>,
+    /// Files with unwritten changes; `true` if the thread gained a message.
+    dirty: BTreeMap<PathBuf, bool>,
+}
+
+impl ThreadIndex {
+    /// Existing thread file for `thread_id` in `out_dir`, if any.
+    fn find(&mut self, out_dir: &Path, thread_id: &str) -> Option<PathBuf> {
+        self.dir(out_dir).get(thread_id).cloned()
+    }
+
+    fn insert(&mut self, out_dir: &Path, thread_id: &str, path: PathBuf) {
+        self.dir(out_dir).insert(thread_id.to_string(), path);
+    }
+
+    fn dir(&mut self, out_dir: &Path) -> &mut HashMap<String, PathBuf> {
+        self.dirs
+            .entry(out_dir.to_path_buf())
+            .or_insert_with(|| scan_thread_files(out_dir))
+    }
+
+    /// The cached thread at `path`, read from disk on first use if `existing`.
+    fn thread(
+        &mut self,
+        path: &Path,
+        existing: bool,
+        thread_key: &str,
+        message: &Message,
+    ) -> Result<&mut Thread> {
+        if !self.threads.contains_key(path) {
+            let new_thread = || Thread {
+                id: thread_key.to_string(),
+                subject: message.subject.clone(),
+                ..Default::default()
+            };
+            let thread = if existing {
+                let text = std::fs::read_to_string(path)?;
+                parse_thread_markdown(&text).unwrap_or_else(new_thread)
+            } else {
+                new_thread()
+            };
+            self.seen.insert(
+                path.to_path_buf(),
+                thread.messages.iter().map(dedup_key).collect(),
+            );
+            self.threads.insert(path.to_path_buf(), thread);
+        }
+        Ok(self.threads.get_mut(path).expect("thread was just cached"))
+    }
+
+    /// The key to file `message` under in `out_dir`.
+    ///
+    /// Without a Gmail thread ID this is the subject key, which also finds
+    /// Gmail threads: they are indexed under their subject key as well. With
+    /// one, it is the Gmail ID. A subject-keyed thread written before Gmail
+    /// IDs were used is adopted by the first Gmail thread to reach it: its
+    /// Thread ID is rewritten, so later, unrelated Gmail threads with the
+    /// same subject start their own file.
+    fn thread_key(
+        &mut self,
+        out_dir: &Path,
+        gmail_id: Option<&str>,
+        subject_key: &str,
+        message: &Message,
+    ) -> Result<String> {
+        let Some(id) = gmail_id else {
+            return Ok(subject_key.to_string());
+        };
+        if self.dir(out_dir).contains_key(id) {
+            return Ok(id.to_string());
+        }
+        if let Some(path) = self.find(out_dir, subject_key) {
+            let thread = self.thread(&path, true, subject_key, message)?;
+            if !thread.id.starts_with(GMAIL_KEY_PREFIX) {
+                thread.id = id.to_string();
+                self.dirty.entry(path.clone()).or_insert(false);
+                self.insert(out_dir, id, path);
+            }
+        }
+        Ok(id.to_string())
+    }
+
+    /// Whether `out_dir` already holds `message` (same sender and date) in
+    /// its thread for `thread_key`.
+    fn has_message(&mut self, out_dir: &Path, thread_key: &str, message: &Message) -> Result<bool> {
+        let Some(path) = self.find(out_dir, thread_key) else {
+            return Ok(false);
+        };
+        self.thread(&path, true, thread_key, message)?;
+        Ok(self.seen[&path].contains(&dedup_key(message)))
+    }
+
+    /// A file name for `slug` not taken on disk or by an unwritten thread.
+    fn unique_slug(&self, out_dir: &Path, slug: &str) -> String {
+        let taken = |name: &str| {
+            let path = out_dir.join(format!("{}.md", name));
+            path.exists() || self.threads.contains_key(&path)
+        };
+        if !taken(slug) {
+            return slug.to_string();
+        }
+        let mut n = 2;
+        while taken(&format!("{}-{}", slug, n)) {
+            n += 1;
+        }
+        format!("{}-{}", slug, n)
+    }
+
+    /// Write every thread changed since the last flush, skipping files whose
+    /// content would not change.
+    ///
+    /// "Wrote:" lines are printed in one write, including those for files
+    /// written before an error.
+    pub fn flush(&mut self) -> Result<()> {
+        let mut wrote = String::new();
+        let result = self.flush_into(&mut wrote);
+        print!("{}", wrote);
+        result
+    }
+
+    fn flush_into(&mut self, wrote: &mut String) -> Result<()> {
+        while let Some((path, gained)) = self.dirty.pop_first() {
+            let thread = self.threads.get_mut(&path).expect("dirty thread is cached");
+            if gained {
+                // Parse each date once rather than on every comparison.
+                thread.messages.sort_by_cached_key(|m| parse_msg_date(&m.date));
+                thread.last_date = thread
+                    .messages
+                    .last()
+                    .map(|m| m.date.clone())
+                    .unwrap_or_default();
+            }
+            // Re-merged duplicates usually render to the bytes already on disk.
+            write_if_changed(&path, thread_to_markdown(thread))?;
+            let _ = set_mtime(&path, &thread.last_date);
+            if gained {
+                writeln!(
+                    wrote,
+                    "  Wrote: {}",
+                    path.file_name().unwrap_or_default().to_string_lossy()
+                )?;
+            }
+        }
+        Ok(())
     }
-    for entry in std::fs::read_dir(out_dir).ok()?.flatten() {
+}
+
+/// Messages in a thread are duplicates if they share sender and date.
+fn dedup_key(message: &Message) -> (String, String) {
+    (message.from.clone(), message.date.clone())
+}
+
+/// Map each thread file in `out_dir` by its Thread ID metadata.
+/// The first file seen for an ID wins.
+///
+/// Gmail-keyed threads are also mapped under their subject key, unless a
+/// thread already uses that key, so subject-keyed sources find them.
+fn scan_thread_files(out_dir: &Path) -> HashMap<String, PathBuf> {
+    let mut files = HashMap::new();
+    let mut aliases = Vec::new();
+    let Ok(entries) = std::fs::read_dir(out_dir) else {
+        return files;
+    };
+    for entry in entries.flatten() {
         let path = entry.path();
         if path.extension().and_then(|e| e.to_str()) != Some("md") {
             continue;
         }
         if let Ok(text) = std::fs::read_to_string(&path) {
             if let Some(cap) = THREAD_ID_RE.captures(&text) {
-                if cap[1].trim() == thread_id {
-                    return Some(path);
+                let id = cap[1].trim();
+                if id.starts_with(GMAIL_KEY_PREFIX) {
+                    if let Some(subject) = text.lines().find_map(|l| l.strip_prefix("# ")) {
+                        aliases.push((thread_key_from_subject(subject), path.clone()));
+                    }
                 }
+                files.entry(id.to_string()).or_insert(path);
             }
         }
     }
-    None
-}
-
-/// Return a slug that doesn't collide with existing files.
-fn unique_slug(out_dir: &Path, slug: &str) -> String {
-    if !out_dir.join(format!("{}.md", slug)).exists() {
-        return slug.to_string();
-    }
-    let mut n = 2;
-    while out_dir.join(format!("{}-{}.md", slug, n)).exists() {
-        n += 1;
+    for (key, path) in aliases {
+        files.entry(key).or_insert(path);
     }
-    format!("{}-{}", slug, n)
+    files
 }
 
 /// Merge a single message into its thread file on disk.
@@ -129,25 +332,51 @@ pub fn merge_message_to_file(
     account_name: &str,
     message: &Message,
     thread_key: &str,
+) -> Result<Option<PathBuf>> {
+    let mut index = ThreadIndex::default();
+    let path = merge_message_indexed(
+        &mut index,
+        out_dir,
+        label_name,
+        account_name,
+        message,
+        thread_key,
+    )?;
+    index.flush()?;
+    Ok(path)
+}
+
+/// [`merge_message_to_file`] against `index`. The merge is held in memory;
+/// nothing is written until `index.flush()`.
+pub fn merge_message_indexed(
+    index: &mut ThreadIndex,
+    out_dir: &Path,
+    label_name: &str,
+    account_name: &str,
+    message: &Message,
+    thread_key: &str,
 ) -> Result<Option<PathBuf>> {
     std::fs::create_dir_all(out_dir)?;
 
-    let existing_file = find_thread_file(out_dir, thread_key);
-    let mut thread: Thread = if let Some(ref ef) = existing_file {
-        let text = std::fs::read_to_string(ef)?;
-        parse_thread_markdown(&text).unwrap_or_else(|| Thread {
-            id: thread_key.to_string(),
-            subject: message.subject.clone(),
-            ..Default::default()
-        })
-    } else {
-        Thread {
-            id: thread_key.to_string(),
-            subject: message.subject.clone(),
-            ..Default::default()
+    let (file_path, existing) = match index.find(out_dir, thread_key) {
+        Some(path) => (path, true),
+        None => {
+            let slug = index.unique_slug(out_dir, &slugify(&message.subject));
+            let path = out_dir.join(format!("{}.md", slug));
+            index.insert(out_dir, thread_key, path.clone());
+            if thread_key.starts_with(GMAIL_KEY_PREFIX) {
+                // As on a rescan: subject-keyed sources find the thread too.
+                index
+                    .dir(out_dir)
+                    .entry(thread_key_from_subject(&message.subject))
+                    .or_insert_with(|| path.clone());
+            }
+            (path, false)
         }
     };
 
+    let thread = index.thread(&file_path, existing, thread_key, message)?;
+
     // Accumulate labels and accounts
     if !label_name.is_empty() && !thread.labels.contains(&label_name.to_string()) {
         thread.labels.push(label_name.to_string());
@@ -157,42 +386,24 @@ pub fn merge_message_to_file(
     }
 
     // Deduplicate by (from, date)
-    let seen: HashSet<(&str, &str)> = thread
-        .messages
-        .iter()
-        .map(|m| (m.from.as_str(), m.date.as_str()))
-        .collect();
-    if seen.contains(&(message.from.as_str(), message.date.as_str())) {
+    let seen = index
+        .seen
+        .get_mut(&file_path)
+        .expect("seen set is cached with its thread");
+    if !seen.insert(dedup_key(message)) {
         // Still update labels/accounts even if message is a dupe
-        if let Some(ref ef) = existing_file {
-            std::fs::write(ef, thread_to_markdown(&thread))?;
-            let _ = set_mtime(ef, &thread.last_date);
-        }
-        return Ok(existing_file);
+        index.dirty.entry(file_path.clone()).or_insert(false);
+        return Ok(Some(file_path));
     }
 
-    thread.messages.push(message.clone());
-    thread.messages.sort_by_key(|m| parse_msg_date(&m.date));
-    thread.last_date = thread
+    // Sorted by date (and last_date set) when flushed.
+    index
+        .threads
+        .get_mut(&file_path)
+        .expect("thread was just cached")
         .messages
-        .last()
-        .map(|m| m.date.clone())
-        .unwrap_or_default();
-
-    let file_path = if let Some(ef) = existing_file {
-        ef
-    } else {
-        let slug = unique_slug(out_dir, &slugify(&thread.subject));
-        out_dir.join(format!("{}.md", slug))
-    };
-
-    std::fs::write(&file_path, thread_to_markdown(&thread))?;
-    let _ = set_mtime(&file_path, &thread.last_date);
-
-    println!(
-        "  Wrote: {}",
-        file_path.file_name().unwrap_or_default().to_string_lossy()
-    );
+        .push(message.clone());
+    index.dirty.insert(file_path.clone(), true);
     Ok(Some(file_path))
 }
 
@@ -202,31 +413,25 @@ pub fn merge_message_to_file(
 /// Supports `account:label` syntax for per-account binding.
 pub fn build_label_routes(account_name: &str) -> std::collections::HashMap<String, Vec<PathBuf>> {
     let mut routes: std::collections::HashMap<String, Vec<PathBuf>> = std::collections::HashMap::new();
-    let config = match corky_config::try_load_config(None) {
-        Some(c) => c,
-        None => return routes,
+    // Only [routing] is read, so borrow the cached parse rather than copy it.
+    let Some(config) = corky_config::try_load_config_shared(None) else {
+        return routes;
     };
     let data_dir = resolve::data_dir();
     for (label_key, mailbox_paths) in &config.routing {
-        if label_key.contains(':') {
-            let parts: Vec<&str> = label_key.splitn(2, ':').collect();
-            let label_account = parts[0];
-            let label_name = parts[1];
-            if !account_name.is_empty() && label_account != account_name {
-                continue;
+        let label_name = match label_key.split_once(':') {
+            Some((label_account, label_name)) => {
+                if !account_name.is_empty() && label_account != account_name {
+                    continue;
+                }
+                label_name
             }
-            let dirs: Vec<PathBuf> = mailbox_paths
-                .iter()
-                .map(|p| data_dir.join(p).join("conversations"))
-                .collect();
-            routes.entry(label_name.to_string()).or_default().extend(dirs);
-        } else {
-            let dirs: Vec<PathBuf> = mailbox_paths
-                .iter()
-                .map(|p| data_dir.join(p).join("conversations"))
-                .collect();
-            routes.entry(label_key.clone()).or_default().extend(dirs);
-        }
+            None => label_key.as_str(),
+        };
+        let dirs = mailbox_paths
+            .iter()
+            .map(|p| data_dir.join(p).join("conversations"));
+        routes.entry(label_name.to_string()).or_default().extend(dirs);
     }
     routes
 }
@@ -252,26 +457,43 @@ fn connect_imap(
     user: &str,
     password: &str,
 ) -> Result<ImapSession> {
-    let mut tls_builder = native_tls::TlsConnector::builder();
-
-    if starttls || host == "127.0.0.1" || host == "localhost" {
-        tls_builder.danger_accept_invalid_certs(true);
-        tls_builder.danger_accept_invalid_hostnames(true);
-    }
-
-    let tls = tls_builder.build()?;
+    let tls = crate::util::imap_tls_connector(host, starttls)?;
 
     let client = if starttls {
-        imap::connect_starttls((host, port), host, &tls)?
+        imap::connect_starttls((host, port), host, tls)?
     } else {
-        imap::connect((host, port), host, &tls)?
+        imap::connect((host, port), host, tls)?
     };
 
     let session = client.login(user, password).map_err(|e| e.0)?;
     Ok(session)
 }
 
+/// Logged-in IMAP sessions kept open between `corky watch` polls, by account.
+///
+/// Reusing a session skips the TLS handshake and LOGIN on every poll; a
+/// NOOP checks it is still alive first, and a dead one is replaced. An
+/// account keeps one session per label job.
+#[derive(Default)]
+pub struct SessionPool {
+    sessions: HashMap<String, Vec<ImapSession>>,
+}
+
+impl SessionPool {
+    /// Log out of every pooled session.
+    pub fn logout_all(&mut self) {
+        for (_, sessions) in self.sessions.drain() {
+            for mut session in sessions {
+                let _ = session.logout();
+            }
+        }
+    }
+}
+
 /// Sync all labels for one account.
+///
+/// With a `pool`, the account's open sessions are reused and kept open
+/// afterwards; without one, every session is logged out when done.
 #[allow(clippy::too_many_arguments)]
 pub fn sync_account(
     account_name: &str,
@@ -285,7 +507,8 @@ pub fn sync_account(
     state: &mut SyncState,
     full: bool,
     base_dir: Option<&Path>,
-    mut touched: Option<&mut HashSet<PathBuf>>,
+    touched: Option<&mut HashSet<PathBuf>>,
+    mut pool: Option<&mut SessionPool>,
 ) -> Result<()> {
     let base_dir = base_dir
         .map(PathBuf::from)
@@ -314,72 +537,265 @@ pub fn sync_account(
         return Ok(());
     }
 
-    println!("Connecting to {}:{} as {}", host, port, user);
-
-    let mut session = connect_imap(host, port, starttls, user, password)?;
+    let mut pooled: Vec<ImapSession> = pool
+        .as_mut()
+        .and_then(|p| p.sessions.remove(account_name))
+        .unwrap_or_default()
+        .into_iter()
+        .filter_map(|mut session| session.noop().is_ok().then_some(session))
+        .collect();
+    let mut session = match pooled.pop() {
+        Some(session) => session,
+        None => {
+            println!("Connecting to {}:{} as {}", host, port, user);
+            connect_imap(host, port, starttls, user, password)?
+        }
+    };
+    // Servers with Gmail's IMAP extensions report their own thread IDs;
+    // elsewhere threads are keyed by subject.
+    let gmail = session
+        .capabilities()
+        .map(|caps| caps.has_str("X-GM-EXT-1"))
+        .unwrap_or(false);
+    // Labels often share output dirs; scan each one once for the whole account.
+    let index = Mutex::new(ThreadIndex::default());
+    let touched = Mutex::new(touched);
+    let priors = &acct_state.labels;
+    let next = AtomicUsize::new(0);
+    let results = Mutex::new(Vec::new());
 
-    for label in &all_labels {
+    // Each worker takes the next label until none are left; a failed label
+    // stops its worker, since the session may be unusable.
+    let work = |session: &mut ImapSession| loop {
+        let i = next.fetch_add(1, Ordering::Relaxed);
+        let Some(label) = all_labels.get(i) else {
+            break;
+        };
         // Collect all output dirs: base + any fan-out routes
         let mut out_dirs = vec![base_dir.clone()];
         if let Some(dirs) = routes.get(label) {
             out_dirs.extend(dirs.iter().cloned());
         }
 
-        sync_label(
-            &mut session,
+        let mut out = String::new();
+        let result = sync_label(
+            session,
             label,
             account_name,
-            acct_state,
+            priors.get(label),
             full,
             sync_days,
+            gmail,
             &out_dirs,
-            &mut touched,
-        )?;
+            &index,
+            &touched,
+            &mut out,
+        );
+        print!("{}", out);
+        let failed = result.is_err();
+        results.lock().unwrap().push((i, result));
+        if failed {
+            break;
+        }
+    };
+
+    // Labels are network-bound, so extra sessions sync them in parallel.
+    // Pooled ones are used first; the rest are connected here.
+    let jobs = all_labels.len().min(MAX_LABEL_JOBS);
+    let spare = Mutex::new(pooled);
+    let extras = Mutex::new(Vec::new());
+    std::thread::scope(|scope| {
+        for _ in 1..jobs {
+            scope.spawn(|| {
+                let extra = spare.lock().unwrap().pop();
+                let extra = match extra {
+                    Some(extra) => Ok(extra),
+                    None => connect_imap(host, port, starttls, user, password),
+                };
+                match extra {
+                    Ok(mut extra) => {
+                        work(&mut extra);
+                        extras.lock().unwrap().push(extra);
+                    }
+                    Err(e) => eprintln!("  Warning: extra IMAP connection failed: {}", e),
+                }
+            });
+        }
+        work(&mut session);
+    });
+    let mut extras = extras.into_inner().unwrap();
+    extras.extend(spare.into_inner().unwrap());
+
+    // Write merged threads and record finished labels even if one failed.
+    index.into_inner().unwrap().flush()?;
+    let mut results = results.into_inner().unwrap();
+    results.sort_unstable_by_key(|(i, _)| *i);
+    let mut first_error = None;
+    for (i, result) in results {
+        match result {
+            Ok(Some(label_state)) => {
+                acct_state.labels.insert(all_labels[i].clone(), label_state);
+            }
+            Ok(None) => {}
+            Err(e) => {
+                first_error.get_or_insert(e);
+            }
+        }
+    }
+    if let Some(e) = first_error {
+        for mut extra in extras {
+            let _ = extra.logout();
+        }
+        return Err(e);
     }
 
+    if let Some(pool) = pool {
+        extras.push(session);
+        pool.sessions.insert(account_name.to_string(), extras);
+        return Ok(());
+    }
     // Logout errors are non-fatal — data is already fetched and merged.
     // Some servers (e.g. ProtonMail Bridge) return responses the imap
     // crate cannot parse during logout.
     let _ = session.logout();
+    for mut extra in extras {
+        let _ = extra.logout();
+    }
     Ok(())
 }
 
+/// Labels synced at once per account, each on its own IMAP connection.
+const MAX_LABEL_JOBS: usize = 4;
+
+/// UIDs requested per `UID FETCH`, bounding how many raw messages are held at once.
+const FETCH_CHUNK: usize = 200;
+
+/// Comma-separated UID set for `UID FETCH`.
+fn uid_set<'a>(uids: impl Iterator<Item = &'a u32>) -> String {
+    uids.map(u32::to_string).collect::<Vec<_>>().join(",")
+}
+
+/// Thread keys from Gmail thread IDs are `gm:<X-GM-THRID>`.
+const GMAIL_KEY_PREFIX: &str = "gm:";
+
+/// Gmail thread IDs (`X-GM-THRID`) for `uids`, as `gm:<id>` thread keys.
+///
+/// imap-proto cannot parse Gmail's fetch attributes, so the raw response is
+/// read directly.
+fn fetch_gmail_thread_ids(session: &mut ImapSession, uids: &[u32]) -> Result<HashMap<u32, String>> {
+    let raw = session.run_command_and_read_response(format!(
+        "UID FETCH {} (X-GM-THRID)",
+        uid_set(uids.iter())
+    ))?;
+    Ok(parse_gmail_thread_ids(&String::from_utf8_lossy(&raw)))
+}
+
+/// UID → `gm:<id>` from `* n FETCH (X-GM-THRID id UID uid)` lines.
+fn parse_gmail_thread_ids(raw: &str) -> HashMap<u32, String> {
+    let mut ids = HashMap::new();
+    for line in raw.lines() {
+        let Some(start) = line.find("FETCH (") else {
+            continue;
+        };
+        let mut attrs = line[start + "FETCH (".len()..]
+            .trim_end_matches(')')
+            .split_whitespace();
+        let (mut uid, mut thread_id) = (None, None);
+        while let (Some(name), Some(value)) = (attrs.next(), attrs.next()) {
+            if name.eq_ignore_ascii_case("UID") {
+                uid = value.parse::<u32>().ok();
+            } else if name.eq_ignore_ascii_case("X-GM-THRID") {
+                thread_id = Some(value);
+            }
+        }
+        if let (Some(uid), Some(thread_id)) = (uid, thread_id) {
+            ids.insert(uid, format!("{}{}", GMAIL_KEY_PREFIX, thread_id));
+        }
+    }
+    ids
+}
+
+/// Header fields read by [`header_message`], in slot order.
+const HEADER_FIELDS: [&str; 5] = ["Subject", "From", "To", "Cc", "Date"];
+
+/// A message built from its headers alone; the body is filled in later.
+///
+/// One pass over the headers: only the first occurrence of each wanted
+/// field is decoded, and the scan stops once every field is found.
+fn header_message(uid: u32, headers: &[mailparse::MailHeader]) -> Message {
+    let mut values: [Option<String>; 5] = Default::default();
+    let mut missing = HEADER_FIELDS.len();
+    for h in headers {
+        let key = h.get_key_ref();
+        let Some(slot) = HEADER_FIELDS
+            .iter()
+            .position(|field| key.eq_ignore_ascii_case(field))
+        else {
+            continue;
+        };
+        if values[slot].is_none() {
+            values[slot] = Some(h.get_value());
+            missing -= 1;
+            if missing == 0 {
+                break;
+            }
+        }
+    }
+    let [subject, from, to, cc, date] = values;
+    let subject = subject.unwrap_or_else(|| "(no subject)".to_string());
+    Message {
+        id: uid.to_string(),
+        thread_id: thread_key_from_subject(&subject),
+        from: from.unwrap_or_default(),
+        to: to.unwrap_or_default(),
+        cc: cc.unwrap_or_default(),
+        date: date.unwrap_or_default(),
+        subject,
+        body: String::new(),
+    }
+}
+
 /// Sync a single IMAP label/folder, writing to multiple output dirs (fan-out).
+///
+/// Progress goes to `out` so concurrent labels print as whole blocks.
+/// Returns the label's new state, or `None` if the folder does not exist.
 #[allow(clippy::too_many_arguments)]
 fn sync_label(
     session: &mut ImapSession,
     label_name: &str,
     account_name: &str,
-    acct_state: &mut AccountSyncState,
+    prior: Option<&LabelState>,
     full: bool,
     sync_days: u32,
+    gmail: bool,
     out_dirs: &[PathBuf],
-    touched: &mut Option<&mut HashSet<PathBuf>>,
-) -> Result<()> {
-    println!("Syncing label: {}", label_name);
+    index: &Mutex<ThreadIndex>,
+    touched: &Mutex<Option<&mut HashSet<PathBuf>>>,
+    out: &mut String,
+) -> Result<Option<LabelState>> {
+    writeln!(out, "Syncing label: {}", label_name)?;
 
     let mailbox = match session.select(label_name) {
         Ok(mb) => mb,
         Err(_) => {
-            println!("  Label \"{}\" not found \u{2014} skipping", label_name);
-            return Ok(());
+            writeln!(out, "  Label \"{}\" not found \u{2014} skipping", label_name)?;
+            return Ok(None);
         }
     };
 
     let uidvalidity = mailbox.uid_validity.unwrap_or(0);
-    let prior = acct_state.labels.get(label_name);
 
     let do_full = full || prior.is_none() || prior.map(|p| p.uidvalidity) != Some(uidvalidity);
 
     let uids: Vec<u32> = if do_full {
         if let Some(p) = prior {
             if p.uidvalidity != uidvalidity {
-                println!("  UIDVALIDITY changed \u{2014} doing full resync");
+                writeln!(out, "  UIDVALIDITY changed \u{2014} doing full resync")?;
             } else if full {
-                println!("  Full sync requested");
+                writeln!(out, "  Full sync requested")?;
             }
         } else {
-            println!("  No prior state \u{2014} doing full sync");
+            writeln!(out, "  No prior state \u{2014} doing full sync")?;
         }
 
         let since_date = Utc::now() - chrono::Duration::days(sync_days as i64);
@@ -396,112 +812,222 @@ fn sync_label(
     };
 
     if uids.is_empty() {
-        println!("  No new messages");
-        acct_state.labels.insert(
-            label_name.to_string(),
-            LabelState {
-                uidvalidity,
-                last_uid: prior.map(|p| p.last_uid).unwrap_or(0),
-            },
-        );
-        return Ok(());
+        writeln!(out, "  No new messages")?;
+        return Ok(Some(LabelState {
+            uidvalidity,
+            last_uid: prior.map(|p| p.last_uid).unwrap_or(0),
+        }));
     }
 
-    println!("  Fetching {} message(s)", uids.len());
+    writeln!(out, "  Fetching {} message(s)", uids.len())?;
 
     let mut max_uid = prior.map(|p| p.last_uid).unwrap_or(0);
 
-    for uid in &uids {
-        let fetches = session.uid_fetch(uid.to_string(), "RFC822")?;
-        let fetch = match fetches.iter().next() {
-            Some(f) => f,
-            None => continue,
+    for chunk in uids.chunks(FETCH_CHUNK) {
+        // Headers first: sender and date are enough to spot messages every
+        // output dir already has, so only new ones are downloaded in full.
+        let headers = session.uid_fetch(uid_set(chunk.iter()), "BODY.PEEK[HEADER]")?;
+        let mut messages: Vec<(u32, Message)> = Vec::new();
+        for fetch in headers.iter() {
+            let (Some(uid), Some(raw)) = (fetch.uid, fetch.header()) else {
+                continue;
+            };
+            match mailparse::parse_headers(raw) {
+                Ok((headers, _)) => messages.push((uid, header_message(uid, &headers))),
+                Err(e) => eprintln!("  Warning: failed to parse message UID {}: {}", uid, e),
+            }
+        }
+        messages.sort_unstable_by_key(|(uid, _)| *uid);
+        let gmail_ids = if gmail {
+            fetch_gmail_thread_ids(session, chunk)?
+        } else {
+            HashMap::new()
         };
 
-        let body_raw = match fetch.body() {
-            Some(b) => b,
-            None => continue,
+        // The thread index is only locked for local work, never across a fetch.
+        let needs_body = {
+            let mut threads = index.lock().unwrap();
+            let mut needs_body = Vec::new();
+            for (uid, message) in &messages {
+                let gmail_id = gmail_ids.get(uid).map(String::as_str);
+                for out_dir in out_dirs {
+                    let key =
+                        threads.thread_key(out_dir, gmail_id, &message.thread_id, message)?;
+                    if !threads.has_message(out_dir, &key, message)? {
+                        needs_body.push(*uid);
+                        break;
+                    }
+                }
+            }
+            needs_body
         };
 
-        let parsed = match mailparse::parse_mail(body_raw) {
-            Ok(p) => p,
-            Err(e) => {
-                eprintln!("  Warning: failed to parse message UID {}: {}", uid, e);
-                continue;
+        let mut bodies: HashMap<u32, String> = HashMap::new();
+        if !needs_body.is_empty() {
+            let fetches = session.uid_fetch(uid_set(needs_body.iter()), "RFC822")?;
+            for fetch in fetches.iter() {
+                let (Some(uid), Some(raw)) = (fetch.uid, fetch.body()) else {
+                    continue;
+                };
+                match mailparse::parse_mail(raw) {
+                    Ok(parsed) => {
+                        bodies.insert(uid, extract_body(&parsed));
+                    }
+                    Err(e) => {
+                        eprintln!("  Warning: failed to parse message UID {}: {}", uid, e)
+                    }
+                }
             }
-        };
+        }
 
-        let subject = parsed
-            .headers
-            .iter()
-            .find(|h| h.get_key_ref().eq_ignore_ascii_case("Subject"))
-            .map(|h| h.get_value())
-            .unwrap_or_else(|| "(no subject)".to_string());
+        let mut threads = index.lock().unwrap();
+        let mut touched = touched.lock().unwrap();
+        for (uid, mut message) in messages {
+            // Duplicates still merge (without a body) to record the label
+            // and account on their threads.
+            if needs_body.contains(&uid) {
+                match bodies.remove(&uid) {
+                    Some(body) => message.body = body,
+                    None => continue,
+                }
+            }
 
-        let from = parsed
-            .headers
-            .iter()
-            .find(|h| h.get_key_ref().eq_ignore_ascii_case("From"))
-            .map(|h| h.get_value())
-            .unwrap_or_default();
+            let gmail_id = gmail_ids.get(&uid).map(String::as_str);
+            for out_dir in out_dirs {
+                let thread_key =
+                    threads.thread_key(out_dir, gmail_id, &message.thread_id, &message)?;
+                let file_path = merge_message_indexed(
+                    &mut threads,
+                    out_dir,
+                    label_name,
+                    account_name,
+                    &message,
+                    &thread_key,
+                )?;
+                if let Some(touched_set) = touched.as_mut() {
+                    if let Some(ref fp) = file_path {
+                        touched_set.insert(fp.clone());
+                    }
+                }
+            }
 
-        let to = parsed
-            .headers
-            .iter()
-            .find(|h| h.get_key_ref().eq_ignore_ascii_case("To"))
-            .map(|h| h.get_value())
-            .unwrap_or_default();
+            if uid > max_uid {
+                max_uid = uid;
+            }
+        }
+    }
 
-        let cc = parsed
-            .headers
-            .iter()
-            .find(|h| h.get_key_ref().eq_ignore_ascii_case("Cc"))
-            .map(|h| h.get_value())
-            .unwrap_or_default();
+    Ok(Some(LabelState {
+        uidvalidity,
+        last_uid: max_uid,
+    }))
+}
 
-        let date = parsed
-            .headers
-            .iter()
-            .find(|h| h.get_key_ref().eq_ignore_ascii_case("Date"))
-            .map(|h| h.get_value())
-            .unwrap_or_default();
-
-        let thread_key = thread_key_from_subject(&subject);
-        let body = extract_body(&parsed);
-
-        let message = Message {
-            id: uid.to_string(),
-            thread_id: thread_key.clone(),
-            from,
-            to,
-            cc,
-            date,
-            subject,
-            body,
-        };
+#[cfg(test)]
+mod tests {
+    use super::*;
 
-        for out_dir in out_dirs {
-            let file_path =
-                merge_message_to_file(out_dir, label_name, account_name, &message, &thread_key)?;
-            if let Some(touched_set) = touched {
-                if let Some(ref fp) = file_path {
-                    touched_set.insert(fp.clone());
-                }
-            }
-        }
+    #[test]
+    fn test_extract_body_prefers_plain_text_over_earlier_html() {
+        let raw = b"Content-Type: multipart/mixed; boundary=\"outer\"\r\n\r\n\
+--outer\r\nContent-Type: text/html\r\n\r\n<p>html</p>\r\n\
+--outer\r\nContent-Type: multipart/alternative; boundary=\"inner\"\r\n\r\n\
+--inner\r\nContent-Type: text/plain\r\n\r\nplain text\r\n\
+--inner--\r\n\
+--outer\r\nContent-Type: text/plain\r\nContent-Disposition: attachment\r\n\r\nattached\r\n\
+--outer--\r\n";
+        let parsed = mailparse::parse_mail(raw).unwrap();
+        assert_eq!(extract_body(&parsed).trim(), "plain text");
+    }
 
-        if *uid > max_uid {
-            max_uid = *uid;
-        }
+    #[test]
+    fn test_extract_body_falls_back_to_first_leaf() {
+        let raw = b"Content-Type: multipart/alternative; boundary=\"b\"\r\n\r\n\
+--b\r\nContent-Type: text/html\r\n\r\n<p>only html</p>\r\n\
+--b--\r\n";
+        let parsed = mailparse::parse_mail(raw).unwrap();
+        assert_eq!(extract_body(&parsed).trim(), "<p>only html</p>");
     }
 
-    acct_state.labels.insert(
-        label_name.to_string(),
-        LabelState {
-            uidvalidity,
-            last_uid: max_uid,
-        },
-    );
+    #[test]
+    fn test_parse_gmail_thread_ids() {
+        let raw = "* 1 FETCH (X-GM-THRID 1278455344230334865 UID 41)\r\n\
+* 2 FETCH (UID 42 X-GM-THRID 1266894439832287888)\r\n\
+* 3 FETCH (UID 43)\r\n\
+a4 OK Success\r\n";
+        let ids = parse_gmail_thread_ids(raw);
+        assert_eq!(ids.len(), 2);
+        assert_eq!(ids[&41], "gm:1278455344230334865");
+        assert_eq!(ids[&42], "gm:1266894439832287888");
+    }
 
-    Ok(())
+    #[test]
+    fn test_gmail_threads_adopt_legacy_file_once_and_alias_subject() {
+        let tmp = tempfile::tempdir().unwrap();
+        let out_dir = tmp.path();
+        let message = |id: &str, hour: u32| Message {
+            id: id.to_string(),
+            thread_id: "status".to_string(),
+            from: format!("Sender {} <s{}@example.com>", id, id),
+            to: String::new(),
+            cc: String::new(),
+            date: format!("Mon, 10 Feb 2025 {:02}:00:00 +0000", hour),
+            subject: "Status".to_string(),
+            body: format!("Body {}", id),
+        };
+        let thread_id = |path: &Path| {
+            parse_thread_markdown(&std::fs::read_to_string(path).unwrap())
+                .unwrap()
+                .id
+        };
+        let merge = |index: &mut ThreadIndex, msg: &Message, gmail_id: Option<&str>| {
+            let key = index
+                .thread_key(out_dir, gmail_id, &msg.thread_id, msg)
+                .unwrap();
+            merge_message_indexed(index, out_dir, "inbox", "personal", msg, &key)
+                .unwrap()
+                .unwrap()
+        };
+
+        // Synced before Gmail IDs were used.
+        let legacy =
+            merge_message_to_file(out_dir, "inbox", "personal", &message("1", 8), "status")
+                .unwrap()
+                .unwrap();
+
+        let mut index = ThreadIndex::default();
+        // The first Gmail thread adopts the legacy file...
+        assert_eq!(merge(&mut index, &message("2", 9), Some("gm:1")), legacy);
+        // ...so an unrelated one with the same subject gets its own file.
+        let other = merge(&mut index, &message("3", 10), Some("gm:2"));
+        assert_ne!(other, legacy);
+        index.flush().unwrap();
+        assert_eq!(thread_id(&legacy), "gm:1");
+        assert_eq!(thread_id(&other), "gm:2");
+
+        // A subject-keyed source (another account, an importer) finds a
+        // Gmail thread instead of splitting it.
+        let mut index = ThreadIndex::default();
+        let found = merge(&mut index, &message("4", 11), None);
+        assert!(found == legacy || found == other);
+        index.flush().unwrap();
+        let md_files = std::fs::read_dir(out_dir).unwrap().count();
+        assert_eq!(md_files, 2);
+    }
+
+    #[test]
+    fn test_header_message_keeps_first_occurrence() {
+        let raw = b"From: Alice <alice@example.com>\r\n\
+Subject: Re: =?utf-8?q?Caf=C3=A9?= plans\r\n\
+Subject: ignored\r\n\
+Date: Mon, 1 Jan 2024 10:00:00 +0000\r\n\r\n";
+        let (headers, _) = mailparse::parse_headers(raw).unwrap();
+        let message = header_message(7, &headers);
+        assert_eq!(message.id, "7");
+        assert_eq!(message.subject, "Re: Caf\u{e9} plans");
+        assert_eq!(message.thread_id, "caf\u{e9} plans");
+        assert_eq!(message.from, "Alice <alice@example.com>");
+        assert_eq!(message.to, "");
+        assert_eq!(message.date, "Mon, 1 Jan 2024 10:00:00 +0000");
+    }
 }
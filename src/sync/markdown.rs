@@ -1,127 +1,101 @@
 //! Thread ↔ Markdown serialization/parsing.
 
-use once_cell::sync::Lazy;
-use regex::Regex;
+use std::fmt::Write;
 
 use super::types::{Message, Thread};
-use crate::util::thread_key_from_subject;
+use crate::util::{meta_fields, thread_key_from_subject};
 
-static META_RE: Lazy<Regex> = Lazy::new(|| Regex::new(r"(?m)^\*\*(.+?)\*\*:\s*(.+)$").unwrap());
-static MSG_HEADER_RE: Lazy<Regex> =
-    Lazy::new(|| Regex::new(r"^## (.+?) \u{2014} (.+)$").unwrap());
+/// Separates sender from date in a `## From — Date` message header.
+const MSG_HEADER_SEP: &str = " \u{2014} ";
 
 /// Serialize a Thread to Markdown.
+///
+/// Written straight into one buffer sized from the message bodies, rather
+/// than collecting a line per field and joining them.
 pub fn thread_to_markdown(thread: &Thread) -> String {
-    let labels_str = thread.labels.join(", ");
-    let accounts_str = thread.accounts.join(", ");
-    let mut lines = vec![
-        format!("# {}", thread.subject),
-        String::new(),
-        format!("**Labels**: {}", labels_str),
-        format!("**Accounts**: {}", accounts_str),
-        format!("**Thread ID**: {}", thread.id),
-        format!("**Last updated**: {}", thread.last_date),
-        String::new(),
-    ];
+    let bodies: usize = thread.messages.iter().map(|m| m.body.len() + 128).sum();
+    let mut out = String::with_capacity(256 + bodies);
+    write_thread(&mut out, thread).expect("writing to a String cannot fail");
+    out
+}
+
+fn write_thread(out: &mut String, thread: &Thread) -> std::fmt::Result {
+    writeln!(out, "# {}\n", thread.subject)?;
+    out.push_str("**Labels**: ");
+    push_list(out, &thread.labels);
+    out.push_str("\n**Accounts**: ");
+    push_list(out, &thread.accounts);
+    writeln!(out, "\n**Thread ID**: {}", thread.id)?;
+    writeln!(out, "**Last updated**: {}", thread.last_date)?;
     for msg in &thread.messages {
-        lines.push("---".to_string());
-        lines.push(String::new());
-        lines.push(format!("## {} \u{2014} {}", msg.from, msg.date));
-        lines.push(String::new());
+        writeln!(out, "\n---\n\n## {} \u{2014} {}\n", msg.from, msg.date)?;
         if !msg.to.is_empty() {
-            lines.push(format!("**To**: {}", msg.to));
+            writeln!(out, "**To**: {}", msg.to)?;
         }
         if !msg.cc.is_empty() {
-            lines.push(format!("**CC**: {}", msg.cc));
+            writeln!(out, "**CC**: {}", msg.cc)?;
         }
         if !msg.to.is_empty() || !msg.cc.is_empty() {
-            lines.push(String::new());
+            out.push('\n');
         }
-        lines.push(msg.body.trim().to_string());
-        lines.push(String::new());
+        out.push_str(msg.body.trim());
+        out.push('\n');
     }
-    lines.join("\n")
+    Ok(())
 }
 
-/// Parse a conversation markdown file back into a Thread.
-pub fn parse_thread_markdown(text: &str) -> Option<Thread> {
-    let lines: Vec<&str> = text.split('\n').collect();
-
-    // Extract subject from first H1
-    let subject = lines.iter().find_map(|line| {
-        line.strip_prefix("# ")
-            .map(|s| s.trim().to_string())
-    })?;
-
-    if subject.is_empty() {
-        return None;
+/// Append `items` separated by ", ".
+fn push_list(out: &mut String, items: &[String]) {
+    for (i, item) in items.iter().enumerate() {
+        if i > 0 {
+            out.push_str(", ");
+        }
+        out.push_str(item);
     }
+}
 
-    // Extract metadata
-    let mut meta = std::collections::HashMap::new();
-    for cap in META_RE.captures_iter(text) {
-        meta.insert(
-            cap[1].to_string(),
-            cap[2].trim().to_string(),
-        );
-    }
+/// Parse a conversation markdown file back into a Thread.
+///
+/// One pass over the lines: subject and thread metadata come from the
+/// header, and each "## Sender — Date" line starts a message. Thread
+/// metadata is only read before the first message, so bold text quoted in a
+/// message body cannot overwrite it.
+pub fn parse_thread_markdown(text: &str) -> Option<Thread> {
+    let mut subject: Option<String> = None;
+    let mut thread_id = String::new();
+    let mut last_date = String::new();
+    let mut labels = Vec::new();
+    let mut accounts = Vec::new();
 
-    let thread_id = meta.get("Thread ID").cloned().unwrap_or_default();
-    let last_date = meta.get("Last updated").cloned().unwrap_or_default();
-
-    let labels = meta.get("Labels")
-        .map(|s| s.split(',').map(|s| s.trim().to_string()).filter(|s| !s.is_empty()).collect())
-        .unwrap_or_default();
-
-    // Parse accounts
-    let accounts = meta
-        .get("Accounts")
-        .map(|s| {
-            s.split(',')
-                .map(|s| s.trim().to_string())
-                .filter(|s| !s.is_empty())
-                .collect()
-        })
-        .unwrap_or_default();
-
-    // Split into message sections on "## Sender — Date"
     let mut messages: Vec<Message> = Vec::new();
-    let mut current_from = String::new();
-    let mut current_date = String::new();
-    let mut current_to = String::new();
-    let mut current_cc = String::new();
-    let mut body_lines: Vec<&str> = Vec::new();
-    let mut in_message = false;
+    let mut body = String::new();
     let mut in_msg_meta = false; // after header, before body
 
-    for line in &lines {
-        if let Some(cap) = MSG_HEADER_RE.captures(line) {
-            // Save previous message
-            if in_message {
-                messages.push(Message {
-                    id: String::new(),
-                    thread_id: thread_key_from_subject(&subject),
-                    from: current_from.clone(),
-                    to: current_to.clone(),
-                    cc: current_cc.clone(),
-                    date: current_date.clone(),
-                    subject: subject.clone(),
-                    body: body_lines.join("\n").trim().to_string(),
-                });
-            }
-            current_from = cap[1].to_string();
-            current_date = cap[2].to_string();
-            current_to = String::new();
-            current_cc = String::new();
-            body_lines.clear();
-            in_message = true;
+    for line in text.split('\n') {
+        // Subject from the first H1
+        if subject.is_none() {
+            subject = line.strip_prefix("# ").map(|s| s.trim().to_string());
+        }
+
+        if let Some((from, date)) = message_header(line) {
+            finish_body(&mut messages, &mut body);
+            messages.push(Message {
+                id: String::new(),
+                thread_id: String::new(),
+                from: from.to_string(),
+                to: String::new(),
+                cc: String::new(),
+                date: date.to_string(),
+                subject: String::new(),
+                body: String::new(),
+            });
             in_msg_meta = true;
-        } else if in_message {
+        } else if let Some(current) = messages.last_mut() {
             if in_msg_meta {
-                if let Some(cap) = META_RE.captures(line) {
-                    match cap[1].to_string().as_str() {
-                        "To" => current_to = cap[2].trim().to_string(),
-                        "CC" => current_cc = cap[2].trim().to_string(),
+                if let Some((key, value)) = meta_fields(line).next() {
+                    match key {
+                        "To" => current.to = value.trim().to_string(),
+                        "CC" => current.cc = value.trim().to_string(),
                         _ => {} // ignore other per-message metadata
                     }
                 } else if line.trim().is_empty() {
@@ -130,27 +104,32 @@ pub fn parse_thread_markdown(text: &str) -> Option<Thread> {
                     // first non-metadata, non-blank line — switch to body
                     in_msg_meta = false;
                     if line.trim() != "---" {
-                        body_lines.push(line);
+                        body.push_str(line);
+                        body.push('\n');
                     }
                 }
             } else if line.trim() != "---" {
-                body_lines.push(line);
+                body.push_str(line);
+                body.push('\n');
+            }
+        } else if let Some((key, value)) = meta_fields(line).next() {
+            let value = value.trim();
+            match key {
+                "Thread ID" => thread_id = value.to_string(),
+                "Last updated" => last_date = value.to_string(),
+                "Labels" => labels = split_list(value),
+                "Accounts" => accounts = split_list(value),
+                _ => {}
             }
         }
     }
+    finish_body(&mut messages, &mut body);
 
-    // Save last message
-    if in_message {
-        messages.push(Message {
-            id: String::new(),
-            thread_id: thread_key_from_subject(&subject),
-            from: current_from,
-            to: current_to,
-            cc: current_cc,
-            date: current_date,
-            subject: subject.clone(),
-            body: body_lines.join("\n").trim().to_string(),
-        });
+    let subject = subject.filter(|s| !s.is_empty())?;
+    let key = thread_key_from_subject(&subject);
+    for message in &mut messages {
+        message.thread_id = key.clone();
+        message.subject = subject.clone();
     }
 
     Some(Thread {
@@ -163,6 +142,36 @@ pub fn parse_thread_markdown(text: &str) -> Option<Thread> {
     })
 }
 
+/// Sender and date of a `## From — Date` line.
+///
+/// Equivalent to `^## (.+?) — (.+)$`: the first separator with a non-empty
+/// sender before it and a non-empty date after it. Most lines are body
+/// text and fail the `## ` prefix check without further work.
+fn message_header(line: &str) -> Option<(&str, &str)> {
+    let rest = line.strip_prefix("## ")?;
+    rest.char_indices().skip(1).find_map(|(i, _)| {
+        let date = rest[i..].strip_prefix(MSG_HEADER_SEP)?;
+        (!date.is_empty()).then(|| (&rest[..i], date))
+    })
+}
+
+/// Move the accumulated body text into the message it belongs to.
+fn finish_body(messages: &mut [Message], body: &mut String) {
+    if let Some(message) = messages.last_mut() {
+        message.body = body.trim().to_string();
+    }
+    body.clear();
+}
+
+/// Comma-separated metadata value, without empty entries.
+fn split_list(value: &str) -> Vec<String> {
+    value
+        .split(',')
+        .map(|s| s.trim().to_string())
+        .filter(|s| !s.is_empty())
+        .collect()
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
@@ -241,10 +250,35 @@ mod tests {
         assert_eq!(parsed.messages[0].body, "Hello there!");
     }
 
+    #[test]
+    fn test_message_header_matches_first_usable_separator() {
+        assert_eq!(
+            message_header("## Alice \u{2014} Dev \u{2014} Mon, 1 Jan 2024"),
+            Some(("Alice", "Dev \u{2014} Mon, 1 Jan 2024"))
+        );
+        // A separator with nothing before it is not the split point.
+        assert_eq!(
+            message_header("##  \u{2014} \u{2014} x"),
+            Some((" \u{2014}", "x"))
+        );
+        assert_eq!(message_header("## Alice \u{2014} "), None);
+        assert_eq!(message_header("# Alice \u{2014} Mon"), None);
+    }
+
     #[test]
     fn test_parse_multi_label() {
         let md = "# Subject\n\n**Labels**: label1, label2\n**Thread ID**: test\n**Last updated**: Mon, 1 Jan 2024 00:00:00 +0000\n";
         let parsed = parse_thread_markdown(md).unwrap();
         assert_eq!(parsed.labels, vec!["label1", "label2"]);
     }
+
+    #[test]
+    fn test_body_metadata_does_not_override_header() {
+        let md = "# Subject\n\n**Labels**: inbox\n**Thread ID**: real\n\n---\n\n## Alice <alice@example.com> \u{2014} Mon, 1 Jan 2024 00:00:00 +0000\n\nQuoting an old export:\n**Labels**: spam\n**Thread ID**: other\n";
+        let parsed = parse_thread_markdown(md).unwrap();
+        assert_eq!(parsed.id, "real");
+        assert_eq!(parsed.labels, vec!["inbox"]);
+        assert!(parsed.messages[0].body.ends_with("**Thread ID**: other"));
+        assert_eq!(parsed.messages[0].thread_id, "subject");
+    }
 }
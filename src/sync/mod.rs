@@ -34,10 +34,10 @@ pub fn load_state() -> Result<SyncState> {
     }
 }
 
-/// Save sync state to disk.
+/// Save sync state to disk, leaving the file untouched if nothing changed.
 pub fn save_state(state: &SyncState) -> Result<()> {
     let data = serde_json::to_vec(state)?;
-    std::fs::write(resolve::sync_state_file(), data)?;
+    crate::util::write_if_changed(&resolve::sync_state_file(), data)?;
     Ok(())
 }
 
@@ -83,6 +83,7 @@ pub fn run(full: bool, account: Option<&str>) -> Result<()> {
             full,
             None,
             touched.as_mut(),
+            None,
         )?;
     }
 
@@ -8,7 +8,7 @@ use std::collections::HashMap;
 use std::io::Read;
 use std::path::Path;
 
-use super::imap_sync::merge_message_to_file;
+use super::imap_sync::{merge_message_indexed, ThreadIndex};
 use super::types::Message;
 
 // ---------------------------------------------------------------------------
@@ -113,6 +113,9 @@ pub fn run(zip_path: &Path, label: &str, out_dir: &Path, account_name: &str) ->
         channel_dirs.len()
     );
 
+    // One index for the whole import: the output dir is scanned once.
+    let mut index = ThreadIndex::default();
+
     // 4. For each channel, parse date JSON files and group by thread
     for channel_name in &channel_dirs {
         let channel_id = channel_id_by_name
@@ -155,9 +158,17 @@ pub fn run(zip_path: &Path, label: &str, out_dir: &Path, account_name: &str) ->
                     body,
                 };
 
-                merge_message_to_file(out_dir, &label_name, account_name, &message, &thread_key)?;
+                merge_message_indexed(
+                    &mut index,
+                    out_dir,
+                    &label_name,
+                    account_name,
+                    &message,
+                    &thread_key,
+                )?;
             }
         }
+        index.flush()?;
     }
 
     println!("Slack import complete.");
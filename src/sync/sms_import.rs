@@ -2,13 +2,13 @@
 //!
 //! Parses the XML format from the Android "SMS Backup & Restore" app
 //! and converts each phone number thread into a corky conversation
-//! using `merge_message_to_file()`.
+//! using `merge_message_indexed()`.
 
 use anyhow::{Context, Result};
 use std::collections::HashMap;
 use std::path::Path;
 
-use super::imap_sync::merge_message_to_file;
+use super::imap_sync::{merge_message_indexed, ThreadIndex};
 use super::types::Message;
 
 // ---------------------------------------------------------------------------
@@ -257,6 +257,8 @@ pub fn run(path: &Path, label: &str, out_dir: &Path, account_name: &str) -> Resu
 
     // Sort each thread by date and merge into conversation files
     let mut total = 0u32;
+    // One index for the whole import: the output dir is scanned once.
+    let mut index = ThreadIndex::default();
     for (phone, mut messages) in threads {
         messages.sort_by(|a, b| a.date.cmp(&b.date));
 
@@ -267,9 +269,10 @@ pub fn run(path: &Path, label: &str, out_dir: &Path, account_name: &str) -> Resu
             .unwrap_or_else(|| phone.clone());
 
         for msg in &messages {
-            merge_message_to_file(out_dir, label, account_name, msg, &thread_id)?;
+            merge_message_indexed(&mut index, out_dir, label, account_name, msg, &thread_id)?;
             total += 1;
         }
+        index.flush()?;
 
         println!("  {} ({}) — {} message(s)", display_name, phone, messages.len());
     }
@@ -1,19 +1,39 @@
 //! Telegram Desktop export → corky conversations.
 //!
 //! Parses Telegram Desktop's `result.json` (JSON) or HTML export format
-//! and converts each chat into a corky thread using `merge_message_to_file()`.
+//! and converts each chat into a corky thread using `merge_message_indexed()`.
 
 use anyhow::{Context, Result};
 use chrono::NaiveDateTime;
+use once_cell::sync::Lazy;
 use regex::Regex;
 use serde::Deserialize;
 use std::collections::hash_map::DefaultHasher;
 use std::hash::{Hash, Hasher};
 use std::path::Path;
 
-use super::imap_sync::merge_message_to_file;
+use super::imap_sync::{merge_message_indexed, ThreadIndex};
 use super::types::Message;
 
+// HTML export patterns, compiled on first use and shared across files and messages.
+static HTML_DATE_RE: Lazy<Regex> = Lazy::new(|| {
+    Regex::new(r"(\d{2})\.(\d{2})\.(\d{4})\s+(\d{2}):(\d{2}):(\d{2})\s+UTC([+-]\d{2}:\d{2})")
+        .unwrap()
+});
+static CHAT_NAME_RE: Lazy<Regex> =
+    Lazy::new(|| Regex::new(r#"class="text bold">\s*\n\s*(.+?)\s*\n"#).unwrap());
+static MESSAGE_RE: Lazy<Regex> =
+    Lazy::new(|| Regex::new(r#"<div class="message [^"]*" id="message(\d+)">"#).unwrap());
+static DATE_RE: Lazy<Regex> =
+    Lazy::new(|| Regex::new(r#"class="pull_right date details" title="([^"]+)""#).unwrap());
+static FROM_RE: Lazy<Regex> =
+    Lazy::new(|| Regex::new(r#"class="from_name">\s*\n\s*(.+?)\s*\n"#).unwrap());
+static TEXT_RE: Lazy<Regex> =
+    Lazy::new(|| Regex::new(r#"class="text">\s*\n\s*([\s\S]*?)\s*</div>"#).unwrap());
+static SERVICE_RE: Lazy<Regex> = Lazy::new(|| Regex::new(r#"class="message service""#).unwrap());
+static LINK_RE: Lazy<Regex> = Lazy::new(|| Regex::new(r#"<a[^>]*>(.*?)</a>"#).unwrap());
+static TAG_RE: Lazy<Regex> = Lazy::new(|| Regex::new(r"<[^>]+>").unwrap());
+
 // ---------------------------------------------------------------------------
 // Telegram Desktop JSON types
 // ---------------------------------------------------------------------------
@@ -129,6 +149,7 @@ fn telegram_date_to_rfc2822(iso: &str) -> String {
 
 /// Import a single chat into the output directory.
 fn import_chat(
+    index: &mut ThreadIndex,
     chat_name: &str,
     chat_id: i64,
     messages: &[TelegramMessage],
@@ -171,15 +192,17 @@ fn import_chat(
             body,
         };
 
-        merge_message_to_file(out_dir, label, account_name, &message, &thread_id)?;
+        merge_message_indexed(index, out_dir, label, account_name, &message, &thread_id)?;
         count += 1;
     }
+    index.flush()?;
 
     Ok(count)
 }
 
 /// Parse a single Telegram Desktop JSON export file.
 fn import_file(
+    index: &mut ThreadIndex,
     path: &Path,
     label: &str,
     out_dir: &Path,
@@ -195,6 +218,7 @@ fn import_file(
         println!("Found {} chat(s) in {}", chats.list.len(), path.display());
         for chat in &chats.list {
             let count = import_chat(
+                index,
                 &chat.name,
                 chat.id,
                 &chat.messages,
@@ -213,7 +237,7 @@ fn import_file(
     if let (Some(name), Some(id), Some(messages)) =
         (export.name, export.id, export.messages)
     {
-        let count = import_chat(&name, id, &messages, label, out_dir, account_name)?;
+        let count = import_chat(index, &name, id, &messages, label, out_dir, account_name)?;
         println!("{} — {} message(s)", name, count);
         return Ok(());
     }
@@ -241,12 +265,7 @@ fn chat_id_from_name(name: &str) -> i64 {
 /// Parse Telegram HTML date format "DD.MM.YYYY HH:MM:SS UTC±HH:MM" → RFC 2822.
 fn telegram_html_date_to_rfc2822(date_str: &str) -> String {
     // Try parsing "DD.MM.YYYY HH:MM:SS UTC±HH:MM" (from title attr)
-    let re = Regex::new(
-        r"(\d{2})\.(\d{2})\.(\d{4})\s+(\d{2}):(\d{2}):(\d{2})\s+UTC([+-]\d{2}:\d{2})",
-    )
-    .unwrap();
-
-    if let Some(caps) = re.captures(date_str) {
+    if let Some(caps) = HTML_DATE_RE.captures(date_str) {
         let iso = format!(
             "{}-{}-{}T{}:{}:{}{}",
             &caps[3], &caps[2], &caps[1], &caps[4], &caps[5], &caps[6], &caps[7]
@@ -263,6 +282,7 @@ fn telegram_html_date_to_rfc2822(date_str: &str) -> String {
 
 /// Parse a Telegram Desktop HTML export file into messages and import them.
 fn import_html_file(
+    index: &mut ThreadIndex,
     path: &Path,
     label: &str,
     out_dir: &Path,
@@ -272,8 +292,7 @@ fn import_html_file(
         .with_context(|| format!("Failed to read {}", path.display()))?;
 
     // Extract chat name from page header
-    let name_re = Regex::new(r#"class="text bold">\s*\n\s*(.+?)\s*\n"#).unwrap();
-    let chat_name = name_re
+    let chat_name = CHAT_NAME_RE
         .captures(&html)
         .and_then(|c| c.get(1))
         .map(|m| m.as_str().trim().to_string())
@@ -290,23 +309,16 @@ fn import_html_file(
     let subject = chat_name.clone();
 
     // Split into message blocks
-    let msg_re = Regex::new(r#"<div class="message [^"]*" id="message(\d+)">"#).unwrap();
-    let date_re =
-        Regex::new(r#"class="pull_right date details" title="([^"]+)""#).unwrap();
-    let from_re = Regex::new(r#"class="from_name">\s*\n\s*(.+?)\s*\n"#).unwrap();
-    let text_re = Regex::new(r#"class="text">\s*\n\s*([\s\S]*?)\s*</div>"#).unwrap();
-    let service_re = Regex::new(r#"class="message service""#).unwrap();
-
     // Find all message start positions
     let mut positions: Vec<(usize, String, bool)> = Vec::new();
-    for caps in msg_re.captures_iter(&html) {
+    for caps in MESSAGE_RE.captures_iter(&html) {
         let m = caps.get(0).unwrap();
         let msg_id = caps[1].to_string();
         let is_service = false;
         positions.push((m.start(), msg_id, is_service));
     }
     // Also find service messages to skip them
-    for m in service_re.find_iter(&html) {
+    for m in SERVICE_RE.find_iter(&html) {
         positions.push((m.start(), String::new(), true));
     }
     positions.sort_by_key(|p| p.0);
@@ -327,14 +339,14 @@ fn import_html_file(
         let block = &html[start..end];
 
         // Extract date from title attribute
-        let date = date_re
+        let date = DATE_RE
             .captures(block)
             .and_then(|c| c.get(1))
             .map(|m| telegram_html_date_to_rfc2822(m.as_str()))
             .unwrap_or_default();
 
         // Extract sender (may be absent for "joined" continuation messages)
-        let from = from_re
+        let from = FROM_RE
             .captures(block)
             .and_then(|c| c.get(1))
             .map(|m| html_decode(m.as_str().trim()))
@@ -345,7 +357,7 @@ fn import_html_file(
         }
 
         // Extract text
-        let body = text_re
+        let body = TEXT_RE
             .captures(block)
             .and_then(|c| c.get(1))
             .map(|m| html_decode(m.as_str().trim()))
@@ -366,9 +378,10 @@ fn import_html_file(
             body,
         };
 
-        merge_message_to_file(out_dir, label, account_name, &message, &thread_id)?;
+        merge_message_indexed(index, out_dir, label, account_name, &message, &thread_id)?;
         count += 1;
     }
+    index.flush()?;
 
     println!("{} — {} message(s) (HTML)", chat_name, count);
     Ok(())
@@ -377,11 +390,9 @@ fn import_html_file(
 /// Decode common HTML entities and strip inline tags.
 fn html_decode(s: &str) -> String {
     // Strip <a href="...">text</a> → text
-    let link_re = Regex::new(r#"<a[^>]*>(.*?)</a>"#).unwrap();
-    let cleaned = link_re.replace_all(s, "$1");
+    let cleaned = LINK_RE.replace_all(s, "$1");
     // Strip remaining inline tags like <strong>, <em>, <span>, etc.
-    let tag_re = Regex::new(r"<[^>]+>").unwrap();
-    let stripped = tag_re.replace_all(&cleaned, "");
+    let stripped = TAG_RE.replace_all(&cleaned, "");
     stripped
         .replace("&amp;", "&")
         .replace("&lt;", "<")
@@ -396,6 +407,8 @@ fn html_decode(s: &str) -> String {
 /// `path` can be a JSON file, HTML file, or a directory containing export files.
 pub fn run(path: &Path, label: &str, out_dir: &Path, account_name: &str) -> Result<()> {
     println!("Telegram import: {}", path.display());
+    // One index for the whole import: the output dir is scanned once.
+    let mut index = ThreadIndex::default();
 
     if path.is_dir() {
         let mut found = false;
@@ -406,11 +419,11 @@ pub fn run(path: &Path, label: &str, out_dir: &Path, account_name: &str) -> Resu
             let p = entry.path();
             match p.extension().and_then(|e| e.to_str()) {
                 Some("json") => {
-                    import_file(&p, label, out_dir, account_name)?;
+                    import_file(&mut index, &p, label, out_dir, account_name)?;
                     found = true;
                 }
                 Some("html") | Some("htm") => {
-                    import_html_file(&p, label, out_dir, account_name)?;
+                    import_html_file(&mut index, &p, label, out_dir, account_name)?;
                     found = true;
                 }
                 _ => {}
@@ -422,10 +435,10 @@ pub fn run(path: &Path, label: &str, out_dir: &Path, account_name: &str) -> Resu
     } else {
         match path.extension().and_then(|e| e.to_str()) {
             Some("html") | Some("htm") => {
-                import_html_file(path, label, out_dir, account_name)?;
+                import_html_file(&mut index, path, label, out_dir, account_name)?;
             }
             _ => {
-                import_file(path, label, out_dir, account_name)?;
+                import_file(&mut index, path, label, out_dir, account_name)?;
             }
         }
     }
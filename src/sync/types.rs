@@ -1,7 +1,7 @@
 //! Sync data types: Message, Thread, SyncState.
 
-use serde::{Deserialize, Serialize};
-use std::collections::HashMap;
+use serde::{Deserialize, Serialize, Serializer};
+use std::collections::{BTreeMap, HashMap};
 
 #[derive(Debug, Clone, Serialize, Deserialize)]
 pub struct Message {
@@ -39,7 +39,7 @@ pub struct LabelState {
 
 #[derive(Debug, Clone, Default, Serialize, Deserialize)]
 pub struct AccountSyncState {
-    #[serde(default)]
+    #[serde(default, serialize_with = "sorted")]
     pub labels: HashMap<String, LabelState>,
 }
 
@@ -47,18 +47,27 @@ pub struct AccountSyncState {
 pub struct ContactSyncState {
     /// Per-mailbox: FNV-1a hash of the CLAUDE.md content at last sync.
     /// Key = mailbox name, Value = hash hex string.
-    #[serde(default)]
+    #[serde(default, serialize_with = "sorted")]
     pub mailboxes: HashMap<String, String>,
 }
 
 #[derive(Debug, Clone, Default, Serialize, Deserialize)]
 pub struct SyncState {
-    #[serde(default)]
+    #[serde(default, serialize_with = "sorted")]
     pub accounts: HashMap<String, AccountSyncState>,
-    #[serde(default)]
+    #[serde(default, serialize_with = "sorted")]
     pub contacts: HashMap<String, ContactSyncState>,
 }
 
+/// Serialize a map in key order, so an unchanged state encodes to the same
+/// bytes and `save_state` can skip rewriting it.
+fn sorted<S: Serializer, V: Serialize>(
+    map: &HashMap<String, V>,
+    serializer: S,
+) -> Result<S::Ok, S::Error> {
+    serializer.collect_map(map.iter().collect::<BTreeMap<_, _>>())
+}
+
 pub fn load_state(data: &[u8]) -> anyhow::Result<SyncState> {
     let state: SyncState = serde_json::from_slice(data)?;
     Ok(state)
@@ -3,7 +3,8 @@
 use anyhow::Result;
 use serde::{Deserialize, Serialize};
 use std::io::Read as _;
-use std::path::PathBuf;
+use std::path::{Path, PathBuf};
+use std::thread::JoinHandle;
 use std::time::{Duration, SystemTime, UNIX_EPOCH};
 
 const CRATE_NAME: &str = env!("CARGO_PKG_NAME");
@@ -19,8 +20,30 @@ struct VersionCache {
 
 /// Called on startup — prints a warning to stderr if a newer version is available.
 /// Silently returns on any error.
-pub fn warn_if_outdated() {
-    if let Some(latest) = check_for_update() {
+///
+/// A fresh cache answers immediately. A stale one means a crates.io query
+/// (seconds on a slow network), which runs on a background thread instead of
+/// delaying the command; join the returned handle to print its warning
+/// (before an interactive command starts, otherwise once it is done).
+pub fn warn_if_outdated() -> Option<JoinHandle<()>> {
+    if let Some(latest) = fresh_cached_latest() {
+        print_outdated(newer_than_current(latest));
+        return None;
+    }
+    // Resolved here: the thread must not read the environment while a
+    // command (e.g. `corky init`) may be setting variables.
+    let path = cache_path();
+    Some(std::thread::spawn(move || {
+        let latest = fetch_latest_version(CRATE_NAME);
+        if let (Some(latest), Some(path)) = (&latest, &path) {
+            write_cache_at(path, latest);
+        }
+        print_outdated(latest.and_then(newer_than_current));
+    }))
+}
+
+fn print_outdated(latest: Option<String>) {
+    if let Some(latest) = latest {
         eprintln!(
             "\x1b[33mA newer version of corky is available: v{latest} (current: v{CURRENT_VERSION})\n\
              Run `corky upgrade` to update.\x1b[0m"
@@ -205,29 +228,25 @@ pub fn run() -> Result<()> {
 /// if it is newer than the current version.
 pub fn check_for_update() -> Option<String> {
     // Try to read from cache first
-    if let Some(cache) = read_cache() {
-        let now = SystemTime::now()
-            .duration_since(UNIX_EPOCH)
-            .ok()?
-            .as_secs();
-        if now.saturating_sub(cache.checked_at) < CACHE_MAX_AGE_SECS {
-            return if version_is_newer(&cache.latest, CURRENT_VERSION) {
-                Some(cache.latest)
-            } else {
-                None
-            };
-        }
+    if let Some(latest) = fresh_cached_latest() {
+        return newer_than_current(latest);
     }
 
     // Cache miss or stale — fetch from crates.io
     let latest = fetch_latest_version(CRATE_NAME)?;
     write_cache(&latest);
+    newer_than_current(latest)
+}
 
-    if version_is_newer(&latest, CURRENT_VERSION) {
-        Some(latest)
-    } else {
-        None
-    }
+/// The cached latest version, if it was checked within `CACHE_MAX_AGE_SECS`.
+fn fresh_cached_latest() -> Option<String> {
+    let cache = read_cache()?;
+    let now = SystemTime::now().duration_since(UNIX_EPOCH).ok()?.as_secs();
+    (now.saturating_sub(cache.checked_at) < CACHE_MAX_AGE_SECS).then_some(cache.latest)
+}
+
+fn newer_than_current(latest: String) -> Option<String> {
+    version_is_newer(&latest, CURRENT_VERSION).then_some(latest)
 }
 
 /// Query crates.io for the latest version of the given crate.
@@ -274,7 +293,12 @@ fn read_cache() -> Option<VersionCache> {
 }
 
 fn write_cache(latest: &str) {
-    let Some(path) = cache_path() else { return };
+    if let Some(path) = cache_path() {
+        write_cache_at(&path, latest);
+    }
+}
+
+fn write_cache_at(path: &Path, latest: &str) {
     let now = SystemTime::now()
         .duration_since(UNIX_EPOCH)
         .map(|d| d.as_secs())
@@ -286,7 +310,7 @@ fn write_cache(latest: &str) {
     if let Some(parent) = path.parent() {
         let _ = std::fs::create_dir_all(parent);
     }
-    let _ = std::fs::write(&path, serde_json::to_string(&cache).unwrap_or_default());
+    let _ = std::fs::write(path, serde_json::to_string(&cache).unwrap_or_default());
 }
 
 #[cfg(test)]
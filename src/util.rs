@@ -1,33 +1,37 @@
-use once_cell::sync::Lazy;
-use regex::Regex;
-use std::process::Command;
-
-static SLUG_RE: Lazy<Regex> = Lazy::new(|| Regex::new(r"[^a-z0-9]+").unwrap());
-static THREAD_KEY_RE: Lazy<Regex> =
-    Lazy::new(|| Regex::new(r"(?i)^(re|fwd?):\s*").unwrap());
+use once_cell::sync::OnceCell;
+use std::collections::HashMap;
+use std::path::{Path, PathBuf};
+use std::process::{Command, Stdio};
+use std::sync::{Arc, Mutex};
+use std::time::{Duration, SystemTime};
 
 /// Generate a URL-safe slug from text.
 ///
 /// Lowercases, replaces non-alphanumeric runs with hyphens,
 /// trims hyphens, truncates to 60 chars. Returns "untitled" if empty.
+///
+/// A single pass over the characters; equivalent to replacing
+/// `[^a-z0-9]+` in the lowercased text. The slug is ASCII, so truncation
+/// never splits a character.
 pub fn slugify(text: &str) -> String {
-    let lower = text.to_lowercase();
-    let slugged = SLUG_RE.replace_all(&lower, "-");
-    let trimmed = slugged.trim_matches('-');
-    let truncated = if trimmed.len() > 60 {
-        // Don't split in the middle of a multi-byte char
-        let mut end = 60;
-        while !trimmed.is_char_boundary(end) && end > 0 {
-            end -= 1;
+    let mut slug = String::with_capacity(text.len().min(60));
+    let mut gap = false;
+    for c in text.chars().flat_map(char::to_lowercase) {
+        if c.is_ascii_lowercase() || c.is_ascii_digit() {
+            if gap && !slug.is_empty() {
+                slug.push('-');
+            }
+            slug.push(c);
+            gap = false;
+        } else {
+            gap = true;
         }
-        &trimmed[..end]
-    } else {
-        trimmed
-    };
-    if truncated.is_empty() {
+    }
+    slug.truncate(60);
+    if slug.is_empty() {
         "untitled".to_string()
     } else {
-        truncated.to_string()
+        slug
     }
 }
 
@@ -35,8 +39,51 @@ pub fn slugify(text: &str) -> String {
 ///
 /// Strips one `Re:` or `Fwd:` prefix (case-insensitive), then lowercases.
 pub fn thread_key_from_subject(subject: &str) -> String {
-    let trimmed = subject.trim().to_lowercase();
-    THREAD_KEY_RE.replace(&trimmed, "").to_string()
+    let lower = subject.trim().to_lowercase();
+    match ["re:", "fwd:", "fw:"].iter().find_map(|p| lower.strip_prefix(p)) {
+        Some(rest) => rest.trim_start().to_string(),
+        None => lower,
+    }
+}
+
+/// `**Key**: value` metadata fields of `text`, in order.
+///
+/// Hand-written equivalent of `(?m)^\*\*(.+?)\*\*:\s*(.+)$`, without running
+/// capture groups over every line. As with that pattern, an empty value lets
+/// the whitespace skip run on to the next line. Values are not trimmed.
+pub fn meta_fields(text: &str) -> impl Iterator<Item = (&str, &str)> {
+    let mut pos = 0;
+    std::iter::from_fn(move || {
+        while pos < text.len() {
+            let line_end = text[pos..].find('\n').map_or(text.len(), |i| pos + i);
+            let line = &text[pos..line_end];
+            let line_start = pos;
+            pos = line_end + 1;
+            let Some(rest) = line.strip_prefix("**") else {
+                continue;
+            };
+            let Some((key_len, _)) = rest.match_indices("**:").find(|&(i, _)| i > 0) else {
+                continue;
+            };
+            let key = &rest[..key_len];
+            let tail = &text[line_start + 2 + key_len + 3..];
+            let value_start = match tail.trim_start() {
+                "" => match tail.rfind(|c| c != '\n') {
+                    // Whitespace runs to the end: the value is its last
+                    // character that `.` can match.
+                    Some(i) => text.len() - tail.len() + i,
+                    None => continue,
+                },
+                skipped => text.len() - skipped.len(),
+            };
+            let value_end = text[value_start..]
+                .find('\n')
+                .map_or(text.len(), |i| value_start + i);
+            pos = value_end + 1;
+            return Some((key, &text[value_start..value_end]));
+        }
+        None
+    })
 }
 
 /// Run a shell command, returning (stdout, stderr, exit_code).
@@ -49,14 +96,21 @@ pub fn run_cmd(args: &[&str]) -> anyhow::Result<(String, String, i32)> {
 }
 
 /// Run a shell command, printing it first. Returns Ok on success, Err on failure.
-pub fn run_cmd_checked(args: &[&str]) -> anyhow::Result<String> {
+///
+/// Stdout is discarded; stderr is captured raw and only decoded for the error.
+pub fn run_cmd_checked(args: &[&str]) -> anyhow::Result<()> {
     let cmd_str = args.join(" ");
     println!("  $ {}", cmd_str);
-    let (stdout, stderr, code) = run_cmd(args)?;
-    if code != 0 {
+    let output = Command::new(args[0])
+        .args(&args[1..])
+        .stdout(Stdio::null())
+        .output()?;
+    if !output.status.success() {
+        let code = output.status.code().unwrap_or(-1);
+        let stderr = String::from_utf8_lossy(&output.stderr);
         anyhow::bail!("Command failed (exit {}): {}\n{}", code, cmd_str, stderr.trim());
     }
-    Ok(stdout)
+    Ok(())
 }
 
 /// Resolve a secret value: inline string first, then shell command.
@@ -88,6 +142,31 @@ pub fn resolve_secret(inline: &str, cmd: &str, context: &str) -> anyhow::Result<
     anyhow::bail!("{}", context)
 }
 
+static TLS_VERIFIED: OnceCell<native_tls::TlsConnector> = OnceCell::new();
+static TLS_UNVERIFIED: OnceCell<native_tls::TlsConnector> = OnceCell::new();
+
+/// TLS connector for an IMAP host, built once per process.
+///
+/// STARTTLS and localhost (e.g. Proton Bridge) connections skip certificate
+/// and hostname checks, as before. Building a connector loads the system CA
+/// store, so repeated connections (watch, scheduled pushes) share one.
+pub fn imap_tls_connector(
+    host: &str,
+    starttls: bool,
+) -> anyhow::Result<&'static native_tls::TlsConnector> {
+    let relaxed = starttls || host == "127.0.0.1" || host == "localhost";
+    let cell = if relaxed { &TLS_UNVERIFIED } else { &TLS_VERIFIED };
+    let tls = cell.get_or_try_init(|| {
+        let mut builder = native_tls::TlsConnector::builder();
+        if relaxed {
+            builder.danger_accept_invalid_certs(true);
+            builder.danger_accept_invalid_hostnames(true);
+        }
+        builder.build()
+    })?;
+    Ok(tls)
+}
+
 /// Truncate a string for preview display, adding "..." if truncated.
 pub fn truncate_preview(s: &str, max: usize) -> String {
     let first_line = s.lines().next().unwrap_or("").trim();
@@ -102,9 +181,191 @@ pub fn truncate_preview(s: &str, max: usize) -> String {
     }
 }
 
+/// Write `contents` to `path` unless it already holds exactly those bytes.
+///
+/// A size mismatch settles most changes from one `stat`; only same-size
+/// files are read back and compared. Returns true if the file was written.
+pub fn write_if_changed(path: &Path, contents: impl AsRef<[u8]>) -> std::io::Result<bool> {
+    let contents = contents.as_ref();
+    if let Ok(meta) = std::fs::metadata(path) {
+        if meta.is_file() && meta.len() == contents.len() as u64 && std::fs::read(path)? == contents
+        {
+            return Ok(false);
+        }
+    }
+    write_atomic(path, contents)?;
+    Ok(true)
+}
+
+/// Write `contents` to a sibling `.tmp` file and rename it over `path`, so
+/// a crash mid-write never leaves a truncated file behind.
+///
+/// A symlinked `path` is resolved first, so the link stays and its target is
+/// replaced; the replaced file's permissions carry over to the new one.
+pub fn write_atomic(path: &Path, contents: impl AsRef<[u8]>) -> std::io::Result<()> {
+    let path = std::fs::canonicalize(path).unwrap_or_else(|_| path.to_path_buf());
+    let permissions = std::fs::metadata(&path).ok().map(|m| m.permissions());
+    let mut tmp = path.as_os_str().to_owned();
+    tmp.push(".tmp");
+    let tmp = PathBuf::from(tmp);
+    std::fs::write(&tmp, contents)
+        .and_then(|()| match permissions {
+            Some(permissions) => std::fs::set_permissions(&tmp, permissions),
+            None => Ok(()),
+        })
+        .and_then(|()| std::fs::rename(&tmp, &path))
+        .inspect_err(|_| {
+            let _ = std::fs::remove_file(&tmp);
+        })
+}
+
+/// How recently a file may have changed before `FileCache` trusts its mtime.
+const RACY_WINDOW: Duration = Duration::from_secs(2);
+
+/// Parsed files keyed by path, reused while the file's mtime and size are
+/// unchanged. Holds at most `capacity` files; a full cache is cleared.
+///
+/// Files modified within the last `RACY_WINDOW` are parsed but not cached:
+/// mtime granularity is coarse, so a same-size rewrite inside one tick would
+/// otherwise go unnoticed (the "racy git" problem).
+pub struct FileCache<T> {
+    capacity: usize,
+    entries: Mutex<HashMap<PathBuf, CacheEntry<T>>>,
+}
+
+/// A cached parse with the mtime and size it was read at.
+type CacheEntry<T> = (SystemTime, u64, Arc<T>);
+
+impl<T> FileCache<T> {
+    pub fn new(capacity: usize) -> Self {
+        Self {
+            capacity,
+            entries: Mutex::new(HashMap::new()),
+        }
+    }
+
+    /// Return the cached value for `path`, or read it and run `parse` on the
+    /// contents if the file is new or has changed since it was cached.
+    pub fn get_or_parse(
+        &self,
+        path: &Path,
+        parse: impl FnOnce(&str) -> anyhow::Result<T>,
+    ) -> anyhow::Result<Arc<T>> {
+        let meta = std::fs::metadata(path)?;
+        let modified = meta.modified()?;
+        let len = meta.len();
+        if let Some((m, l, value)) = self.entries.lock().unwrap().get(path) {
+            if *m == modified && *l == len {
+                return Ok(Arc::clone(value));
+            }
+        }
+
+        let content = std::fs::read_to_string(path)?;
+        let value = Arc::new(parse(&content)?);
+        let settled = SystemTime::now()
+            .duration_since(modified)
+            .is_ok_and(|age| age >= RACY_WINDOW);
+        if !settled {
+            return Ok(value);
+        }
+        let mut entries = self.entries.lock().unwrap();
+        if entries.len() >= self.capacity {
+            entries.clear();
+        }
+        entries.insert(path.to_path_buf(), (modified, len, Arc::clone(&value)));
+        Ok(value)
+    }
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
+    use regex::Regex;
+
+    #[test]
+    fn test_meta_fields_matches_pattern() {
+        let text =
+            "# S\n\n**To**: a@b.c\n**Bold** text\n**CC**:\n  x\n**a**b**:** v\n**Empty**:  \n\n";
+        let fields: Vec<_> = meta_fields(text).collect();
+        assert_eq!(
+            fields,
+            [
+                ("To", "a@b.c"),
+                ("CC", "x"),
+                ("a**b", "** v"),
+                ("Empty", " ")
+            ]
+        );
+
+        let re = Regex::new(r"(?m)^\*\*(.+?)\*\*:\s*(.+)$").unwrap();
+        let caps = re.captures_iter(text);
+        let want: Vec<_> = caps
+            .map(|c| (c.get(1).unwrap().as_str(), c.get(2).unwrap().as_str()))
+            .collect();
+        assert_eq!(fields, want);
+    }
+
+    #[test]
+    fn test_file_cache_reuses_settled_file() {
+        let dir = tempfile::tempdir().unwrap();
+        let path = dir.path().join("c.txt");
+        std::fs::write(&path, "one").unwrap();
+        let cache = FileCache::new(4);
+        let parse = |s: &str| Ok(s.to_string());
+
+        // Freshly written: parsed every time, never cached.
+        assert_eq!(*cache.get_or_parse(&path, parse).unwrap(), "one");
+        std::fs::write(&path, "two").unwrap();
+        assert_eq!(*cache.get_or_parse(&path, parse).unwrap(), "two");
+
+        // Settled: a cached value is served while mtime and size match.
+        let old = SystemTime::now() - Duration::from_secs(60);
+        filetime::set_file_mtime(&path, filetime::FileTime::from_system_time(old)).unwrap();
+        assert_eq!(*cache.get_or_parse(&path, parse).unwrap(), "two");
+        let served = cache
+            .get_or_parse(&path, |_| Ok("reparsed".to_string()))
+            .unwrap();
+        assert_eq!(*served, "two");
+    }
+
+    #[test]
+    fn test_write_if_changed_skips_identical_content() {
+        let dir = tempfile::tempdir().unwrap();
+        let path = dir.path().join("f.txt");
+        assert!(write_if_changed(&path, "abc").unwrap());
+        assert!(!write_if_changed(&path, "abc").unwrap());
+        assert!(write_if_changed(&path, "abd").unwrap());
+        assert!(write_if_changed(&path, "abcd").unwrap());
+        assert_eq!(std::fs::read_to_string(&path).unwrap(), "abcd");
+    }
+
+    #[test]
+    fn test_write_atomic_replaces_without_leaving_temp() {
+        let dir = tempfile::tempdir().unwrap();
+        let path = dir.path().join("thread.md");
+        write_atomic(&path, "one").unwrap();
+        write_atomic(&path, "two").unwrap();
+        assert_eq!(std::fs::read_to_string(&path).unwrap(), "two");
+        assert!(!dir.path().join("thread.md.tmp").exists());
+    }
+
+    #[cfg(unix)]
+    #[test]
+    fn test_write_atomic_keeps_symlink_and_mode() {
+        use std::os::unix::fs::PermissionsExt;
+        let dir = tempfile::tempdir().unwrap();
+        let target = dir.path().join("AGENTS.md");
+        let link = dir.path().join("CLAUDE.md");
+        std::fs::write(&target, "one").unwrap();
+        std::fs::set_permissions(&target, std::fs::Permissions::from_mode(0o600)).unwrap();
+        std::os::unix::fs::symlink("AGENTS.md", &link).unwrap();
+
+        write_atomic(&link, "two").unwrap();
+        assert!(link.symlink_metadata().unwrap().file_type().is_symlink());
+        assert_eq!(std::fs::read_to_string(&target).unwrap(), "two");
+        let mode = std::fs::metadata(&target).unwrap().permissions().mode();
+        assert_eq!(mode & 0o777, 0o600);
+    }
 
     #[test]
     fn test_slugify_basic() {
@@ -128,6 +389,12 @@ mod tests {
         assert_eq!(slugify("!!!"), "untitled");
     }
 
+    #[test]
+    fn test_slugify_collapses_non_ascii_runs() {
+        assert_eq!(slugify("--Héllo  wörld--"), "h-llo-w-rld");
+        assert_eq!(slugify("Q3 \u{212A}PIs"), "q3-kpis");
+    }
+
     #[test]
     fn test_thread_key_strips_re() {
         assert_eq!(
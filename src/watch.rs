@@ -8,7 +8,7 @@ use std::sync::Arc;
 use crate::accounts::{load_accounts, load_watch_config, resolve_password};
 use crate::config::corky_config;
 use crate::resolve;
-use crate::sync::imap_sync::sync_account;
+use crate::sync::imap_sync::{sync_account, SessionPool};
 use crate::sync::types::SyncState;
 
 /// Desktop notification (best-effort).
@@ -80,9 +80,7 @@ fn load_state() -> SyncState {
 }
 
 fn save_state(state: &SyncState) {
-    if let Ok(data) = serde_json::to_vec(state) {
-        let _ = std::fs::write(resolve::sync_state_file(), data);
-    }
+    let _ = crate::sync::save_state(state);
 }
 
 fn sync_mailboxes() {
@@ -90,22 +88,27 @@ fn sync_mailboxes() {
         Some(c) => c,
         None => return,
     };
-    for name in config.mailboxes.keys() {
-        let mb_path = resolve::mailbox_dir(name);
-        if !mb_path.exists() || !mb_path.join(".git").exists() {
-            continue;
-        }
-        let output = std::process::Command::new("git")
-            .arg("-C")
-            .arg(mb_path.to_string_lossy().as_ref())
-            .arg("status")
-            .arg("--porcelain")
-            .output();
-        if let Ok(out) = output {
-            if !String::from_utf8_lossy(&out.stdout).trim().is_empty() {
-                let _ = crate::mailbox::sync::sync_one(name);
+    let dirty: Vec<String> = config
+        .mailboxes
+        .keys()
+        .filter(|name| {
+            let mb_path = resolve::mailbox_dir(name);
+            if !mb_path.exists() || !mb_path.join(".git").exists() {
+                return false;
             }
-        }
+            let output = std::process::Command::new("git")
+                .arg("-C")
+                .arg(mb_path.to_string_lossy().as_ref())
+                .arg("status")
+                .arg("--porcelain")
+                .output();
+            output.is_ok_and(|out| !String::from_utf8_lossy(&out.stdout).trim().is_empty())
+        })
+        .cloned()
+        .collect();
+    // One sync run for all of them, reusing the config loaded above
+    if !dirty.is_empty() {
+        let _ = crate::mailbox::sync::sync_names(&dirty, config.topics);
     }
 }
 
@@ -174,7 +177,8 @@ fn check_filter_drift() {
 }
 
 /// One sync + mailbox sync cycle. Returns count of labels with new messages.
-fn poll_once(notify_enabled: bool) -> usize {
+/// IMAP sessions in `pool` are reused and stay open for the next cycle.
+fn poll_once(notify_enabled: bool, pool: &mut SessionPool) -> usize {
     let accounts = match load_accounts(None) {
         Ok(a) => a,
         Err(e) => {
@@ -208,6 +212,7 @@ fn poll_once(notify_enabled: bool) -> usize {
             false,
             None,
             None,
+            Some(&mut *pool),
         ) {
             eprintln!("  Error syncing {}: {}", acct_name, e);
             continue;
@@ -260,6 +265,7 @@ pub async fn run(interval_override: Option<u64>) -> Result<()> {
         if auto_upgrade { ", auto-upgrade on" } else { "" }
     );
 
+    let mut pool = SessionPool::default();
     let mut cycles_since_upgrade_check: u64 = 0;
     let mut cycles_since_filter_check: u64 = 0;
     // Check for upgrades every N cycles (roughly once per hour)
@@ -274,8 +280,9 @@ pub async fn run(interval_override: Option<u64>) -> Result<()> {
 
         // Run sync in a blocking context
         let notify_enabled = config.notify;
-        tokio::task::spawn_blocking(move || {
-            poll_once(notify_enabled);
+        pool = tokio::task::spawn_blocking(move || {
+            poll_once(notify_enabled, &mut pool);
+            pool
         })
         .await?;
 
@@ -322,6 +329,7 @@ pub async fn run(interval_override: Option<u64>) -> Result<()> {
         }
     }
 
+    tokio::task::spawn_blocking(move || pool.logout_all()).await?;
     println!("corky watch: stopped");
     Ok(())
 }
@@ -49,6 +49,60 @@ labels = ["work-label"]
     assert_eq!(work.smtp_host, "smtp.work.com");
 }
 
+#[test]
+fn test_load_accounts_skips_non_table_entries() {
+    let tmp = TempDir::new().unwrap();
+    let path = tmp.path().join(".corky.toml");
+    std::fs::write(
+        &path,
+        r#"
+[accounts]
+stray = "not an account"
+
+[accounts.personal]
+provider = "gmail"
+user = "alice@gmail.com"
+
+[contacts.bob]
+emails = ["bob@example.com"]
+"#,
+    )
+    .unwrap();
+
+    let accounts = load_accounts(Some(&path)).unwrap();
+    assert_eq!(accounts.len(), 1);
+    assert_eq!(accounts["personal"].imap_host, "imap.gmail.com");
+}
+
+#[test]
+fn test_load_accounts_ignores_incomplete_owner_and_watch() {
+    // `corky init --name` without `--github-user` writes [owner] with only a name.
+    let tmp = TempDir::new().unwrap();
+    let path = tmp.path().join(".corky.toml");
+    std::fs::write(
+        &path,
+        r#"
+[owner]
+name = "Alice"
+
+[watch]
+poll_interval = "often"
+
+[accounts.personal]
+provider = "gmail"
+user = "alice@gmail.com"
+"#,
+    )
+    .unwrap();
+
+    let accounts = load_accounts(Some(&path)).unwrap();
+    assert_eq!(accounts.len(), 1);
+    // Each section still fails in its own loader.
+    let err = load_owner(Some(&path)).unwrap_err();
+    assert!(err.to_string().contains("github_user"));
+    assert!(load_watch_config(Some(&path)).is_err());
+}
+
 #[test]
 fn test_load_accounts_missing_file() {
     let tmp = TempDir::new().unwrap();
@@ -299,6 +353,19 @@ notify = true
     assert!(wc.notify);
 }
 
+#[test]
+fn test_load_watch_config_sees_rewritten_file() {
+    let tmp = TempDir::new().unwrap();
+    let path = tmp.path().join("accounts.toml");
+    std::fs::write(&path, "[watch]\npoll_interval = 60\n").unwrap();
+    assert_eq!(load_watch_config(Some(&path)).unwrap().poll_interval, 60);
+
+    std::fs::write(&path, "[watch]\npoll_interval = 1200\nnotify = true\n").unwrap();
+    let wc = load_watch_config(Some(&path)).unwrap();
+    assert_eq!(wc.poll_interval, 1200);
+    assert!(wc.notify);
+}
+
 #[test]
 fn test_load_watch_config_missing_file() {
     let tmp = TempDir::new().unwrap();
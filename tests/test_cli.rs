@@ -22,6 +22,15 @@ fn test_cli_version() {
         .stdout(predicate::str::contains("corky"));
 }
 
+#[test]
+fn test_cli_short_version() {
+    let mut cmd = corky_cmd();
+    cmd.arg("-V");
+    cmd.assert()
+        .success()
+        .stdout(predicate::str::diff(format!("corky {}\n", env!("CARGO_PKG_VERSION"))));
+}
+
 #[test]
 fn test_cli_help() {
     let mut cmd = corky_cmd();
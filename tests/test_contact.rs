@@ -42,7 +42,7 @@ emails = ["alice@example.com", "alice@work.com"]
     assert_eq!(contacts.len(), 1);
 
     let alice = contacts.get("alice").unwrap();
-    assert_eq!(alice.emails, vec!["alice@example.com", "alice@work.com"]);
+    assert_eq!(*alice.emails, ["alice@example.com", "alice@work.com"]);
 }
 
 #[test]
@@ -64,7 +64,7 @@ account = "personal"
     let contacts = contact::load_contacts(Some(&path)).unwrap();
     assert_eq!(contacts.len(), 1);
     let alice = contacts.get("alice").unwrap();
-    assert_eq!(alice.emails, vec!["alice@example.com"]);
+    assert_eq!(*alice.emails, ["alice@example.com"]);
 }
 
 #[test]
@@ -108,7 +108,7 @@ emails = ["min@example.com"]
 
     let contacts = contact::load_contacts(Some(&path)).unwrap();
     let minimal = contacts.get("minimal").unwrap();
-    assert_eq!(minimal.emails, vec!["min@example.com"]);
+    assert_eq!(*minimal.emails, ["min@example.com"]);
 }
 
 #[test]
@@ -118,7 +118,7 @@ fn test_save_contact() {
     std::fs::write(&path, "").unwrap();
 
     let alice = Contact {
-        emails: vec!["alice@example.com".to_string()],
+        emails: vec!["alice@example.com".to_string()].into(),
         ..Default::default()
     };
 
@@ -139,7 +139,7 @@ fn test_save_contact_multiple_emails() {
         emails: vec![
             "bob@work.com".to_string(),
             "bob@personal.com".to_string(),
-        ],
+        ].into(),
         ..Default::default()
     };
 
@@ -157,11 +157,11 @@ fn test_save_and_reload_contacts() {
     std::fs::write(&path, "").unwrap();
 
     let alice = Contact {
-        emails: vec!["alice@example.com".to_string()],
+        emails: vec!["alice@example.com".to_string()].into(),
         ..Default::default()
     };
     let bob = Contact {
-        emails: vec!["bob@work.com".to_string()],
+        emails: vec!["bob@work.com".to_string()].into(),
         ..Default::default()
     };
 
@@ -172,10 +172,10 @@ fn test_save_and_reload_contacts() {
     assert_eq!(reloaded.len(), 2);
 
     let alice = reloaded.get("alice").unwrap();
-    assert_eq!(alice.emails, vec!["alice@example.com"]);
+    assert_eq!(*alice.emails, ["alice@example.com"]);
 
     let bob = reloaded.get("bob").unwrap();
-    assert_eq!(bob.emails, vec!["bob@work.com"]);
+    assert_eq!(*bob.emails, ["bob@work.com"]);
 }
 
 #[test]
@@ -229,7 +229,7 @@ user = "test@gmail.com"
     .unwrap();
 
     let alice = Contact {
-        emails: vec!["alice@example.com".to_string()],
+        emails: vec!["alice@example.com".to_string()].into(),
         ..Default::default()
     };
     contact::save_contact("alice", &alice, Some(&path)).unwrap();
@@ -198,6 +198,29 @@ Body.
     }
 }
 
+#[test]
+fn test_parse_draft_ignores_metadata_in_body() {
+    let tmp = TempDir::new().unwrap();
+    let path = write_draft(
+        tmp.path(),
+        "2025-02-10-body-meta.md",
+        r#"# Forwarded
+
+**To**: alice@example.com
+
+---
+
+**To**: quoted@example.com
+# Not the subject
+"#,
+    );
+
+    let (meta, subject, body) = parse_draft(&path).unwrap();
+    assert_eq!(meta["To"], "alice@example.com");
+    assert_eq!(subject, "Forwarded");
+    assert!(body.starts_with("**To**: quoted@example.com"));
+}
+
 #[test]
 fn test_parse_draft_file_not_found() {
     let result = parse_draft(std::path::Path::new("/nonexistent/path/draft.md"));
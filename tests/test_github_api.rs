@@ -0,0 +1,103 @@
+//! GitHub API contract tests with HTTP mocking (src/mailbox/github.rs).
+
+use corky::mailbox::github::GitHub;
+
+#[test]
+fn create_repo_for_user() {
+    let mut server = mockito::Server::new();
+    let mock = server
+        .mock("POST", "/user/repos")
+        .match_header("Authorization", "Bearer test-token")
+        .match_body(mockito::Matcher::PartialJsonString(
+            r#"{"name": "to-alex", "private": true}"#.to_string(),
+        ))
+        .with_status(201)
+        .with_body("{}")
+        .create();
+
+    let gh = GitHub::new_at(&server.url(), "test-token");
+    gh.create_repo("Owner", "owner", "to-alex", true).unwrap();
+    mock.assert();
+}
+
+#[test]
+fn create_repo_for_org() {
+    let mut server = mockito::Server::new();
+    let mock = server
+        .mock("POST", "/orgs/acme/repos")
+        .match_body(mockito::Matcher::PartialJsonString(
+            r#"{"name": "to-alex", "private": false}"#.to_string(),
+        ))
+        .with_status(201)
+        .with_body("{}")
+        .create();
+
+    let gh = GitHub::new_at(&server.url(), "test-token");
+    gh.create_repo("acme", "owner", "to-alex", false).unwrap();
+    mock.assert();
+}
+
+#[test]
+fn add_collaborator_puts_user() {
+    let mut server = mockito::Server::new();
+    let mock = server
+        .mock("PUT", "/repos/owner/to-alex/collaborators/alex")
+        .match_header("Authorization", "Bearer test-token")
+        .with_status(201)
+        .with_body("{}")
+        .create();
+
+    let gh = GitHub::new_at(&server.url(), "test-token");
+    gh.add_collaborator("owner/to-alex", "alex").unwrap();
+    mock.assert();
+}
+
+#[test]
+fn create_repo_reports_http_error() {
+    let mut server = mockito::Server::new();
+    let mock = server
+        .mock("POST", "/user/repos")
+        .with_status(422)
+        .with_body(r#"{"message": "name already exists on this account"}"#)
+        .create();
+
+    let gh = GitHub::new_at(&server.url(), "test-token");
+    let err = gh
+        .create_repo("owner", "owner", "to-alex", true)
+        .unwrap_err();
+    mock.assert();
+    let msg = err.to_string();
+    assert!(msg.contains("HTTP 422"), "{}", msg);
+    assert!(msg.contains("already exists"), "{}", msg);
+}
+
+#[test]
+fn delete_repo_sends_delete() {
+    let mut server = mockito::Server::new();
+    let mock = server
+        .mock("DELETE", "/repos/owner/to-alex")
+        .match_header("Authorization", "Bearer test-token")
+        .with_status(204)
+        .create();
+
+    let gh = GitHub::new_at(&server.url(), "test-token");
+    gh.delete_repo("owner/to-alex").unwrap();
+    mock.assert();
+}
+
+#[test]
+fn rename_repo_patches_name() {
+    let mut server = mockito::Server::new();
+    let mock = server
+        .mock("PATCH", "/repos/owner/to-alex")
+        .match_body(mockito::Matcher::PartialJsonString(
+            r#"{"name": "to-alexandra"}"#.to_string(),
+        ))
+        .with_status(200)
+        .with_body("{}")
+        .create();
+
+    let gh = GitHub::new_at(&server.url(), "test-token");
+    gh.rename_repo("owner/to-alex", "to-alexandra").unwrap();
+    mock.assert();
+}
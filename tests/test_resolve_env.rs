@@ -0,0 +1,36 @@
+//! Integration test for `resolve::data_dir()` following `CORKY_DATA` and
+//! the cwd's `mail/`.
+//!
+//! Kept in its own test binary: it changes the process cwd and environment,
+//! which the parallel tests in test_resolve.rs would otherwise race with.
+
+use tempfile::TempDir;
+
+use corky::resolve;
+
+#[test]
+fn test_data_dir_follows_corky_data_changes() {
+    // A cwd without mail/ or .corky.toml, so CORKY_DATA decides.
+    let cwd = TempDir::new().unwrap();
+    let first = TempDir::new().unwrap();
+    let second = TempDir::new().unwrap();
+    let old_cwd = std::env::current_dir().unwrap();
+    std::env::set_current_dir(cwd.path()).unwrap();
+
+    // SAFETY: The only test in this binary; no concurrent env access.
+    unsafe { std::env::set_var("CORKY_DATA", first.path()) };
+    assert_eq!(resolve::data_dir(), first.path());
+    assert_eq!(resolve::data_dir(), first.path());
+
+    unsafe { std::env::set_var("CORKY_DATA", second.path()) };
+    assert_eq!(resolve::data_dir(), second.path());
+
+    // A local mail/ created later still takes precedence.
+    std::fs::create_dir(cwd.path().join("mail")).unwrap();
+    assert_eq!(resolve::data_dir(), std::path::Path::new("mail"));
+    std::fs::remove_dir(cwd.path().join("mail")).unwrap();
+    assert_eq!(resolve::data_dir(), second.path());
+
+    unsafe { std::env::remove_var("CORKY_DATA") };
+    std::env::set_current_dir(old_cwd).unwrap();
+}
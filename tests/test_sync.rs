@@ -6,7 +6,9 @@ mod common;
 use std::collections::HashSet;
 use tempfile::TempDir;
 
-use corky::sync::imap_sync::{merge_message_to_file, parse_msg_date};
+use corky::sync::imap_sync::{
+    merge_message_indexed, merge_message_to_file, parse_msg_date, ThreadIndex,
+};
 use corky::sync::markdown::{parse_thread_markdown, thread_to_markdown};
 use corky::sync::types::{Message, SyncState, Thread};
 use corky::util::slugify;
@@ -299,6 +301,39 @@ fn test_dedup_different_sender_same_date_not_skipped() {
     assert_eq!(parsed.messages.len(), 2);
 }
 
+#[test]
+fn test_dedup_same_sender_date_drops_distinct_message() {
+    // Known limitation: thread files do not record Message-ID, so dedup is
+    // keyed on (from, date) alone. Two different messages from one sender
+    // in the same second (e.g. two forwards) collapse into the first.
+    let tmp = TempDir::new().unwrap();
+    let out_dir = tmp.path().join("conversations");
+    std::fs::create_dir_all(&out_dir).unwrap();
+
+    let forward = |id: &str, body: &str| Message {
+        id: id.to_string(),
+        thread_id: "forwards".to_string(),
+        from: "Alice <alice@example.com>".to_string(),
+        to: String::new(),
+        cc: String::new(),
+        date: "Mon, 10 Feb 2025 10:00:00 +0000".to_string(),
+        subject: "Forwards".to_string(),
+        body: body.to_string(),
+    };
+
+    let mut index = ThreadIndex::default();
+    for msg in [forward("1", "First forward"), forward("2", "Second forward")] {
+        merge_message_indexed(&mut index, &out_dir, "inbox", "personal", &msg, "forwards")
+            .unwrap();
+    }
+    index.flush().unwrap();
+
+    let path = out_dir.join("forwards.md");
+    let parsed = parse_thread_markdown(&std::fs::read_to_string(path).unwrap()).unwrap();
+    assert_eq!(parsed.messages.len(), 1);
+    assert_eq!(parsed.messages[0].body, "First forward");
+}
+
 // ---------------------------------------------------------------------------
 // Label accumulation
 // ---------------------------------------------------------------------------
@@ -449,6 +484,81 @@ fn test_slug_collision_suffix() {
     assert_eq!(stem2, "same-subject-2");
 }
 
+#[test]
+fn test_thread_index_finds_existing_and_new_files() {
+    let tmp = TempDir::new().unwrap();
+    let out_dir = tmp.path().join("conversations");
+    std::fs::create_dir_all(&out_dir).unwrap();
+
+    let message = |id: &str, thread: &str, hour: u32| Message {
+        id: id.to_string(),
+        thread_id: thread.to_string(),
+        from: format!("Sender {} <s{}@example.com>", id, id),
+        to: String::new(),
+        cc: String::new(),
+        date: format!("Mon, 10 Feb 2025 {:02}:00:00 +0000", hour),
+        subject: "Indexed".to_string(),
+        body: format!("Body {}", id),
+    };
+
+    // Written before the index exists: found by the directory scan.
+    let existing =
+        merge_message_to_file(&out_dir, "inbox", "personal", &message("1", "old", 8), "old")
+            .unwrap()
+            .unwrap();
+
+    let mut index = ThreadIndex::default();
+    let merge = |index: &mut ThreadIndex, msg: &Message| {
+        merge_message_indexed(index, &out_dir, "inbox", "personal", msg, &msg.thread_id)
+            .unwrap()
+            .unwrap()
+    };
+    assert_eq!(merge(&mut index, &message("2", "old", 9)), existing);
+
+    // Created through the index: later messages reuse the new file.
+    let created = merge(&mut index, &message("3", "new", 10));
+    assert_ne!(created, existing);
+    assert_eq!(merge(&mut index, &message("4", "new", 11)), created);
+
+    // Merges are held in memory until flushed.
+    assert!(!created.exists());
+    index.flush().unwrap();
+    for path in [&existing, &created] {
+        let thread = parse_thread_markdown(&std::fs::read_to_string(path).unwrap()).unwrap();
+        assert_eq!(thread.messages.len(), 2);
+    }
+}
+
+#[test]
+fn test_thread_index_dedups_unflushed_and_on_disk_messages() {
+    let tmp = TempDir::new().unwrap();
+    let out_dir = tmp.path().join("conversations");
+    std::fs::create_dir_all(&out_dir).unwrap();
+
+    let message = |id: &str, hour: u32| Message {
+        id: id.to_string(),
+        thread_id: "seen".to_string(),
+        from: "Alice <alice@example.com>".to_string(),
+        to: String::new(),
+        cc: String::new(),
+        date: format!("Mon, 10 Feb 2025 {:02}:00:00 +0000", hour),
+        subject: "Seen".to_string(),
+        body: format!("Body {}", id),
+    };
+    let path = merge_message_to_file(&out_dir, "inbox", "personal", &message("1", 8), "seen")
+        .unwrap()
+        .unwrap();
+
+    let mut index = ThreadIndex::default();
+    for msg in [message("1", 8), message("2", 9), message("2", 9)] {
+        merge_message_indexed(&mut index, &out_dir, "inbox", "personal", &msg, "seen").unwrap();
+    }
+    index.flush().unwrap();
+
+    let thread = parse_thread_markdown(&std::fs::read_to_string(&path).unwrap()).unwrap();
+    assert_eq!(thread.messages.len(), 2);
+}
+
 // ---------------------------------------------------------------------------
 // Message ordering
 // ---------------------------------------------------------------------------
@@ -601,6 +711,24 @@ fn test_sync_state_roundtrip() {
     assert!(loaded.accounts.is_empty());
 }
 
+#[test]
+fn test_sync_state_encodes_keys_in_order() {
+    let mut state = SyncState::default();
+    for name in ["zeta", "alpha", "mid", "beta"] {
+        state.accounts.insert(name.to_string(), Default::default());
+    }
+    let json = serde_json::to_string(&state).unwrap();
+    assert!(json.starts_with(r#"{"accounts":{"alpha":"#));
+    let positions: Vec<usize> = ["alpha", "beta", "mid", "zeta"]
+        .iter()
+        .map(|name| json.find(&format!("\"{}\"", name)).unwrap())
+        .collect();
+    assert!(positions.windows(2).all(|w| w[0] < w[1]));
+
+    let reloaded = corky::sync::types::load_state(json.as_bytes()).unwrap();
+    assert_eq!(serde_json::to_string(&reloaded).unwrap(), json);
+}
+
 // ---------------------------------------------------------------------------
 // parse_msg_date
 // ---------------------------------------------------------------------------